@@ -8,13 +8,13 @@ This is the main entry point. All logic is split across:
 - discover.py  — SSH role discovery + console
 """
 from .core import (
-    app, socketio, _tl, _state, _conversation, _logs, _log_buffer,
+    app, socketio, _tl, _state, _conversation, _logs, _history_clock, _log_buffer,
     _sid_emit, _ENV_TO_STATE, _STATE_TO_ENV, reset_state,
     ENV_SCHEMA, load_env, save_env,
     ROOT, MGMT, _PKG_DIR, cname,
     _llm_chat, _llm_config, _LLM_AVAILABLE, _WIZARD_SYSTEM_PROMPT,
     msg, buttons, progress, mask, clear_widgets,
-    run_cmd, docker_ps, _analyze_container_log,
+    run_cmd, docker_ps, _analyze_containers, _log_mux,
     _local_interfaces, _arp_devices, _devices_env_ip, _subnet_ping_sweep,
     _docker_container_env, _emit_log_error, save_state,
     json, subprocess, threading, time, request, emit, render_template, _socket,
@@ -42,15 +42,33 @@ from .discover import (
 )
 import os as _os, sys as _sys
 import re as _re
+import zlib as _zlib
+import atexit as _atexit
 from . import tickets as _tickets
 from .i18n import t, set_lang, get_lang, llm_lang_instruction
 from .pipeline import PipelineState, StepResult, run_step, evaluate_implementation, evaluate_test_output, build_retry_prompt
 from . import engines as _engines
 from . import db as _db
-from .event_bus import get_bus, init_bus, EventType
+from .event_bus import get_bus, init_bus, EventType, Event, EventFilter, StreamHub
+from .projections import ProjectionManager, BUILTIN_PROJECTIONS
 
-_db.init_db(ROOT / ".dockfra.db")
+_db.init_db(_os.environ.get("DOCKFRA_DB_PATH") or ROOT / ".dockfra.db")
+_db.start_write_behind()
+_db.start_retention_worker(float(_os.environ.get("DOCKFRA_DB_COMPACT_INTERVAL", "3600")))
+_atexit.register(_db.close_db)
 _bus = init_bus(_db)
+# Events persisted by the write-behind queue (_sid_emit) reach bus subscribers once committed
+_db.add_commit_listener(lambda rows: [_bus.publish(Event.from_dict(r)) for r in rows])
+_stream_hub = StreamHub(_bus)
+_SSE_HEARTBEAT = 15.0
+# Messages sent to a newly connected client; older ones load on demand
+_REPLAY_MESSAGES = int(_os.environ.get("DOCKFRA_REPLAY_MESSAGES", "50"))
+_projections = ProjectionManager(_bus, _db, mode="thread")
+for _p in BUILTIN_PROJECTIONS:
+    _projections.register(_p())
+threading.Thread(target=_projections.catch_up_all, name="dockfra-projections", daemon=True).start()
+_atexit.register(_projections.save_snapshots)
+_atexit.register(_bus.close)  # runs first: drain handler queues before the snapshot
 
 STEPS = {
     "welcome":          lambda f: step_welcome(),
@@ -95,8 +113,12 @@ def on_connect():
             reset_state()
             step_welcome()
         else:
-            # Replay conversation to THIS client only
-            for m in _conversation:
+            # Replay the latest messages to THIS client only; older ones are
+            # fetched on demand from /api/history?before=
+            recent = _conversation.last(_REPLAY_MESSAGES)
+            if recent and recent[0]["seq"] != _conversation.oldest_seq:
+                emit("history_more", {"before": recent[0]["seq"]})
+            for m in recent:
                 emit("message", m)
             emit("clear_widgets", {})
             step = _state.get("step","welcome")
@@ -115,6 +137,53 @@ def on_connect():
 @socketio.on("disconnect")
 def on_disconnect():
     _tl.sid = None
+    for key in [k for k in _log_watchers if k[0] == request.sid]:
+        _log_watchers.pop(key).close()
+
+# (sid, container) → log_mux Subscription feeding that client's container_log events
+_log_watchers: dict = {}
+
+@socketio.on("logs_subscribe")
+def on_logs_subscribe(data):
+    """Push `container_log` events ({container, first, offset, lines}) to this client.
+
+    {"container": name, "since": offset} — without `since` only new lines are sent.
+    """
+    data = data if isinstance(data, dict) else {}
+    container, sid = data.get("container", ""), request.sid
+    if not container or (sid, container) in _log_watchers:
+        return
+    since = data.get("since")
+    try:
+        since = None if since is None else int(since)
+    except (TypeError, ValueError):
+        emit("container_log", {"container": container, "error": "since must be an integer"})
+        return
+    try:
+        sub = _log_mux.subscribe(container)
+    except Exception as e:
+        emit("container_log", {"container": container, "error": str(e)})
+        return
+    _log_watchers[(sid, container)] = sub
+
+    def _pump():
+        cursor = _log_mux.tail(container, 0)["offset"] if since is None else since
+        while not sub.closed:
+            page = _log_mux.since(container, cursor, limit=1000)
+            if page["lines"]:
+                cursor = page["offset"]
+                socketio.emit("container_log", {"container": container, **page}, to=sid)
+                continue
+            sub.get(timeout=1)
+
+    socketio.start_background_task(_pump)
+
+@socketio.on("logs_unsubscribe")
+def on_logs_unsubscribe(data):
+    container = data.get("container", "") if isinstance(data, dict) else str(data)
+    sub = _log_watchers.pop((request.sid, container), None)
+    if sub is not None:
+        sub.close()
 
 @socketio.on("action")
 def on_action(data):
@@ -173,7 +242,7 @@ def on_action(data):
                 progress(t('llm_thinking'))
                 history = [{"role": m["role"] if m["role"] != "bot" else "assistant",
                             "content": m["text"]}
-                           for m in _conversation[-10:]
+                           for m in _conversation.last(10)
                            if m.get("text") and m["role"] in ("user","bot")]
                 _sys_prompt = _WIZARD_SYSTEM_PROMPT + "\n\n" + llm_lang_instruction()
                 reply = _llm_chat(user_text,
@@ -198,17 +267,63 @@ def dashboard():
 
 @app.route("/api/containers")
 def api_containers():
-    return json.dumps(docker_ps())
+    """Running containers from the event-fed cache; ?refresh=1 forces `docker ps`."""
+    return json.dumps(docker_ps(refresh=request.args.get("refresh") == "1"))
 
 @app.route("/api/logs/<container>")
 def api_logs(container):
+    """Container log from the in-memory follower: last ?n= lines (default 100, max 5000).
+
+    ?since=<offset> returns only lines from that offset on; every response
+    carries the `offset` to pass next time.  "truncated" means lines
+    between `since` and `first` (or older than the last `n`) already left
+    the ring buffer.
+    """
     try:
-        out = subprocess.check_output(
-            ["docker","logs","--tail","100",container],
-            text=True, stderr=subprocess.STDOUT)
-        return json.dumps({"ok": True, "lines": out.splitlines()[-100:]})
+        n = max(1, min(int(request.args.get("n", 100)), 5000))
+        since = request.args.get("since")
+        if since is not None:
+            page = _log_mux.since(container, int(since), limit=n)
+        else:
+            page = _log_mux.tail(container, n)
+    except ValueError:
+        return json.dumps({"ok": False, "lines": ["n and since must be integers"]}), 400
     except Exception as e:
         return json.dumps({"ok": False, "lines": [str(e)]})
+    return json.dumps({"ok": True, **page})
+
+@app.route("/api/logs/<container>/stream")
+def api_logs_stream(container):
+    """SSE: live lines of one container, from ?since=<offset> (default: from now on)."""
+    from flask import Response, stream_with_context
+    try:
+        sub = _log_mux.subscribe(container)
+    except Exception as e:
+        return json.dumps({"ok": False, "error": str(e)}), 404
+
+    def _sse(offset, lines):
+        return f"data: {json.dumps({'offset': offset, 'lines': lines}, ensure_ascii=False)}\n\n"
+
+    def generate():
+        try:
+            yield ": connected\n\n"
+            since = request.args.get("since", type=int)
+            cursor = _log_mux.tail(container, 0)["offset"] if since is None else since
+            while True:
+                # Lines come from the ring buffer — the subscription only wakes
+                # us, so a lagging client skips nothing the buffer still holds
+                page = _log_mux.since(container, cursor, limit=1000)
+                if page["lines"]:
+                    cursor = page["offset"]
+                    yield _sse(page["first"], page["lines"])
+                    continue
+                if not sub.get(timeout=_SSE_HEARTBEAT):
+                    yield ": heartbeat\n\n"
+        finally:
+            sub.close()
+
+    return Response(stream_with_context(generate()), content_type="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.route("/api/events")
 def api_events():
@@ -250,9 +365,45 @@ def api_env_post():
 
 @app.route("/api/history")
 def api_history():
+    """Conversation and log lines from the bounded in-memory history.
+
+    Without arguments: the latest ?limit= (default 500) of each.
+    ?since=<cursor> returns only entries added after a previous response's
+    "cursor".  ?before=<seq> pages older conversation ("older" is the next
+    `before`, null once the oldest retained message is included).
+    ?logs=0 leaves out the log lines.
+    """
+    args = request.args
+    try:
+        limit = max(1, min(int(args.get("limit", 500)), 5000))
+        since = int(args["since"]) if "since" in args else None
+        before = int(args["before"]) if "before" in args else None
+    except ValueError:
+        return json.dumps({"ok": False, "error": "limit, since and before must be integers"}), 400
+    want_logs = args.get("logs", "1") != "0"
+    cursor = _history_clock.cursor()
+    if since is not None:
+        conversation = _conversation.since(since, limit)
+        logs = _logs.since(since, limit) if want_logs else []
+        # A page cut short by `limit` moves the cursor only as far as it got
+        for page in (conversation, logs):
+            if len(page) == limit:
+                cursor = min(cursor, page[-1]["seq"])
+        conversation = [m for m in conversation if m["seq"] <= cursor]
+        logs = [e for e in logs if e["seq"] <= cursor]
+    elif before is not None:
+        conversation, logs = _conversation.before(before, limit), []
+    else:
+        conversation = _conversation.last(limit)
+        logs = _logs.last(limit) if want_logs else []
+    older = None
+    if since is None and conversation and conversation[0]["seq"] != _conversation.oldest_seq:
+        older = conversation[0]["seq"]
     return json.dumps({
-        "conversation": _conversation,
-        "logs": _logs,
+        "conversation": conversation,
+        "logs": logs,
+        "cursor": cursor,
+        "older": older,
         "current_step": _state.get("step", "welcome")
     })
 
@@ -432,15 +583,10 @@ def api_ssh_options(kind, role="developer"):
     elif kind == "containers":
         # Running containers for SVC/TARGET params
         try:
-            out = subprocess.check_output(
-                ["docker", "ps", "--format", "{{.Names}}\t{{.Status}}"],
-                text=True, stderr=subprocess.DEVNULL, timeout=5)
             options = []
             prefix = _state.get("app_name", "") or ""
-            for line in out.splitlines():
-                parts = line.split("\t", 1)
-                name = parts[0].strip()
-                status = parts[1].strip() if len(parts) > 1 else ""
+            for c in docker_ps():
+                name, status = c["name"], c["status"]
                 # Short name: strip project prefix
                 short = name
                 for pfx in (prefix + "-", "dockfra-", "management-", "app-"):
@@ -510,10 +656,7 @@ def api_device_ips():
     # ── Docker containers with their IPs ─────────────────────────────────────
     docker_entries = []
     try:
-        names_out = subprocess.check_output(
-            ["docker","ps","--format","{{.Names}}"],
-            text=True, stderr=subprocess.DEVNULL).strip().splitlines()
-        for name in names_out:
+        for name in [c["name"] for c in docker_ps()]:
             try:
                 info = json.loads(subprocess.check_output(
                     ["docker","inspect","--format",
@@ -951,7 +1094,7 @@ def _step_project_stats():
 def _step_show_ticket(tid: str):
     """Show detailed ticket view with status-aware actions."""
     clear_widgets()
-    tk = _tickets.get(tid)
+    tk = _tickets.get(tid, with_comments=True)
     if not tk:
         msg(t('ticket_not_found', tid=tid))
         buttons([{"label": t('menu'), "value": "back"}])
@@ -2145,13 +2288,12 @@ def api_logs_tail():
 
 @app.route("/api/health")
 def api_health():
-    """Return algorithmic health analysis of running containers."""
-    containers = docker_ps()
+    """Return algorithmic health analysis of running containers (?refresh=1 bypasses the cache)."""
+    containers = docker_ps(refresh=request.args.get("refresh") == "1")
     running = [c for c in containers if "Up" in c["status"] and "Restarting" not in c["status"]]
     failing = [c for c in containers if "Restarting" in c["status"] or "Exit" in c["status"]]
     findings = []
-    for c in failing:
-        text, btns = _analyze_container_log(c["name"])
+    for c, (text, btns) in zip(failing, _analyze_containers([c["name"] for c in failing])):
         findings.append({"container": c["name"], "status": c["status"],
                          "finding": text, "solutions": btns})
     return json.dumps({
@@ -2163,14 +2305,54 @@ def api_health():
 
 # ── Ticket CRUD API (uses dockfra.tickets module) ─────────────────────────────
 
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match semantics: "*" or any listed tag equal to `etag` (weak comparison)."""
+    tag = etag[2:] if etag.startswith("W/") else etag
+    for item in header.split(","):
+        item = item.strip()
+        if item == "*":
+            return True
+        if (item[2:] if item.startswith("W/") else item) == tag:
+            return True
+    return False
+
+
 @app.route("/api/tickets")
 def api_tickets():
-    """List all tickets with optional filters."""
-    status_f = request.args.get("status")
-    assigned_f = request.args.get("assigned_to")
-    priority_f = request.args.get("priority")
-    tickets = _tickets.list_tickets(status=status_f, assigned_to=assigned_f, priority=priority_f)
-    return json.dumps(tickets)
+    """List tickets with optional filters.
+
+    ?limit=&cursor= page through tickets in id order (the next cursor is
+    sent in X-Next-Cursor), ?fields=id,title,status returns only those keys
+    ("comment_count" is derived), ?updated_since=<ISO> returns only tickets
+    updated since then.  The weak ETag changes with any ticket, so a
+    matching If-None-Match is answered 304 without building the list.
+    """
+    args = request.args
+    try:
+        limit = args.get("limit")
+        limit = max(1, min(int(limit), 1000)) if limit else None
+    except ValueError:
+        return json.dumps({"ok": False, "error": "limit must be an integer"}), 400
+    updated_since = args.get("updated_since") or None
+    if updated_since:
+        try:
+            updated_since = _tickets.parse_iso(updated_since)
+        except ValueError:
+            return json.dumps({"ok": False, "error": "updated_since must be an ISO 8601 timestamp"}), 400
+    query = "&".join(f"{k}={v}" for k, v in sorted(args.items(multi=True)))
+    etag = f'W/"{_tickets.list_version()}-{_zlib.crc32(query.encode()):08x}"'
+    if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+        return "", 304, {"ETag": etag}
+    fields = [f for f in args.get("fields", "").split(",") if f] or None
+    page = _tickets.list_page(
+        limit=limit, cursor=args.get("cursor") or None, fields=fields,
+        updated_since=updated_since,
+        status=args.get("status"), assigned_to=args.get("assigned_to"),
+        priority=args.get("priority"))
+    headers = {"ETag": etag}
+    if page["next_cursor"]:
+        headers["X-Next-Cursor"] = page["next_cursor"]
+    return json.dumps(page["tickets"]), 200, headers
 
 @app.route("/api/tickets", methods=["POST"])
 def api_tickets_create():
@@ -2196,20 +2378,75 @@ def api_tickets_create():
         return json.dumps({"ok": False, "error": str(e)}), 500
     return json.dumps({"ok": True, "ticket": ticket})
 
+@app.route("/api/tickets/search")
+def api_tickets_search():
+    """Ranked full-text search: ?q=words [&limit=20]; `word*` matches a prefix."""
+    query = request.args.get("q", "").strip()
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), 500))
+    except ValueError:
+        return json.dumps({"ok": False, "error": "limit must be an integer"}), 400
+    t0 = time.perf_counter()
+    hits = _tickets.search(query, limit) if query else []
+    results = [{k: h.get(k) for k in ("id", "title", "status", "priority", "assigned_to", "score")}
+               for h in hits]
+    return json.dumps({"query": query, "results": results,
+                       "took_ms": round((time.perf_counter() - t0) * 1000, 2)})
+
+@app.route("/api/tickets/bulk", methods=["POST"])
+def api_tickets_bulk():
+    """Apply one change set to every ticket matching a filter.
+
+    Body: {"filter": {"status"|"assigned_to"|"priority": ..., "ids": [...]},
+           "changes": {...}}.  All per-ticket events go to the store in a
+    single append_batch transaction.
+    """
+    data = request.get_json(silent=True) or {}
+    changes = {k: v for k, v in (data.get("changes") or {}).items()
+               if k not in ("id", "created_at", "created_by")}
+    try:
+        updated = _tickets.bulk_update(data.get("filter") or {}, changes)
+    except ValueError as e:
+        return json.dumps({"ok": False, "error": str(e)}), 400
+    except Exception as e:
+        return json.dumps({"ok": False, "error": str(e)}), 500
+    event_type = EventType.TICKET_CLOSED if changes.get("status") == "done" else EventType.TICKET_UPDATED
+    rows = [(event_type.value, {"id": t["id"], "changes": changes}, "api") for t in updated]
+    ids = _db.append_batch(rows)
+    if ids:
+        for (event, payload, src), eid in zip(rows, ids):
+            _bus.publish(Event(event=event, data=payload, src=src, id=eid))
+    else:
+        for event, payload, src in rows:
+            _bus.emit(event, payload, src=src)
+    return json.dumps({"ok": True, "updated": len(updated), "ids": [t["id"] for t in updated]})
+
 @app.route("/api/tickets/<ticket_id>")
 def api_ticket_get(ticket_id):
-    """Get a single ticket by ID."""
-    ticket = _tickets.get(ticket_id)
+    """Get a single ticket by ID, comments included; ETag is its revision."""
+    ticket = _tickets.get(ticket_id, with_comments=True)
     if not ticket:
         return json.dumps({"ok": False, "error": "Not found"}), 404
-    return json.dumps(ticket)
+    return json.dumps(ticket), 200, {"ETag": f'"{ticket.get("revision", 0)}"'}
 
 @app.route("/api/tickets/<ticket_id>", methods=["PUT"])
 def api_ticket_update(ticket_id):
-    """Update ticket fields."""
+    """Update ticket fields.
+
+    An `If-Match: "<revision>"` header (or "revision" in the body) makes the
+    update a compare-and-swap; a stale revision is answered 409.
+    """
     data = request.get_json(silent=True) or {}
-    changes = {k: v for k, v in data.items() if k not in ("id", "created_at", "created_by")}
-    ticket = _tickets.update(ticket_id, **changes)
+    expected = request.headers.get("If-Match", "").strip('W/" ') or data.get("revision")
+    changes = {k: v for k, v in data.items() if k not in ("id", "created_at", "created_by", "revision")}
+    try:
+        ticket = _tickets.update(ticket_id, expected_revision=expected, **changes)
+    except _tickets.RevisionConflict as e:
+        return json.dumps({"ok": False, "error": str(e), "revision": e.actual}), 409
+    except (TypeError, ValueError):
+        return json.dumps({"ok": False, "error": "revision must be an integer"}), 400
+    except TimeoutError as e:
+        return json.dumps({"ok": False, "error": str(e)}), 503
     if not ticket:
         return json.dumps({"ok": False, "error": "Not found"}), 404
     event_type = EventType.TICKET_CLOSED if changes.get("status") == "done" else EventType.TICKET_UPDATED
@@ -2476,14 +2713,10 @@ def api_engine_status():
 @app.route("/api/developer-logs")
 def api_developer_logs():
     """Return last N lines of ssh-developer container logs."""
-    import subprocess as _sp
     ri = _get_role("developer")
     n = min(int(request.args.get("n", 80)), 500)
     try:
-        out = _sp.check_output(
-            ["docker", "logs", "--tail", str(n), ri["container"]],
-            text=True, stderr=_sp.STDOUT, timeout=10
-        )
+        out = "\n".join(_log_mux.tail(ri["container"], n)["lines"])
     except Exception as e:
         out = f"Error: {e}"
     return json.dumps({"logs": out, "container": ri["container"]})
@@ -2499,40 +2732,159 @@ def api_tickets_sync():
         return json.dumps({"ok": False, "error": str(e)}), 500
     return json.dumps({"ok": True, "results": results})
 
+@app.route("/api/db/compact", methods=["POST"])
+def api_db_compact():
+    """Archive expired events per retention policy and reclaim space."""
+    data = request.get_json(silent=True) or {}
+    try:
+        result = _db.compact(vacuum=bool(data.get("vacuum")))
+    except Exception as e:
+        return json.dumps({"ok": False, "error": str(e)}), 500
+    return json.dumps({"ok": True, **result, "retention": _db.get_retention()})
+
 # ── CQRS Query endpoints ─────────────────────────────────────────────────────
 
+@app.route("/api/projections")
+def api_projections():
+    """CQRS Query: projection cursors and last catch-up throughput."""
+    return json.dumps(_projections.status())
+
+
+@app.route("/api/projections/<name>")
+def api_projection_state(name):
+    """CQRS Query: materialized state of one projection."""
+    state = _projections.state(name)
+    if state is None:
+        return json.dumps({"ok": False, "error": "Unknown projection"}), 404
+    return json.dumps(state)
+
+
+@app.route("/api/projections/<name>/rebuild", methods=["POST"])
+def api_projection_rebuild(name):
+    """Drop a projection's snapshot and replay it from the first event."""
+    if name not in _projections.names():
+        return json.dumps({"ok": False, "error": "Unknown projection"}), 404
+    return json.dumps({"ok": True, **_projections.rebuild(name)})
+
+@app.route("/api/events/bus")
+def api_events_bus():
+    """Per-handler dispatch metrics: queue depth, drops and handler latency."""
+    return json.dumps({"handlers": _bus.metrics()})
+
+
+@app.route("/api/http/metrics")
+def api_http_metrics():
+    """Shared HTTP client: per-host requests, retries, latency and pooled connections."""
+    from .http_client import get_client
+    return json.dumps(get_client().metrics())
+
+
+def _query_filtered(since_id, limit, flt, max_scan=10000):
+    """Read up to `limit` events matching `flt` after since_id.
+
+    Type and src criteria run in SQL; ticket/container criteria are applied
+    to the rows read, scanning at most `max_scan` rows.  Returns (events,
+    cursor, exhausted) — cursor is the last id examined, so the next call
+    resumes after rows that were filtered out; exhausted means the store
+    had nothing further to examine.
+    """
+    if not flt:
+        events = _bus.query_events(since_id, limit)
+        return events, (events[-1]["id"] if events else since_id), len(events) < limit
+    out, cursor, scanned = [], since_id, 0
+    page = limit if not flt.needs_payload else max(limit, 500)
+    while scanned < max_scan:
+        rows = _db.get_events(since_id=cursor, limit=page,
+                              event_type=list(flt.types), src=list(flt.srcs))
+        for ev in rows:
+            if len(out) >= limit:
+                return out, cursor, False
+            cursor = ev["id"]
+            if not flt.needs_payload or flt.matches(ev):
+                out.append(ev)
+        scanned += len(rows)
+        if len(rows) < page:
+            return out, cursor, True
+    return out, cursor, False
+
+
 @app.route("/api/events/since/<int:since_id>")
 def api_events_since(since_id):
-    """CQRS Query: return new events since given cursor (for CLI TUI polling)."""
+    """CQRS Query: return new events since given cursor (for CLI TUI polling).
+
+    Filters: ?type= (names or globs, comma-separated), ?src=, ?ticket=,
+    ?container=.  `cursor` is where the next poll should resume.
+    """
     limit = min(int(request.args.get("limit", 200)), 1000)
-    event_type = request.args.get("type")
-    src = request.args.get("src")
-    events = _bus.query_events(since_id, limit) if not (event_type or src) \
-        else _db.get_events(since_id=since_id, limit=limit, event_type=event_type, src=src)
-    return json.dumps({"events": events, "max_id": _bus.query_max_id()})
+    flt = EventFilter.from_args(request.args)
+    max_id = _bus.query_max_id()
+    events, cursor, exhausted = _query_filtered(since_id, limit, flt)
+    if exhausted:
+        # Every event up to max_id has been examined
+        cursor = max(cursor, max_id)
+    return json.dumps({"events": events, "max_id": max_id, "cursor": cursor})
 
 
 @app.route("/api/stream")
 def api_stream():
-    """CQRS Query: SSE stream — push new events to connected clients in real-time."""
+    """CQRS Query: SSE stream — push new events to connected clients in real-time.
+
+    Catch-up from ?since= is read from SQLite; after that events are pushed by
+    the StreamHub as they are committed.  Slow clients lose log_line events
+    first; if anything else overflows the client is re-synced from SQLite.
+    Accepts the same filters as /api/events/since (type, src, ticket,
+    container); filtered-out events are never encoded or sent.
+    """
     from flask import Response, stream_with_context
     since_id = int(request.args.get("since", _bus.query_max_id()))
+    flt = EventFilter.from_args(request.args)
+
+    def _sse(ev):
+        payload = json.dumps({
+            "id": ev["id"], "ts": ev["ts"],
+            "src": ev["src"], "event": ev["event"],
+            "data": ev["data"]
+        }, ensure_ascii=False)
+        return f"data: {payload}\n\n"
+
+    def _catch_up(cursor):
+        while True:
+            events, next_cursor, _ = _query_filtered(cursor, 500, flt)
+            yield from events
+            if next_cursor == cursor:
+                return
+            cursor = next_cursor
 
     def generate():
+        sub = _stream_hub.connect(flt)
         cursor = since_id
-        while True:
-            events = _bus.query_events(cursor, 100)
-            for ev in events:
+        try:
+            yield ": connected\n\n"
+            for ev in _catch_up(cursor):
                 cursor = ev["id"]
-                payload = json.dumps({
-                    "id": ev["id"], "ts": ev["ts"],
-                    "src": ev["src"], "event": ev["event"],
-                    "data": ev["data"]
-                }, ensure_ascii=False)
-                yield f"data: {payload}\n\n"
-            if not events:
-                yield ": heartbeat\n\n"
-            time.sleep(0.5)
+                yield _sse(ev)
+            replayed_to = cursor
+            while True:
+                events = sub.get(timeout=_SSE_HEARTBEAT)
+                if sub.take_lagged():
+                    for ev in _catch_up(cursor):
+                        cursor = ev["id"]
+                        yield _sse(ev)
+                    replayed_to = cursor
+                    continue
+                dropped = sub.take_dropped()
+                if dropped:
+                    yield f": dropped {dropped} log_line events (slow consumer)\n\n"
+                if not events and not dropped:
+                    yield ": heartbeat\n\n"
+                    continue
+                for ev in events:
+                    if ev["id"] <= replayed_to:
+                        continue
+                    cursor = max(cursor, ev["id"])
+                    yield _sse(ev)
+        finally:
+            _stream_hub.disconnect(sub)
 
     return Response(
         stream_with_context(generate()),
@@ -2540,7 +2892,6 @@ def api_stream():
         headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-
 if __name__ == "__main__":
     print("🧙 Dockfra Wizard → http://localhost:5050")
     socketio.run(app, host="0.0.0.0", port=5050, debug=False, allow_unsafe_werkzeug=True)
@@ -7,6 +7,8 @@ Usage:
   dockfra cli --tui                 # three-panel curses TUI
   dockfra cli status                # container health
   dockfra cli tickets               # list all tickets
+  dockfra cli tickets search <words>                     # ranked full-text search
+  dockfra cli tickets bulk --status=open priority=high   # bulk-update matches
   dockfra cli diff <T-XXXX>         # show ticket diff & commits
   dockfra cli pipeline <T-XXXX>     # run full pipeline for ticket
   dockfra cli engines               # LLM engine status
@@ -14,6 +16,7 @@ Usage:
   dockfra cli dev-logs [N]          # ssh-developer container logs
   dockfra cli test                  # full system self-test
   dockfra cli doctor                # diagnose & suggest fixes
+  dockfra cli db-compact [--vacuum] # archive expired events, reclaim space
   dockfra cli logs [N]              # last N log lines (default 40)
   dockfra cli launch [stack]        # launch stacks
   dockfra cli ask "..."             # free-text LLM query
@@ -71,7 +74,9 @@ class WizardClient:
     def containers(self):               return self._get("/api/containers")
     def logs(self, n=40):               return self._get("/api/logs/tail", {"n": n})
     def history(self):                  return self._get("/api/history")
-    def events_since(self, since_id=0): return self._get(f"/api/events/since/{since_id}")
+    def events_since(self, since_id=0, types=None):
+        params = {"type": ",".join(types)} if types else None
+        return self._get(f"/api/events/since/{since_id}", params)
     def ping(self):
         _, err = self._get("/api/containers", timeout=3)
         return err is None
@@ -222,7 +227,12 @@ def cmd_action(client, args):
     _render_result(data.get("result", [])); return 0
 
 def cmd_tickets(client, args):
-    data, err = client._get("/api/tickets")
+    if args and args[0] == "bulk":
+        return cmd_tickets_bulk(client, args[1:])
+    if args and args[0] == "search":
+        return cmd_tickets_search(client, args[1:])
+    data, err = client._get("/api/tickets",
+                            {"fields": "title,status,priority,assigned_to,comment_count"})
     if err: print(red(f"❌ {err}")); return 1
     if not data:
         print(dim(f"  {t('cli_no_tickets')}")); return 0
@@ -235,7 +245,49 @@ def cmd_tickets(client, args):
         sc = status_clr.get(tk["status"], dim)
         pi = prio_icon.get(tk.get("priority", ""), "⚪")
         print(f"  {sc(si + ' ' + tk['id']):<28} {pi} {bold(tk['title'])}")
-        print(f"     {dim(tk['status'])} · {dim(tk.get('assigned_to',''))} · {dim(str(len(tk.get('comments',[]))))} {t('cli_comments')}")
+        print(f"     {dim(tk['status'])} · {dim(tk.get('assigned_to',''))} · {dim(str(tk.get('comment_count', 0)))} {t('cli_comments')}")
+    print()
+    return 0
+
+def cmd_tickets_bulk(client, args):
+    """tickets bulk --status=open [--ids=T-0001,T-0002] priority=high assigned_to=monitor"""
+    flt, changes = {}, {}
+    for a in args:
+        if "=" not in a:
+            continue
+        k, v = a.split("=", 1)
+        if k.startswith("--"):
+            flt[k[2:]] = [i for i in v.split(",") if i] if k == "--ids" else v
+        else:
+            changes[k] = v
+    if not flt or not changes:
+        print(red("Usage: tickets bulk --status=open|--assigned_to=…|--priority=…|--ids=T-1,T-2 field=value …"))
+        return 1
+    data, err = client._post("/api/tickets/bulk", {"filter": flt, "changes": changes})
+    if err: print(red(f"❌ {err}")); return 1
+    if not data.get("ok"):
+        print(red(f"❌ {data.get('error', 'bulk update failed')}")); return 1
+    print(green(f"  ✅ Updated {data['updated']} ticket(s)"))
+    if data["ids"]:
+        print(dim("     " + ", ".join(data["ids"])))
+    return 0
+
+def cmd_tickets_search(client, args):
+    """tickets search <words…> [--limit=N]"""
+    limit = next((a.split("=", 1)[1] for a in args if a.startswith("--limit=")), "20")
+    query = " ".join(a for a in args if not a.startswith("--"))
+    if not query:
+        print(red("Usage: tickets search <words…> [--limit=N]   (word* matches a prefix)")); return 1
+    import urllib.parse
+    data, err = client._get("/api/tickets/search", {"q": urllib.parse.quote(query), "limit": limit})
+    if err: print(red(f"❌ {err}")); return 1
+    results = data.get("results", [])
+    if not results:
+        print(dim(f"  No tickets match “{query}”")); return 0
+    print(bold(f"\n🔎 {len(results)} result(s) for “{query}”") + dim(f"  ({data.get('took_ms', 0)} ms)\n"))
+    for tk in results:
+        print(f"  {cyan(tk['id']):<20} {bold(tk['title'] or '')}  {dim(tk.get('status') or '')}"
+              f"  {dim(format(tk.get('score', 0), '.2f'))}")
     print()
     return 0
 
@@ -364,19 +416,18 @@ def cmd_test(client, args):
         if not working:
             errors.append("no working engines")
     # 5. Tickets API
-    data, err = client._get("/api/tickets")
+    tdata, err = client._get("/api/tickets", {"fields": "status"})
     if err:
         print(red(f"  🔴 Tickets API: {err}")); errors.append("tickets")
     else:
-        print(green(f"  ✅ Tickets API: {len(data)} tickets"))
+        print(green(f"  ✅ Tickets API: {len(tdata)} tickets"))
     # 6. Stats API
     data, err = client._get("/api/stats")
     if err:
         print(red(f"  🔴 Stats API: {err}")); errors.append("stats")
     else:
         print(green(f"  ✅ Stats API OK"))
-    # 7. Ticket diff (quick test)
-    tdata, _ = client._get("/api/tickets")
+    # 7. Ticket diff (quick test) — reuses the ticket list from step 5
     if tdata and len(tdata) > 0:
         tid = tdata[0]["id"]
         dd, derr = client._get(f"/api/ticket-diff/{tid}")
@@ -447,6 +498,18 @@ def cmd_doctor(client, args):
     print()
     return 1 if fixes else 0
 
+def cmd_db_compact(client, args):
+    print(yellow("🗜️  Compacting event store…"))
+    data, err = client._post("/api/db/compact", {"vacuum": "--vacuum" in args}, timeout=600)
+    if err: print(red(f"❌ {err}")); return 1
+    if not data.get("ok"):
+        print(red(f"❌ {data.get('error', 'compaction failed')}")); return 1
+    print(green(f"  ✅ Archived {data['archived']} events into {data['segments']} segment(s), "
+                f"freed {data['freed_pages']} pages"))
+    for pattern, n in data.get("by_pattern", {}).items():
+        print(f"     {cyan(pattern):<24} {n}")
+    return 0
+
 def cmd_pipeline(client, args):
     if not args: print(red("Usage: pipeline <ticket_id>")); return 1
     tid = args[0]
@@ -462,7 +525,7 @@ COMMANDS = {
     "launch":     (cmd_launch,     "🚀 launch [stack] — launch stacks (default: all)"),
     "ask":        (cmd_ask,        "🧠 ask <text>   — free-text LLM query"),
     "action":     (cmd_action,     "▶️  action <val> — raw wizard action value"),
-    "tickets":    (cmd_tickets,    "🎫 List all tickets"),
+    "tickets":    (cmd_tickets,    "🎫 tickets [search <words> | bulk --status=… field=value]"),
     "diff":       (cmd_diff,       "📄 diff <T-XXXX> — show ticket diff and commits"),
     "pipeline":   (cmd_pipeline,   "🔄 pipeline <T-XXXX> — run full pipeline for ticket"),
     "engines":    (cmd_engines,    "🤖 Show LLM engine status"),
@@ -470,6 +533,7 @@ COMMANDS = {
     "dev-logs":   (cmd_dev_logs,   "📋 dev-logs [N] — ssh-developer container logs"),
     "test":       (cmd_test,       "🧪 Full system self-test"),
     "doctor":     (cmd_doctor,     "🩺 Diagnose issues and suggest fixes"),
+    "db-compact": (cmd_db_compact, "🗜️  db-compact [--vacuum] — archive expired events"),
 }
 
 # ── Interactive REPL ──────────────────────────────────────────────────────────
@@ -543,8 +607,9 @@ def run_tui(client):
                 if h:
                     with state["lock"]:
                         state["processes"] = h.get("containers", [])
-                # Use events_since for efficient incremental sync from SQLite
-                ev, _ = client.events_since(state["event_cursor"])
+                # Use events_since for efficient incremental sync from SQLite;
+                # the server filters to the two event types the TUI renders
+                ev, _ = client.events_since(state["event_cursor"], types=("message", "log_line"))
                 if ev:
                     new_chat = []
                     new_logs = []
@@ -568,7 +633,7 @@ def run_tui(client):
                         elif e["event"] == "log_line":
                             new_logs.append(e["data"].get("text", ""))
                     with state["lock"]:
-                        state["event_cursor"] = ev.get("max_id", state["event_cursor"])
+                        state["event_cursor"] = ev.get("cursor", ev.get("max_id", state["event_cursor"]))
                         if new_chat:
                             state["chat"].extend(new_chat)
                             state["chat"] = state["chat"][-400:]
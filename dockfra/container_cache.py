@@ -0,0 +1,225 @@
+"""
+dockfra.container_cache — In-memory `docker ps` view kept current by Docker events.
+
+docker_ps() used to spawn `docker ps` on every call; the dashboard, the TUI
+health poll and the wizard steps call it many times a second.  The cache is
+seeded with one snapshot and then follows the container event stream:
+
+  - start / restart / die / pause / unpause / destroy / health_status
+    events patch the cached row immediately;
+  - events that change more than the health suffix (ports, restart state)
+    also schedule a coalesced re-snapshot `resync_delay` seconds later,
+    taken by the next reader — a burst from `docker compose up` costs one;
+  - a snapshot older than `ttl` is re-taken on read (missed-event safety
+    net); while no event stream is connected `fallback_ttl` applies;
+  - rows(refresh=True) always re-snapshots;
+  - wait_for_event() lets callers block until something changes.
+
+Rows keep the `docker ps` shape ({"name", "status", "ports"}) with the same
+status wording ("Up …", "Exited (1) …", "(healthy)"), so callers that match
+on those substrings are unchanged.
+
+Usage:
+    cache = ContainerCache(snapshot_fn)
+    cache.rows()              # from memory
+    cache.rows(refresh=True)  # forced snapshot
+    cache.stats()
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+import subprocess
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_HEALTH_SUFFIX = re.compile(r"\s*\((?:healthy|unhealthy|health: starting)\)")
+# Actions after which a fresh snapshot is needed for exact status / ports
+# (stop, kill and oom are always followed by die)
+_RESYNC_ACTIONS = frozenset({"start", "restart", "die", "pause", "unpause"})
+
+
+def docker_events():
+    """Container events from `docker events` as dicts; ends when the stream does.
+
+    Yields None first, once the client is still running after a moment —
+    i.e. connected to the daemon — so a quiet stream still counts as live.
+    """
+    proc = subprocess.Popen(
+        ["docker", "events", "--format", "{{json .}}", "--filter", "type=container"],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        try:
+            proc.wait(timeout=0.5)
+            return  # exited straight away: daemon unreachable
+        except subprocess.TimeoutExpired:
+            yield None
+        for line in proc.stdout:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+class ContainerCache:
+    """Thread-safe container list seeded by `snapshot` and patched by `events`.
+
+    `events` is a callable returning an iterator of Docker event dicts, with
+    None marking "connected" (see docker_events); None disables watching.
+    """
+
+    def __init__(self, snapshot, events=docker_events, ttl: float = 30.0,
+                 fallback_ttl: float = 2.0, resync_delay: float = 0.5,
+                 reconnect_delay: float = 5.0):
+        self._snapshot = snapshot
+        self._events = events
+        self.ttl = ttl
+        self.fallback_ttl = fallback_ttl
+        self.resync_delay = resync_delay
+        self.reconnect_delay = reconnect_delay
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # one snapshot at a time; others wait for it
+        self._changed = threading.Condition(self._lock)  # notified on every event
+        self._rows: dict[str, dict] = {}
+        self._synced_at = 0.0
+        self._resync_at: float | None = None
+        self._event_seq = 0
+        self._watcher: threading.Thread | None = None
+        self._watching = False
+        self._stopped = threading.Event()
+        self._stats = {"reads": 0, "snapshots": 0, "events": 0}
+
+    # ── public ────────────────────────────────────────────────────────────────
+
+    def rows(self, refresh: bool = False) -> list[dict]:
+        """Current containers; re-snapshots only when forced, stale or patched."""
+        self._ensure_watcher()
+        with self._lock:
+            self._stats["reads"] += 1
+            if not refresh and self._fresh(time.monotonic()):
+                return [dict(r) for r in self._rows.values()]
+            synced_at = self._synced_at
+        with self._sync_lock:
+            with self._lock:
+                # Another reader re-snapshotted while we waited
+                if self._synced_at != synced_at and self._fresh(time.monotonic()):
+                    return [dict(r) for r in self._rows.values()]
+            self._resync()
+        with self._lock:
+            return [dict(r) for r in self._rows.values()]
+
+    def wait_for_event(self, timeout: float) -> bool:
+        """Block until the next container event; False if `timeout` passes first."""
+        self._ensure_watcher()
+        with self._changed:
+            seq = self._event_seq
+            return self._changed.wait_for(lambda: self._event_seq != seq, timeout)
+
+    def invalidate(self) -> None:
+        """Make the next read take a fresh snapshot."""
+        with self._lock:
+            self._synced_at = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "containers": len(self._rows), "watching": self._watching,
+                    "age_s": round(time.monotonic() - self._synced_at, 3) if self._synced_at else None}
+
+    def close(self) -> None:
+        self._stopped.set()
+
+    # ── internal ──────────────────────────────────────────────────────────────
+
+    def _fresh(self, now: float) -> bool:
+        """Caller holds _lock."""
+        if not self._synced_at:
+            return False
+        if self._resync_at is not None and now >= self._resync_at:
+            return False
+        return now - self._synced_at < (self.ttl if self._watching else self.fallback_ttl)
+
+    def _resync(self) -> None:
+        """Take a snapshot and install it. Caller holds _sync_lock."""
+        with self._lock:
+            seq = self._event_seq
+        rows = self._snapshot()
+        now = time.monotonic()
+        with self._lock:
+            self._rows = {r["name"]: dict(r) for r in rows}
+            self._synced_at = now
+            self._stats["snapshots"] += 1
+            # Events that raced the snapshot may not be in it — reconcile again soon
+            self._resync_at = now + self.resync_delay if self._event_seq != seq else None
+
+    def _ensure_watcher(self) -> None:
+        if self._watcher is not None or self._events is None:
+            return
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, daemon=True,
+                                                 name="container-events")
+                self._watcher.start()
+
+    def _watch(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                stream = self._events()
+                for ev in stream:
+                    if self._stopped.is_set():
+                        break
+                    if ev is None:
+                        # (Re)connected: events may have been missed meanwhile
+                        with self._lock:
+                            self._watching = True
+                            self._synced_at = 0.0
+                        continue
+                    self._apply(ev)
+            except FileNotFoundError:
+                logger.info("docker CLI not found — container cache falls back to polling")
+                return
+            except Exception as e:
+                logger.debug("docker events stream failed: %s", e)
+            with self._lock:
+                self._watching = False
+            self._stopped.wait(self.reconnect_delay)
+
+    def _apply(self, ev: dict) -> None:
+        if ev.get("Type", "container") != "container":
+            return
+        action = ev.get("Action") or ev.get("status") or ""
+        attrs = (ev.get("Actor") or {}).get("Attributes") or {}
+        name = attrs.get("name") or ev.get("from", "")
+        if not name:
+            return
+        with self._lock:
+            self._stats["events"] += 1
+            self._event_seq += 1
+            self._changed.notify_all()
+            row = self._rows.get(name)
+            if action.startswith("health_status"):
+                if row is not None:
+                    state = action.partition(":")[2].strip()
+                    suffix = "(health: starting)" if state == "starting" else f"({state})"
+                    row["status"] = f"{_HEALTH_SUFFIX.sub('', row['status'])} {suffix}"
+                return
+            if action == "destroy":
+                self._rows.pop(name, None)
+                return
+            if action not in _RESYNC_ACTIONS:
+                return
+            if row is None:
+                row = self._rows[name] = {"name": name, "status": "", "ports": ""}
+            if action in ("start", "restart", "unpause"):
+                row["status"] = "Up Less than a second"
+            elif action == "pause":
+                row["status"] = f"{row['status'] or 'Up'} (Paused)"
+            else:
+                row["status"] = f"Exited ({attrs.get('exitCode', '0')}) Less than a second ago"
+            if self._resync_at is None:
+                self._resync_at = time.monotonic() + self.resync_delay
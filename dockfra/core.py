@@ -15,7 +15,7 @@ __all__ = [
     # Docker
     '_docker_client', '_docker_sdk', '_DOCKER_SDK_AVAILABLE',
     # State
-    '_state', '_conversation', '_logs', '_tl', '_log_buffer',
+    '_state', '_conversation', '_logs', '_history_clock', '_tl', '_log_buffer',
     '_sid_emit', 'reset_state',
     '_ENV_TO_STATE', '_STATE_TO_ENV',
     # Paths & project config
@@ -26,7 +26,7 @@ __all__ = [
     'ENV_SCHEMA', '_schema_defaults', 'load_env', 'save_env',
     'save_state', 'load_state', '_STATE_FILE', '_STATE_SKIP_PERSIST',
     # Helpers
-    'detect_config', '_emit_log_error', 'run_cmd', 'docker_ps',
+    'detect_config', '_emit_log_error', 'run_cmd', 'docker_ps', '_container_cache', '_log_mux',
     'mask', 'msg', 'widget', 'buttons', 'text_input', 'select',
     'code_block', 'status_row', 'progress', 'action_grid', 'clear_widgets',
     '_env_status_summary',
@@ -38,11 +38,17 @@ __all__ = [
     '_PROJECT_CONFIG',
     # Health
     '_HEALTH_PATTERNS', '_docker_logs', '_analyze_container_log',
+    '_health_analyzer', '_analyze_containers', '_wait_containers_settled',
 ]
 from collections import deque
 from pathlib import Path
 from flask import Flask, render_template, request
 from flask_socketio import SocketIO, emit
+from .container_cache import ContainerCache
+from .health_analyzer import HealthAnalyzer, wait_until_settled
+from .log_mux import LogMux, DockerCLISource, DockerSDKSource
+from .ring_log import RingLog, SeqClock
+from .log_patterns import PatternSet
 from .i18n import t as _t_i18n, set_lang as _set_lang, get_lang as _get_lang, llm_lang_instruction as _llm_lang_instruction, _STRINGS
 
 if TYPE_CHECKING:
@@ -76,6 +82,10 @@ def _docker_client():
     except Exception:
         return None
 
+# Container logs followed once and served from memory (see log_mux.py)
+_log_mux = LogMux(DockerSDKSource(_docker_client) if _DOCKER_SDK_AVAILABLE else DockerCLISource(),
+                  max_bytes=int(os.environ.get("DOCKFRA_LOG_BUFFER_BYTES", str(512 * 1024))))
+
 def _build_wizard_prompt() -> str:
     """Build system prompt dynamically from discovered stacks."""
     try:
@@ -142,10 +152,11 @@ def _sid_emit(event, data):
     """Emit to all clients, persist to SQLite, and optionally collect for REST."""
     # Determine source: 'cli' when in REST/collector mode, 'web' otherwise
     src = 'cli' if getattr(_tl, 'collector', None) is not None else 'web'
-    # Persist to SQLite (always — shared between CLI and web)
+    # Persist to SQLite (always — shared between CLI and web; group-committed
+    # by the db write-behind queue so streaming threads never wait on fsync)
     try:
         from . import db as _db
-        _db.append_event(event, data, src=src)
+        _db.enqueue_event(event, data, src=src)
     except Exception:
         pass
     # REST API collector mode: capture all emitted events
@@ -737,8 +748,13 @@ except ImportError:
     socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading", manage_session=False)
 
 _state: dict = {}
-_conversation: list[dict] = []
-_logs: list[dict] = []
+# Chat messages and run_cmd output in bounded rings (oldest evicted first);
+# one SeqClock so /api/history?since= covers both (see ring_log.py)
+_history_clock = SeqClock()
+_conversation = RingLog(int(os.environ.get("DOCKFRA_HISTORY_MESSAGES", "2000")),
+                        id_prefix="msg", clock=_history_clock)
+_logs = RingLog(int(os.environ.get("DOCKFRA_HISTORY_LOGS", "10000")),
+                id_prefix="log", clock=_history_clock)
 
 # mapping: ENV key → _state key (auto-generated from ENV_SCHEMA)
 # Special cases for backward compat (old code uses these state key names)
@@ -913,31 +929,24 @@ def _emit_health_unbound_var_form(line: str, btns: list):
 
 def _match_config_error(line: str, fired: set):
     """Check line against config-error patterns. Returns True if matched."""
-    import re as _re
-    for pattern, title, desc, fields, settings_group in _CONFIG_ERROR_PATTERNS:
-        key = "cfg:" + pattern[:40]
-        if key in fired:
-            continue
-        m = _re.search(pattern, line, _re.IGNORECASE)
-        if not m:
-            continue
-        extra_fields = list(fields)
-        if not extra_fields and m.lastindex:
-            for gi in range(1, m.lastindex + 1):
-                try:
-                    var = m.group(gi)
-                    if var and _re.match(r'^[A-Z][A-Z0-9_]{2,}$', var):
-                        extra_fields = [_build_env_var_field(var)]
-                        break
-                except Exception:
-                    pass
-        _title = _t_i18n(title) if title in _STRINGS else title
-        _desc = _t_i18n(desc) if desc in _STRINGS else desc
-        _resolved_fields = [{**f, "label": (_t_i18n(f["label"]) if f["label"] in _STRINGS else f["label"])} for f in extra_fields]
-        _emit_config_form(_title, _t_i18n('detected_in_logs', line=line.strip()[:120], desc=_desc),
-                          _resolved_fields, settings_group, key, fired)
-        return True
-    return False
+    hit = _CONFIG_MATCHER.search(line, skip=fired)
+    if hit is None:
+        return False
+    _pattern, title, desc, fields, settings_group = hit.payload
+    m = hit.match
+    extra_fields = list(fields)
+    if not extra_fields and m.lastindex:
+        for gi in range(1, m.lastindex + 1):
+            var = m.group(gi)
+            if var and _ENV_VAR_NAME_RE.match(var):
+                extra_fields = [_build_env_var_field(var)]
+                break
+    _title = _t_i18n(title) if title in _STRINGS else title
+    _desc = _t_i18n(desc) if desc in _STRINGS else desc
+    _resolved_fields = [{**f, "label": (_t_i18n(f["label"]) if f["label"] in _STRINGS else f["label"])} for f in extra_fields]
+    _emit_config_form(_title, _t_i18n('detected_in_logs', line=line.strip()[:120], desc=_desc),
+                      _resolved_fields, settings_group, hit.key, fired)
+    return True
 
 
 def _emit_health_inline_form(line: str, btn_values: str, btns: list, network: str):
@@ -959,60 +968,54 @@ def _emit_health_inline_form(line: str, btn_values: str, btns: list, network: st
 
 def _emit_log_error(line: str, fired: set):
     """Check a single log line against health + config-error patterns; emit alerts/forms."""
-    import re as _re
     # ── Config-error patterns (API keys, auth, tool login) ───────────────────
     if _match_config_error(line, fired):
         return True
     # ── Docker health patterns ────────────────────────────────────────────────
-    for pattern, sev, message, solutions in _HEALTH_PATTERNS:
-        key = pattern[:40]
-        if key in fired or sev not in ("err", "warn"):
-            continue
-        m = _re.search(pattern, line, _re.IGNORECASE)
-        if not m:
+    hit = _HEALTH_ALERT_MATCHER.search(line, skip=fired)
+    if hit is None:
+        return False
+    _pattern, sev, message, solutions = hit.payload
+    m = hit.match
+    fired.add(hit.key)
+    port = ""
+    network = ""
+    if m.lastindex:
+        g = m.group(1)
+        if g and g.isdigit():
+            port = g
+    _nm = _NETWORK_CREATE_FAILED_RE.search(line)
+    if _nm:
+        network = _nm.group(1)
+    icon = "🔴" if sev == "err" else "🟡"
+    btns = []
+    for b in solutions:
+        val = b["value"].replace("__PORT__", port).replace("__NETWORK__", network)
+        if "__NAME__" in val:
             continue
-        fired.add(key)
-        port = ""
-        network = ""
-        if m.lastindex:
-            try:
-                g = m.group(1)
-                if g and g.isdigit():
-                    port = g
-            except Exception:
-                pass
-        _nm = _re.search(r"failed to create network ([\w_-]+)", line)
-        if _nm:
-            network = _nm.group(1)
-        icon = "🔴" if sev == "err" else "🟡"
-        btns = []
-        for b in solutions:
-            val = b["value"].replace("__PORT__", port).replace("__NETWORK__", network)
-            if "__NAME__" in val:
-                continue
-            btns.append({"label": _t_i18n(b["label"]), "value": val})
-        _msg = _t_i18n(message, net=PROJECT['network']) if '{net}' in _t_i18n(message) else _t_i18n(message)
-        _sid_emit("message", {"role": "bot",
-                               "text": f"{icon} **{_msg}**\n`{line.strip()[:160]}`"})
-        btn_values = " ".join(b["value"] for b in btns)
-        _emit_health_inline_form(line, btn_values, btns, network)
-        return True
+        btns.append({"label": _t_i18n(b["label"]), "value": val})
+    _msg = _t_i18n(message, net=PROJECT['network']) if '{net}' in _t_i18n(message) else _t_i18n(message)
+    _sid_emit("message", {"role": "bot",
+                           "text": f"{icon} **{_msg}**\n`{line.strip()[:160]}`"})
+    btn_values = " ".join(b["value"] for b in btns)
+    _emit_health_inline_form(line, btn_values, btns, network)
+    return True
+
+
+_ENV_VAR_NAME_RE = _re.compile(r'^[A-Z][A-Z0-9_]{2,}$')
+_NETWORK_CREATE_FAILED_RE = _re.compile(r"failed to create network ([\w_-]+)")
+_MOTD_BOX_RE = _re.compile(r'^[╔┌╚└║╠╣│]')
+_MOTD_DRAWING_RE = _re.compile(r'[\s╔╗╚╝╠╣║═─━│┌┐└┘├┤┬┴┼▀▄█▌▐░▒▓]')
 
-    return False
 
 def _strip_motd_line(text: str) -> bool:
     """Return True if the line is a MOTD box-drawing line that should be suppressed."""
-    import re
     t = text.strip()
     if not t:
         return False
-    if re.match(r'^[╔┌╚└]', t):
-        return True
-    if re.match(r'^[║╠╣│]', t):
-        return True
-    if t and not re.sub(r'[\s╔╗╚╝╠╣║═─━│┌┐└┘├┤┬┴┼▀▄█▌▐░▒▓]', '', t):
+    if _MOTD_BOX_RE.match(t):
         return True
-    return False
+    return not _MOTD_DRAWING_RE.sub('', t)
 
 
 def run_cmd(cmd, cwd=None):
@@ -1035,9 +1038,8 @@ def run_cmd(cmd, cwd=None):
         if _strip_motd_line(text):
             continue
         lines.append(text)
-        log_id = f"log-{len(_logs)}"
-        _logs.append({"id": log_id, "text": text, "timestamp": time.time()})
-        _sid_emit("log_line", {"id": log_id, "text": text})
+        entry = _logs.append({"text": text, "timestamp": time.time()})
+        _sid_emit("log_line", {"id": entry["id"], "text": text})
         try:
             if _emit_log_error(text, _fired):
                 _had_fixes = True
@@ -1050,7 +1052,8 @@ def run_cmd(cmd, cwd=None):
         pass
     return proc.returncode, "\n".join(lines)
 
-def docker_ps():
+def _docker_ps_snapshot():
+    """One `docker ps` run (Docker SDK as fallback) as [{name, status, ports}]."""
     try:
         out = subprocess.check_output(
             ["docker","ps","--format","{{.Names}}::{{.Status}}::{{.Ports}}"],
@@ -1075,12 +1078,22 @@ def docker_ps():
         except Exception:
             return []
 
+# docker ps view kept current by `docker events` (see container_cache.py);
+# DOCKFRA_CONTAINER_CACHE_TTL=0 spawns `docker ps` on every call instead
+_CONTAINER_CACHE_TTL = float(os.environ.get("DOCKFRA_CONTAINER_CACHE_TTL", "30"))
+_container_cache = ContainerCache(_docker_ps_snapshot, ttl=_CONTAINER_CACHE_TTL)
+
+def docker_ps(refresh=False):
+    """Running containers from memory; refresh=True forces a fresh `docker ps`."""
+    if _CONTAINER_CACHE_TTL <= 0:
+        return _docker_ps_snapshot()
+    return _container_cache.rows(refresh=refresh)
+
 def mask(k): return k[:12]+"..."+k[-4:] if len(k)>=16 else "***"
 
 def msg(text, role="bot"):
-    msg_id = f"msg-{len(_conversation)}"
-    _conversation.append({"id": msg_id, "role": role, "text": text, "timestamp": time.time()})
-    _sid_emit("message", {"id": msg_id, "role": role, "text": text}); time.sleep(0.04)
+    m = _conversation.append({"role": role, "text": text, "timestamp": time.time()})
+    _sid_emit("message", {"id": m["id"], "role": role, "text": text}); time.sleep(0.04)
 def widget(w):                      _sid_emit("widget",    w);                          time.sleep(0.04)
 def buttons(items, label=""):       widget({"type":"buttons",  "label":label, "items":items})
 def text_input(n,l,ph="",v="",sec=False,hint="",chips=None,modal_type="",desc="",autodetect=False,help_url=""): widget({"type":"input","name":n,"label":l,"placeholder":ph,"value":v,"secret":sec,"hint":hint,"chips":chips or [],"modal_type":modal_type,"desc":desc,"autodetect":autodetect,"help_url":help_url})
@@ -1552,6 +1565,10 @@ _CONFIG_ERROR_PATTERNS = [
      ""),
 ]
 
+# All config-error rules in one pass per line; payload is the rule tuple
+_CONFIG_MATCHER = PatternSet([(r[0], r) for r in _CONFIG_ERROR_PATTERNS],
+                             keys=["cfg:" + r[0][:40] for r in _CONFIG_ERROR_PATTERNS])
+
 
 def _emit_config_form(title: str, desc: str, fields: list, settings_group: str,
                       fired_key: str, fired: set):
@@ -1653,6 +1670,11 @@ _HEALTH_PATTERNS = [
       {"label":"clean_unused_networks","value":"fix_network_overlap::"}]),
 ]
 
+# _analyze_container_log considers every rule; streamed lines only raise err/warn alerts
+_HEALTH_MATCHER = PatternSet([(r[0], r) for r in _HEALTH_PATTERNS])
+_HEALTH_ALERT_MATCHER = PatternSet([(r[0], r) for r in _HEALTH_PATTERNS if r[1] in ("err", "warn")],
+                                   keys=[r[0][:40] for r in _HEALTH_PATTERNS if r[1] in ("err", "warn")])
+
 def _docker_logs(name: str, tail: int = 40) -> str:
     """Get container logs — shell first, SDK fallback."""
     try:
@@ -1676,22 +1698,55 @@ def _analyze_container_log(name: str) -> tuple[str, list]:
         out = _docker_logs(name, tail=40)
     except Exception as e:
         return f"Nie można pobrać logów: {e}", []
-    import re
-    for pattern, sev, message, solutions in _HEALTH_PATTERNS:
-        m = re.search(pattern, out, re.IGNORECASE)
-        if m:
-            port = m.group(1) if m.lastindex and m.group(1).isdigit() else ""
-            fixed_btns = [
-                {"label": _t_i18n(b["label"]), "value": b["value"].replace("__PORT__", port).replace("__NAME__", name)}
-                for b in solutions
-            ]
-            # add LLM analysis button
-            fixed_btns.append({"label":_t_i18n('analyze_with_ai'),"value":f"ai_analyze::{name}"})
-            snippet = "\n".join(out.strip().splitlines()[-6:])
-            _msg = _t_i18n(message) if message in _STRINGS else message
-            return f"**{_msg}**\n```\n{snippet}\n```", fixed_btns
+    hit = _HEALTH_MATCHER.search(out)
+    if hit is not None:
+        _pattern, sev, message, solutions = hit.payload
+        m = hit.match
+        port = m.group(1) if m.lastindex and (m.group(1) or "").isdigit() else ""
+        fixed_btns = [
+            {"label": _t_i18n(b["label"]), "value": b["value"].replace("__PORT__", port).replace("__NAME__", name)}
+            for b in solutions
+        ]
+        # add LLM analysis button
+        fixed_btns.append({"label":_t_i18n('analyze_with_ai'),"value":f"ai_analyze::{name}"})
+        snippet = "\n".join(out.strip().splitlines()[-6:])
+        _msg = _t_i18n(message) if message in _STRINGS else message
+        return f"**{_msg}**\n```\n{snippet}\n```", fixed_btns
     # No known pattern — return last lines
     snippet = "\n".join(out.strip().splitlines()[-5:])
     return (_t_i18n('unknown_error_logs', snippet=snippet),
             [{"label":_t_i18n('analyze_with_ai'),"value":f"ai_analyze::{name}"},
              {"label":_t_i18n('show_full_logs'),"value":f"logs::{name}"}])
+
+
+def _analyze_container_log_in(name: str, lang: str) -> tuple[str, list]:
+    _set_lang(lang)  # the language is per thread; pool workers start without one
+    return _analyze_container_log(name)
+
+
+# Findings cached per container id + restart count; a failed log read
+# (no buttons) is retried on the next call
+_health_analyzer = HealthAnalyzer(
+    _analyze_container_log_in,
+    max_workers=int(os.environ.get("DOCKFRA_HEALTH_WORKERS", "8")),
+    cache_if=lambda result: bool(result[1]))
+
+
+def _analyze_containers(names: list[str]) -> list[tuple[str, list]]:
+    """(finding_text, buttons) for each container, analysed in parallel."""
+    return _health_analyzer.analyze_many(names, _get_lang())
+
+
+_LAUNCH_SETTLE = float(os.environ.get("DOCKFRA_LAUNCH_SETTLE", "3"))
+_LAUNCH_SETTLE_TIMEOUT = float(os.environ.get("DOCKFRA_LAUNCH_SETTLE_TIMEOUT", "30"))
+
+
+def _wait_containers_settled() -> list[dict]:
+    """After `docker compose up`: wait until containers are healthy, failed or quiet."""
+    if _CONTAINER_CACHE_TTL <= 0:
+        wait = lambda t: time.sleep(t)  # no event stream — poll
+        rows = _docker_ps_snapshot
+    else:
+        wait, rows = _container_cache.wait_for_event, docker_ps
+    wait_until_settled(rows, wait, timeout=_LAUNCH_SETTLE_TIMEOUT, quiet=_LAUNCH_SETTLE)
+    return docker_ps(refresh=True)
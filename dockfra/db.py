@@ -6,38 +6,242 @@ Open/Closed: New event types need no schema changes.
 Dependency Inversion: Pure functions, no framework dependencies.
 
 Tables:
-  events — append-only log of all system events (immutable)
+  events           — append-only log of all system events (immutable),
+                     indexed on (event, id) and (src, id) for filtered cursors
+  archive_segments — index of compacted event ranges (see compact())
+  projection_snapshots — persisted read-model state (see dockfra.projections)
+
+Schema:
+  MIGRATIONS lists versioned upgrade steps; init_db applies the ones newer
+  than PRAGMA user_version.
+
+Retention:
+  compact() moves events older than their retention policy (per event-type
+  glob, DOCKFRA_DB_RETENTION="log_line=24h,widget=7d") into gzip JSONL
+  archive segments, one file per UTC day next to the database.  get_events
+  merges archived rows back in transparently when a cursor reaches into an
+  archived range.
+
+Write-behind:
+  start_write_behind() enables an in-memory queue drained by one background
+  writer in group commits (enqueue_event).  Reads through this module flush
+  the calling thread's pending events first, so the emitting thread always
+  sees its own writes.
+
+Connections:
+  One long-lived writer connection (serialized by _db_lock) and one reader
+  connection per thread.  The database runs in WAL mode so readers never
+  block the writer.  DOCKFRA_DB_SYNC selects the `synchronous` level
+  (OFF | NORMAL | FULL, default NORMAL — durable across app crashes, may
+  lose the last commit on power loss).
 """
+import os
+import gzip
+import fnmatch
 import sqlite3
 import json
 import time
+import logging
 import threading
+import weakref
+from collections import deque
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
 
 _DB_PATH: Optional[Path] = None
 _db_lock = threading.Lock()
 
+_SYNC_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+_SYNCHRONOUS = os.environ.get("DOCKFRA_DB_SYNC", "NORMAL").upper()
+if _SYNCHRONOUS not in _SYNC_LEVELS:
+    _SYNCHRONOUS = "NORMAL"
 
-def init_db(path) -> None:
+# Connection pool — invalidated by bumping _generation (init_db / close_db)
+_writer: Optional[sqlite3.Connection] = None
+_generation = 0
+_local = threading.local()
+_readers: list[sqlite3.Connection] = []
+_pool_lock = threading.Lock()
+
+# Statement text is kept constant so sqlite3's per-connection statement cache
+# reuses the prepared statement on every call.
+_SQL_INSERT = ("INSERT INTO events (ts, src, event, data, ref, role, text, flags) "
+               "VALUES (?,?,?,?,?,?,?,?)")
+_COLS = "id, ts, src, event, data, ref, role, text, flags"
+# MAX(id) falls back to the AUTOINCREMENT sequence when every row has been archived
+_SQL_MAX_ID = ("SELECT COALESCE(MAX(id), "
+               "(SELECT seq FROM sqlite_sequence WHERE name = 'events'), 0) FROM events")
+_SQL_LATEST = f"SELECT {_COLS} FROM events WHERE event = ? ORDER BY id DESC LIMIT ?"
+
+# Typed payloads — the hot event shapes are stored in the ref/role/text/flags
+# columns with data = '' so reads rebuild them without json.loads.  Anything
+# that does not match a shape exactly (extra keys, non-string values) is
+# stored as JSON text as before.  DOCKFRA_DB_TYPED_PAYLOADS=0 disables the
+# typed encoding for new rows; existing typed rows stay readable.
+_TYPED_PAYLOADS = os.environ.get("DOCKFRA_DB_TYPED_PAYLOADS", "1") != "0"
+# event → payload keys allowed in the id→ref, role, text columns
+_TYPED_TEXT = {
+    "log_line": frozenset(("id", "text")),
+    "message": frozenset(("id", "role", "text")),
+}
+_PROGRESS_KEYS = frozenset(("type", "label", "done", "error"))
+
+
+def init_db(path, synchronous: Optional[str] = None) -> None:
     """Initialize SQLite database and create schema if needed."""
     global _DB_PATH
+    wb_config = _wb.config if _wb else None
+    close_db()
+    if synchronous:
+        set_synchronous(synchronous)
     _DB_PATH = Path(path)
     _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with _connect() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS events (
-                id    INTEGER PRIMARY KEY AUTOINCREMENT,
-                ts    REAL    NOT NULL,
-                src   TEXT    NOT NULL DEFAULT 'system',
-                event TEXT    NOT NULL,
-                data  TEXT    NOT NULL DEFAULT '{}'
-            )
-        """)
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_id ON events(id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_event ON events(event)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_src ON events(src)")
-        conn.commit()
+    with _db_lock:
+        conn = _writer_conn()
+        # Only takes effect on a fresh file; compact(vacuum=True) converts old DBs
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        _migrate(conn)
+    _refresh_archive_high_water()
+    if wb_config:
+        start_write_behind(**wb_config)
+
+
+# ── Schema migrations ────────────────────────────────────────────────────────
+
+# (version, description, statements).  PRAGMA user_version records the last
+# applied version; each step runs in its own transaction.  Never edit a
+# released step — append a new one.  Steps before 4 use IF NOT EXISTS so
+# databases created before versioning (user_version 0) upgrade cleanly.
+MIGRATIONS: list = [
+    (1, "events table", [
+        """CREATE TABLE IF NOT EXISTS events (
+            id    INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts    REAL    NOT NULL,
+            src   TEXT    NOT NULL DEFAULT 'system',
+            event TEXT    NOT NULL,
+            data  TEXT    NOT NULL DEFAULT '{}'
+        )""",
+    ]),
+    (2, "archive_segments", [
+        """CREATE TABLE IF NOT EXISTS archive_segments (
+            id      INTEGER PRIMARY KEY AUTOINCREMENT,
+            day     TEXT    NOT NULL,
+            path    TEXT    NOT NULL,
+            offset  INTEGER NOT NULL,
+            length  INTEGER NOT NULL,
+            min_id  INTEGER NOT NULL,
+            max_id  INTEGER NOT NULL,
+            rows    INTEGER NOT NULL,
+            created REAL    NOT NULL
+        )""",
+    ]),
+    (3, "projection_snapshots", [
+        """CREATE TABLE IF NOT EXISTS projection_snapshots (
+            name    TEXT    PRIMARY KEY,
+            version INTEGER NOT NULL,
+            last_id INTEGER NOT NULL,
+            state   TEXT    NOT NULL,
+            updated REAL    NOT NULL
+        )""",
+    ]),
+    # Filtered cursors (event = ? / src = ? with id > ? ORDER BY id) walk one
+    # composite index in id order instead of sorting; idx_events_id duplicated
+    # the rowid and the single-column indexes are prefixes of the new ones.
+    (4, "composite (event, id) and (src, id) indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_events_event_id ON events(event, id)",
+        "CREATE INDEX IF NOT EXISTS idx_events_src_id ON events(src, id)",
+        "DROP INDEX IF EXISTS idx_events_id",
+        "DROP INDEX IF EXISTS idx_events_event",
+        "DROP INDEX IF EXISTS idx_events_src",
+    ]),
+    # Typed payload columns (see _encode); existing rows of the hot shapes
+    # are converted in place so bulk reads skip json.loads for them too.
+    (5, "typed payload columns for log_line / message / progress", [
+        "ALTER TABLE events ADD COLUMN ref TEXT",
+        "ALTER TABLE events ADD COLUMN role TEXT",
+        "ALTER TABLE events ADD COLUMN text TEXT",
+        "ALTER TABLE events ADD COLUMN flags INTEGER",
+        """UPDATE events SET ref = json_extract(data, '$.id'), text = json_extract(data, '$.text'), data = ''
+           WHERE event = 'log_line' AND json_valid(data) AND json_type(data) = 'object'
+             AND NOT EXISTS (SELECT 1 FROM json_each(events.data)
+                             WHERE key NOT IN ('id', 'text') OR type != 'text')""",
+        """UPDATE events SET ref = json_extract(data, '$.id'), role = json_extract(data, '$.role'),
+                             text = json_extract(data, '$.text'), data = ''
+           WHERE event = 'message' AND json_valid(data) AND json_type(data) = 'object'
+             AND NOT EXISTS (SELECT 1 FROM json_each(events.data)
+                             WHERE key NOT IN ('id', 'role', 'text') OR type != 'text')""",
+        """UPDATE events SET text = json_extract(data, '$.label'),
+                             flags = json_extract(data, '$.done') | (json_extract(data, '$.error') << 1),
+                             data = ''
+           WHERE event = 'widget' AND json_valid(data) AND json_type(data) = 'object'
+             AND json_extract(data, '$.type') = 'progress'
+             AND json_type(data, '$.label') = 'text'
+             AND json_type(data, '$.done') IN ('true', 'false')
+             AND json_type(data, '$.error') IN ('true', 'false')
+             AND (SELECT COUNT(*) FROM json_each(events.data)) = 4""",
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version() -> int:
+    """Return the schema version of the open database (0 when none is open)."""
+    if not _DB_PATH:
+        return 0
+    with _db_lock:
+        return _writer_conn().execute("PRAGMA user_version").fetchone()[0]
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Apply pending MIGRATIONS in order. Caller holds _db_lock."""
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(f"Database schema v{current} is newer than this dockfra (v{SCHEMA_VERSION})")
+    for version, desc, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for stmt in statements:
+                conn.execute(stmt)
+            conn.execute(f"PRAGMA user_version={version}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info("Migrated event store to schema v%d (%s)", version, desc)
+
+
+def close_db() -> None:
+    """Flush pending writes and close all pooled connections (shutdown / DB switch)."""
+    global _writer, _generation
+    stop_write_behind()
+    with _db_lock, _pool_lock:
+        _generation += 1
+        conns = _readers[:] + ([_writer] if _writer else [])
+        _readers.clear()
+        _writer = None
+    for c in conns:
+        try:
+            c.close()
+        except Exception:
+            pass
+
+
+def set_synchronous(level: str) -> None:
+    """Change the `synchronous` pragma (OFF | NORMAL | FULL | EXTRA) at runtime."""
+    global _SYNCHRONOUS
+    level = level.upper()
+    if level not in _SYNC_LEVELS:
+        raise ValueError(f"synchronous must be one of {_SYNC_LEVELS}, got {level!r}")
+    _SYNCHRONOUS = level
+    with _db_lock:
+        if _writer is not None:
+            _writer.execute(f"PRAGMA synchronous={level}")
 
 
 # ── Commands (write side) ────────────────────────────────────────────────────
@@ -46,84 +250,280 @@ def append_event(event: str, data: dict, src: str = "system") -> int:
     """Append a single immutable event. Returns event ID."""
     if not _DB_PATH:
         return 0
+    _read_your_writes()
     try:
         with _db_lock:
-            with _connect() as conn:
-                cur = conn.execute(
-                    "INSERT INTO events (ts, src, event, data) VALUES (?,?,?,?)",
-                    (time.time(), src, event, json.dumps(data, ensure_ascii=False))
-                )
-                conn.commit()
-                return cur.lastrowid or 0
+            conn = _writer_conn()
+            cur = conn.execute(_SQL_INSERT, (time.time(), src, event, *_encode(event, data)))
+            conn.commit()
+            return cur.lastrowid or 0
     except Exception:
         return 0
 
 
-def append_batch(events: list[tuple[str, dict, str]]) -> list[int]:
-    """Append multiple events atomically. Each tuple: (event, data, src)."""
+def append_batch(events: list[tuple]) -> list[int]:
+    """Append multiple events atomically. Each tuple: (event, data, src[, ts])."""
     if not _DB_PATH or not events:
         return []
-    ids = []
+    _read_your_writes()
     try:
-        with _db_lock:
-            with _connect() as conn:
-                for event, data, src in events:
-                    cur = conn.execute(
-                        "INSERT INTO events (ts, src, event, data) VALUES (?,?,?,?)",
-                        (time.time(), src, event, json.dumps(data, ensure_ascii=False))
-                    )
-                    ids.append(cur.lastrowid or 0)
-                conn.commit()
+        return _insert_batch(events)
     except Exception:
-        return ids
-    return ids
+        return []
+
+
+def enqueue_event(event: str, data: dict, src: str = "system") -> None:
+    """Queue an event for group commit; falls back to append_event when write-behind is off.
+
+    `data` is copied (shallowly) when queued, so later changes to the caller's
+    dict do not leak into the stored event; nested values must not be mutated.
+    """
+    wb = _wb
+    if wb is None or not _DB_PATH:
+        ts = time.time()
+        eid = append_event(event, data, src=src)
+        if eid:
+            _notify_committed([(event, data, src, ts)], [eid])
+        return
+    _local.wb_seq = wb.put((event, dict(data), src, time.time()))
+
+
+def flush() -> None:
+    """Commit all queued events on the calling thread."""
+    wb = _wb
+    if wb is not None:
+        wb.flush()
+
+
+_commit_listeners: list = []
+
+
+def add_commit_listener(fn) -> None:
+    """Call fn(rows) after events from enqueue_event are committed, in id order.
+
+    rows are event dicts (id, ts, src, event, data) — the same shape get_events returns.
+    Events written directly through append_event/append_batch are not reported.
+    """
+    if fn not in _commit_listeners:
+        _commit_listeners.append(fn)
+
+
+def remove_commit_listener(fn) -> None:
+    if fn in _commit_listeners:
+        _commit_listeners.remove(fn)
+
+
+def _notify_committed(items: list[tuple], ids: list[int]) -> None:
+    if not _commit_listeners or not ids:
+        return
+    rows = [{"id": eid, "ts": it[3], "src": it[2], "event": it[0], "data": it[1]}
+            for it, eid in zip(items, ids)]
+    for fn in list(_commit_listeners):
+        try:
+            fn(rows)
+        except Exception:
+            logger.exception("Commit listener failed")
+
+
+# ── Write-behind queue (group commit) ────────────────────────────────────────
+
+class _WriteBehind:
+    """Bounded in-memory queue drained by one background writer in group commits.
+
+    A batch is committed when it reaches max_batch events or the oldest queued
+    event is max_delay seconds old.  When max_pending events are queued the
+    producer flushes synchronously (backpressure) instead of growing the queue.
+    Commit listeners run inside flush; their own reads and enqueues on that
+    thread never re-enter it (see _read_your_writes).
+    """
+
+    def __init__(self, max_batch: int = 256, max_delay: float = 0.05, max_pending: int = 10000):
+        self.config = {"max_batch": max_batch, "max_delay": max_delay, "max_pending": max_pending}
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.max_pending = max(self.max_batch, max_pending)
+        self._q: deque = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._enqueued = 0   # sequence number of the last queued event
+        self._committed = 0  # sequence number of the last written event
+        self._stop = False
+        self.stats = {"batches": 0, "events": 0, "largest_batch": 0, "backpressure": 0}
+        self._thread = threading.Thread(target=self._run, name="dockfra-db-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, item: tuple) -> int:
+        with self._cond:
+            full = len(self._q) >= self.max_pending
+        if full and not getattr(_local, "in_flush", False):
+            self.stats["backpressure"] += 1
+            self.flush()
+        with self._cond:
+            self._q.append(item)
+            self._enqueued += 1
+            # Wake the writer on the first event (starts the max_delay window)
+            # and when a full batch is ready.
+            if len(self._q) == 1 or len(self._q) >= self.max_batch:
+                self._cond.notify()
+            return self._enqueued
+
+    def flush(self, upto: Optional[int] = None) -> None:
+        """Write queued events on the calling thread (all, or until seq `upto` is committed)."""
+        with self._flush_lock:
+            _local.in_flush = True
+            try:
+                self._flush_locked(upto)
+            finally:
+                _local.in_flush = False
+
+    def _flush_locked(self, upto: Optional[int]) -> None:
+        """Caller holds _flush_lock."""
+        while True:
+            with self._cond:
+                if not self._q or (upto is not None and self._committed >= upto):
+                    return
+                n = min(len(self._q), self.max_batch)
+                batch = [self._q.popleft() for _ in range(n)]
+            try:
+                ids = _insert_batch(batch)
+            except Exception:
+                ids = []
+                logger.exception("Write-behind flush dropped %d events", len(batch))
+            # Still under _flush_lock, so listeners see batches in commit order
+            _notify_committed(batch, ids)
+            with self._cond:
+                self._committed += len(batch)
+                self.stats["batches"] += 1
+                self.stats["events"] += len(batch)
+                self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def pending(self) -> int:
+        return len(self._q)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._q and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                deadline = time.monotonic() + self.max_delay
+                while len(self._q) < self.max_batch and not self._stop:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self.flush()
+
+
+_wb: Optional[_WriteBehind] = None
+
+
+def start_write_behind(max_batch: int = 256, max_delay: float = 0.05,
+                       max_pending: int = 10000) -> None:
+    """Enable group-commit persistence for enqueue_event (restarts if already running)."""
+    global _wb
+    stop_write_behind()
+    _wb = _WriteBehind(max_batch=max_batch, max_delay=max_delay, max_pending=max_pending)
+
+
+def stop_write_behind() -> None:
+    """Flush the queue and stop the background writer (no-op when disabled)."""
+    global _wb
+    wb, _wb = _wb, None
+    if wb is not None:
+        wb.stop()
+
+
+def write_behind_stats() -> dict:
+    """Queue depth and group-commit counters (empty when write-behind is off)."""
+    wb = _wb
+    if wb is None:
+        return {}
+    return {**wb.stats, "pending": wb.pending(), **wb.config}
 
 
 # ── Queries (read side) ─────────────────────────────────────────────────────
 
+Filter = Union[str, Sequence[str], None]
+
+
 def get_events(since_id: int = 0, limit: int = 500,
-               event_type: Optional[str] = None,
-               src: Optional[str] = None) -> list:
-    """Query events with optional filters. Never modifies state."""
+               event_type: Filter = None,
+               src: Filter = None) -> list:
+    """Query events with optional filters. Never modifies state.
+
+    event_type / src take one value or a list; event types containing glob
+    characters (`ticket.*`) match with GLOB.
+    """
     if not _DB_PATH:
         return []
+    _read_your_writes()
     try:
-        clauses = ["id > ?"]
-        params: list = [since_id]
-        if event_type:
-            clauses.append("event = ?")
-            params.append(event_type)
-        if src:
-            clauses.append("src = ?")
-            params.append(src)
-        params.append(limit)
-        where = " AND ".join(clauses)
-        with _connect() as conn:
-            rows = conn.execute(
-                f"SELECT id, ts, src, event, data FROM events WHERE {where} ORDER BY id LIMIT ?",
-                params
-            ).fetchall()
-        return [_row_to_dict(r) for r in rows]
+        types, srcs = _as_list(event_type), _as_list(src)
+        sql, params = _events_query(since_id, limit, types, srcs)
+        rows = _reader_conn().execute(sql, params).fetchall()
+        events = [_row_to_dict(r) for r in rows]
+        if since_id < _archive_max_id:
+            events = _merge_archived(events, since_id, limit, types, srcs)
+        return events
     except Exception:
         return []
 
 
+def _as_list(value: Filter) -> list:
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+def _events_query(since_id: int, limit: int, types: list, srcs: list) -> tuple[str, list]:
+    """get_events statement and parameters for a filter combination (also used by the planner test)."""
+    clauses, params = ["id > ?"], [since_id]
+    if types:
+        exact = [t for t in types if not _is_glob(t)]
+        parts = ["event GLOB ?" for t in types if _is_glob(t)]
+        if len(exact) == 1:
+            parts.insert(0, "event = ?")
+        elif exact:
+            parts.insert(0, f"event IN ({','.join('?' * len(exact))})")
+        clauses.append(parts[0] if len(parts) == 1 else "(" + " OR ".join(parts) + ")")
+        params += exact + [t for t in types if _is_glob(t)]
+    if srcs:
+        clauses.append("src = ?" if len(srcs) == 1 else f"src IN ({','.join('?' * len(srcs))})")
+        params += srcs
+    params.append(limit)
+    return f"SELECT {_COLS} FROM events WHERE {' AND '.join(clauses)} ORDER BY id LIMIT ?", params
+
+
 def get_max_id() -> int:
     """Get the highest event ID (for polling cursors)."""
     if not _DB_PATH:
         return 0
+    _read_your_writes()
     try:
-        with _connect() as conn:
-            row = conn.execute("SELECT MAX(id) FROM events").fetchone()
-            return row[0] or 0
+        row = _reader_conn().execute(_SQL_MAX_ID).fetchone()
+        return row[0] or 0
     except Exception:
         return 0
 
 
 def count_events(event_type: Optional[str] = None, src: Optional[str] = None) -> int:
-    """Count events with optional filters."""
+    """Count live (non-archived) events with optional filters."""
     if not _DB_PATH:
         return 0
+    _read_your_writes()
     try:
         clauses = ["1=1"]
         params: list = []
@@ -134,9 +534,8 @@ def count_events(event_type: Optional[str] = None, src: Optional[str] = None) ->
             clauses.append("src = ?")
             params.append(src)
         where = " AND ".join(clauses)
-        with _connect() as conn:
-            row = conn.execute(f"SELECT COUNT(*) FROM events WHERE {where}", params).fetchone()
-            return row[0] or 0
+        row = _reader_conn().execute(f"SELECT COUNT(*) FROM events WHERE {where}", params).fetchone()
+        return row[0] or 0
     except Exception:
         return 0
 
@@ -145,24 +544,380 @@ def get_latest_by_type(event_type: str, limit: int = 1) -> list:
     """Get the N most recent events of a given type."""
     if not _DB_PATH:
         return []
+    _read_your_writes()
     try:
-        with _connect() as conn:
-            rows = conn.execute(
-                "SELECT id, ts, src, event, data FROM events WHERE event = ? ORDER BY id DESC LIMIT ?",
-                (event_type, limit)
-            ).fetchall()
+        rows = _reader_conn().execute(_SQL_LATEST, (event_type, limit)).fetchall()
         return [_row_to_dict(r) for r in rows]
     except Exception:
         return []
 
 
+# ── Projection snapshots ─────────────────────────────────────────────────────
+
+def save_snapshot(name: str, version: int, last_id: int, state) -> bool:
+    """Persist a projection's state together with the last applied event id."""
+    if not _DB_PATH:
+        return False
+    try:
+        with _db_lock:
+            conn = _writer_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO projection_snapshots (name, version, last_id, state, updated) "
+                "VALUES (?,?,?,?,?)",
+                (name, version, last_id, json.dumps(state, ensure_ascii=False), time.time()))
+            conn.commit()
+        return True
+    except Exception:
+        logger.exception("Saving snapshot %s failed", name)
+        return False
+
+
+def load_snapshot(name: str) -> Optional[dict]:
+    """Return {"version", "last_id", "state", "updated"} or None."""
+    if not _DB_PATH:
+        return None
+    try:
+        row = _reader_conn().execute(
+            "SELECT version, last_id, state, updated FROM projection_snapshots WHERE name = ?",
+            (name,)).fetchone()
+    except Exception:
+        return None
+    if not row:
+        return None
+    return {"version": row[0], "last_id": row[1], "state": json.loads(row[2]), "updated": row[3]}
+
+
+def delete_snapshot(name: str) -> None:
+    if not _DB_PATH:
+        return
+    with _db_lock:
+        conn = _writer_conn()
+        conn.execute("DELETE FROM projection_snapshots WHERE name = ?", (name,))
+        conn.commit()
+
+
+# ── Retention & archival ─────────────────────────────────────────────────────
+
+# event-type glob → max age in seconds (None = keep forever).  The most
+# specific matching pattern wins (exact names before globs, longer globs first).
+DEFAULT_RETENTION: dict[str, Optional[float]] = {
+    "log_line": 24 * 3600,
+    "clear_widgets": 24 * 3600,
+    "*": None,
+}
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+_COMPACT_CHUNK = 5000
+
+
+def parse_duration(value) -> Optional[float]:
+    """'90s' | '30m' | '24h' | '7d' | '2w' | seconds | 'forever'/'' → seconds or None."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    v = str(value).strip().lower()
+    if v in ("", "forever", "never", "none", "inf"):
+        return None
+    if v[-1] in _DURATION_UNITS:
+        return float(v[:-1]) * _DURATION_UNITS[v[-1]]
+    return float(v)
+
+
+def _retention_from_env() -> dict:
+    policies = dict(DEFAULT_RETENTION)
+    for part in os.environ.get("DOCKFRA_DB_RETENTION", "").split(","):
+        if "=" in part:
+            k, v = part.split("=", 1)
+            try:
+                policies[k.strip()] = parse_duration(v)
+            except ValueError:
+                logger.warning("Ignoring invalid retention %r", part)
+    return policies
+
+
+_retention: dict[str, Optional[float]] = _retention_from_env()
+_archive_max_id = 0
+
+
+def set_retention(policies: dict) -> None:
+    """Replace retention policies: {event_glob: duration (see parse_duration) or None}."""
+    global _retention
+    _retention = {k: parse_duration(v) for k, v in policies.items()}
+
+
+def get_retention() -> dict:
+    return dict(_retention)
+
+
+def _pattern_rank(pattern: str) -> tuple:
+    """Sort key: exact event names first, then longer (more specific) globs."""
+    return (any(c in pattern for c in "*?["), -len(pattern))
+
+
+def _archive_dir() -> Path:
+    return _DB_PATH.parent / (_DB_PATH.name + ".archive")
+
+
+def compact(now: Optional[float] = None, vacuum: bool = False) -> dict:
+    """Archive and delete events older than their retention policy.
+
+    Expired rows are appended as a gzip member to the day's JSONL segment,
+    indexed in archive_segments and deleted in the same transaction, so a
+    crash never loses rows (at worst an unindexed, ignored gzip member
+    remains).  Frees pages with an incremental vacuum afterwards;
+    vacuum=True runs a full VACUUM (needed once to enable incremental
+    auto_vacuum on databases created before retention existed).
+    """
+    if not _DB_PATH:
+        return {}
+    flush()
+    now = time.time() if now is None else now
+    ranked = sorted(_retention, key=_pattern_rank)
+    summary = {"archived": 0, "segments": 0, "by_pattern": {}, "freed_pages": 0}
+    for i, pattern in enumerate(ranked):
+        max_age = _retention[pattern]
+        if max_age is None:
+            continue
+        # Rows claimed by a more specific pattern follow that pattern instead
+        more_specific = ranked[:i]
+        where = "event GLOB ? AND ts < ?" + "".join(" AND event NOT GLOB ?" for _ in more_specific)
+        params = [pattern, now - max_age, *more_specific]
+        archived = 0
+        while True:
+            with _db_lock:
+                conn = _writer_conn()
+                rows = conn.execute(
+                    f"SELECT {_COLS} FROM events WHERE {where} ORDER BY id LIMIT ?",
+                    params + [_COMPACT_CHUNK]).fetchall()
+                if not rows:
+                    break
+                summary["segments"] += _archive_rows(conn, rows, now)
+                archived += len(rows)
+        summary["by_pattern"][pattern] = archived
+        summary["archived"] += archived
+    with _db_lock:
+        conn = _writer_conn()
+        if vacuum:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+        summary["freed_pages"] = before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+    _refresh_archive_high_water()
+    return summary
+
+
+def _archive_rows(conn: sqlite3.Connection, rows: list, now: float) -> int:
+    """Write rows into per-day gzip segments and delete them. Caller holds _db_lock."""
+    by_day: dict[str, list] = {}
+    for r in rows:
+        day = datetime.fromtimestamp(r[1], tz=timezone.utc).strftime("%Y-%m-%d")
+        by_day.setdefault(day, []).append(r)
+    adir = _archive_dir()
+    adir.mkdir(parents=True, exist_ok=True)
+    try:
+        for day, day_rows in by_day.items():
+            # JSON rows already hold JSON text — splice it in instead of decode/encode
+            lines = "".join(
+                f'{{"id":{r[0]},"ts":{r[1]!r},"src":{json.dumps(r[2])},"event":{json.dumps(r[3])},'
+                f'"data":{r[4] or json.dumps(_decode_typed(r), ensure_ascii=False)}}}\n'
+                for r in day_rows)
+            member = gzip.compress(lines.encode("utf-8"))
+            path = adir / f"events-{day}.jsonl.gz"
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(member)
+                f.flush()
+                os.fsync(f.fileno())
+            conn.execute(
+                "INSERT INTO archive_segments (day, path, offset, length, min_id, max_id, rows, created) "
+                "VALUES (?,?,?,?,?,?,?,?)",
+                (day, path.name, offset, len(member), day_rows[0][0], day_rows[-1][0], len(day_rows), now))
+        conn.executemany("DELETE FROM events WHERE id = ?", [(r[0],) for r in rows])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(by_day)
+
+
+def _refresh_archive_high_water() -> None:
+    global _archive_max_id
+    try:
+        with _db_lock:
+            row = _writer_conn().execute("SELECT MAX(max_id) FROM archive_segments").fetchone()
+        _archive_max_id = row[0] or 0
+    except Exception:
+        _archive_max_id = 0
+
+
+def _read_segment(name: str, offset: int, length: int) -> list[dict]:
+    with open(_archive_dir() / name, "rb") as f:
+        f.seek(offset)
+        raw = gzip.decompress(f.read(length))
+    return [json.loads(line) for line in raw.decode("utf-8").splitlines() if line]
+
+
+def _merge_archived(live: list, since_id: int, limit: int, types: list, srcs: list) -> list:
+    """Merge archived events with id > since_id into a live page, keeping id order and limit."""
+    segments = _reader_conn().execute(
+        "SELECT path, offset, length, min_id FROM archive_segments "
+        "WHERE max_id > ? ORDER BY min_id", (since_id,)).fetchall()
+    found: list = []
+    for name, offset, length, min_id in segments:
+        # Segments are ordered by min_id: once `limit` rows below this segment
+        # are collected, no later segment can contribute.
+        if len(found) >= limit and sorted(e["id"] for e in found)[limit - 1] < min_id:
+            break
+        try:
+            rows = _read_segment(name, offset, length)
+        except (OSError, ValueError):
+            logger.warning("Unreadable archive segment %s@%d", name, offset)
+            continue
+        found.extend(e for e in rows
+                     if e["id"] > since_id
+                     and (not types or any(fnmatch.fnmatchcase(e["event"], t) for t in types))
+                     and (not srcs or e["src"] in srcs))
+    if not found:
+        return live
+    merged = sorted(found + live, key=lambda e: e["id"])
+    return merged[:limit]
+
+
+def start_retention_worker(interval: float = 3600.0) -> threading.Thread:
+    """Run compact() every `interval` seconds in a daemon thread."""
+    def _loop():
+        while True:
+            time.sleep(interval)
+            try:
+                result = compact()
+                if result.get("archived"):
+                    logger.info("Event retention archived %d events", result["archived"])
+            except Exception:
+                logger.exception("Event retention run failed")
+    t = threading.Thread(target=_loop, name="dockfra-db-retention", daemon=True)
+    t.start()
+    return t
+
+
 # ── Internal ─────────────────────────────────────────────────────────────────
 
 def _row_to_dict(r: tuple) -> dict:
-    """Convert a DB row tuple to event dict."""
-    return {"id": r[0], "ts": r[1], "src": r[2], "event": r[3], "data": json.loads(r[4])}
+    """Convert a DB row tuple (_COLS order) to event dict."""
+    return {"id": r[0], "ts": r[1], "src": r[2], "event": r[3],
+            "data": json.loads(r[4]) if r[4] else _decode_typed(r)}
+
+
+def _encode(event: str, data) -> tuple:
+    """Return the (data, ref, role, text, flags) column values for a payload."""
+    if _TYPED_PAYLOADS and type(data) is dict:
+        keys = _TYPED_TEXT.get(event)
+        if keys is not None:
+            if data.keys() <= keys and all(type(v) is str for v in data.values()):
+                return "", data.get("id"), data.get("role"), data.get("text"), None
+        elif (event == "widget" and data.keys() == _PROGRESS_KEYS and data["type"] == "progress"
+              and type(data["label"]) is str and type(data["done"]) is bool
+              and type(data["error"]) is bool):
+            return "", None, None, data["label"], int(data["done"]) | int(data["error"]) << 1
+    return json.dumps(data, ensure_ascii=False), None, None, None, None
+
+
+def _decode_typed(r: tuple) -> dict:
+    """Rebuild a typed payload from its columns (row in _COLS order, data == '')."""
+    event, ref, role, text, flags = r[3], r[5], r[6], r[7], r[8]
+    if event == "widget":
+        return {"type": "progress", "label": text, "done": bool(flags & 1), "error": bool(flags & 2)}
+    out = {}
+    if ref is not None:
+        out["id"] = ref
+    if role is not None:
+        out["role"] = role
+    if text is not None:
+        out["text"] = text
+    return out
+
+
+def _insert_batch(events: list[tuple]) -> list[int]:
+    """Insert (event, data, src[, ts]) tuples in one transaction on the writer connection."""
+    ids = []
+    with _db_lock:
+        conn = _writer_conn()
+        try:
+            for item in events:
+                event, data, src = item[0], item[1], item[2]
+                ts = item[3] if len(item) > 3 else time.time()
+                cur = conn.execute(_SQL_INSERT, (ts, src, event, *_encode(event, data)))
+                ids.append(cur.lastrowid or 0)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return ids
+
+
+def _read_your_writes() -> None:
+    """Flush this thread's queued events so its own reads observe them.
+
+    Skipped inside a flush (a commit listener reading back): the flush lock is
+    not re-entrant, and the listener already sees everything committed so far.
+    """
+    wb = _wb
+    if wb is not None and not getattr(_local, "in_flush", False):
+        seq = getattr(_local, "wb_seq", 0)
+        if seq > wb._committed:
+            wb.flush(upto=seq)
 
 
 def _connect() -> sqlite3.Connection:
     """Create a new SQLite connection (thread-safe via check_same_thread=False)."""
-    return sqlite3.connect(str(_DB_PATH), check_same_thread=False, timeout=5)
+    conn = sqlite3.connect(str(_DB_PATH), check_same_thread=False, timeout=5,
+                           cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={_SYNCHRONOUS}")
+    return conn
+
+
+def _writer_conn() -> sqlite3.Connection:
+    """Return the shared writer connection. Caller must hold _db_lock."""
+    global _writer
+    if _writer is None:
+        _writer = _connect()
+    return _writer
+
+
+class _ReaderSlot:
+    """A thread's reader connection; closed once the thread exits and its locals are freed."""
+    __slots__ = ("conn", "generation", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection, generation: int):
+        self.conn, self.generation = conn, generation
+
+
+def _release_reader(conn: sqlite3.Connection) -> None:
+    with _pool_lock:
+        try:
+            _readers.remove(conn)
+        except ValueError:
+            pass  # already closed by close_db()
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _reader_conn() -> sqlite3.Connection:
+    """Return this thread's reader connection, reopening it after init_db/close_db."""
+    slot = getattr(_local, "reader", None)
+    if slot is not None and slot.generation == _generation:
+        return slot.conn
+    gen = _generation
+    conn = _connect()
+    conn.execute("PRAGMA query_only=ON")
+    with _pool_lock:
+        _readers.append(conn)
+    # Request threads are short-lived: without this every finished thread
+    # would leave its connection (and file descriptors) open until close_db()
+    slot = _ReaderSlot(conn, gen)
+    weakref.finalize(slot, _release_reader, conn)
+    _local.reader = slot
+    return conn
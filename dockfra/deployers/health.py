@@ -6,7 +6,12 @@ from abc import ABC, abstractmethod
 from pathlib import Path
 import socket
 import subprocess
-import urllib.request
+from urllib.parse import urljoin
+
+from ..http_client import get_client
+
+_REDIRECTS = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
 
 
 class HealthChecker(ABC):
@@ -29,17 +34,29 @@ class HTTPHealthChecker(HealthChecker):
     """Default health checker implementation using stdlib tools."""
 
     def check_http(self, url: str, timeout: int = 5) -> dict:
+        """GET `url`, following up to _MAX_REDIRECTS redirects; ok on a final 2xx."""
         try:
-            with urllib.request.urlopen(url, timeout=timeout) as resp:
-                code = int(getattr(resp, "status", 0) or 0)
-                ok = 200 <= code < 400
-                return {
-                    "kind": "http",
-                    "target": url,
-                    "ok": ok,
-                    "status": code,
-                    "details": f"HTTP {code}",
-                }
+            target, hops = url, 0
+            while True:
+                # Pooled keep-alive connection: repeated polls of one service skip the handshake
+                resp = get_client().request("GET", target, timeout=timeout, retries=0)
+                code = int(resp.status or 0)
+                location = resp.headers.get("Location") if code in _REDIRECTS else None
+                if not location or hops == _MAX_REDIRECTS:
+                    break
+                target, hops = urljoin(target, location), hops + 1
+            details = f"HTTP {code}"
+            if location:
+                details += f" (more than {_MAX_REDIRECTS} redirects)"
+            elif hops:
+                details += f" from {target}"
+            return {
+                "kind": "http",
+                "target": url,
+                "ok": 200 <= code < 300,
+                "status": code,
+                "details": details,
+            }
         except Exception as e:
             return {
                 "kind": "http",
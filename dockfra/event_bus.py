@@ -12,12 +12,21 @@ Usage:
     bus = get_bus()
     bus.subscribe("ticket.created", my_handler)
     bus.emit("ticket.created", {"id": "T-0001", "title": "Fix bug"}, src="manager")
+
+    # Off the emitting thread: bounded per-handler queues, per-type ordering
+    bus.subscribe_all(slow_handler, mode="thread", workers=4)
+    bus.subscribe("log_line", async_handler, mode="asyncio")
+    bus.metrics()   # queue depth, drops, handler latency
 """
 from __future__ import annotations
 
+import asyncio
+import fnmatch
+import inspect
 import logging
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from typing import Any, Callable, Protocol
@@ -84,11 +93,20 @@ class Event:
     def to_dict(self) -> dict:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, d: dict) -> "Event":
+        """Build an Event from a stored row (id, ts, src, event, data)."""
+        return cls(event=d["event"], data=d["data"], src=d["src"], ts=d["ts"], id=d["id"])
+
 
 # ── Event Store Protocol (Dependency Inversion — depend on abstraction) ──────
 
 class EventStore(Protocol):
-    """Interface for event persistence — any backend can implement this."""
+    """Interface for event persistence — any backend can implement this.
+
+    Implementations: SQLiteEventStore (below), and MemoryEventStore /
+    SegmentLogStore in dockfra.event_stores.
+    """
     def append(self, event: str, data: dict, src: str) -> int: ...
     def get_since(self, since_id: int, limit: int) -> list[dict]: ...
     def get_max_id(self) -> int: ...
@@ -112,10 +130,256 @@ class SQLiteEventStore:
         return self._db.get_max_id()
 
 
-# ── Event Bus (mediator + observer pattern) ──────────────────────────────────
+# ── Handler dispatch (sync inline, thread pool, asyncio) ──────────────────────
 
 EventHandler = Callable[[Event], None]
 
+DISPATCH_MODES = ("sync", "thread", "asyncio")
+
+
+def _type_key(event_type) -> str:
+    """Normalise EventType members to their string value (Enum and str hash differently)."""
+    return event_type.value if isinstance(event_type, Enum) else event_type
+
+
+class Subscription:
+    """One registered handler plus its dispatch mode, queues and metrics.
+
+    mode="sync"    — called inline on the emitting thread (the default).
+    mode="thread"  — `workers` daemon threads, each with its own bounded queue.
+    mode="asyncio" — a coroutine handler driven by a private event loop thread,
+                     one consumer task per shard.
+
+    Events are sharded by event type, so events of one type are always handled
+    in emit order while different types may run concurrently.  When a shard's
+    queue holds `maxsize` events, new events are dropped (counted in
+    `dropped`, and passed to `on_drop(ev)` on the emitting thread) rather
+    than blocking the emitter — unless overflow="block".  Dropping suits
+    consumers that can resync (SSE clients re-read the store); stateful
+    subscribers such as projections must use overflow="block".
+
+    `types` (globs such as "ticket.*") limits a subscribe_all() handler to
+    matching event types; set_types() changes them later.
+    """
+
+    def __init__(self, handler: EventHandler, event_type: str | None = None,
+                 mode: str = "sync", workers: int = 1, maxsize: int = 10000,
+                 overflow: str = "drop", name: str | None = None,
+                 types: tuple[str, ...] = (), on_drop: EventHandler | None = None):
+        if mode not in DISPATCH_MODES:
+            raise ValueError(f"mode must be one of {DISPATCH_MODES}, got {mode!r}")
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"overflow must be 'drop' or 'block', got {overflow!r}")
+        if mode == "asyncio" and not inspect.iscoroutinefunction(handler):
+            raise TypeError("asyncio handlers must be coroutine functions")
+        self.handler = handler
+        self.event_type = event_type
+        self.mode = mode
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.on_drop = on_drop
+        self.filter: EventFilter | None = None
+        self.set_types(types)
+        self.name = name or getattr(handler, "__qualname__", repr(handler))
+        self.processed = self.errors = self.dropped = 0
+        self.max_depth = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        n = max(1, workers) if mode != "sync" else 0
+        self._shards: list[deque] = [deque() for _ in range(n)]
+        self._busy = [False] * n
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeups: list[asyncio.Event] = []
+        if mode == "thread":
+            for i in range(n):
+                t = threading.Thread(target=self._thread_worker, args=(i,), daemon=True,
+                                     name=f"bus-{self.name}-{i}")
+                t.start()
+                self._threads.append(t)
+        elif mode == "asyncio":
+            ready = threading.Event()
+            t = threading.Thread(target=self._loop_main, args=(ready,), daemon=True,
+                                 name=f"bus-{self.name}-loop")
+            t.start()
+            ready.wait()
+            self._threads.append(t)
+
+    def set_types(self, types) -> None:
+        """Only deliver events whose type matches one of these globs (empty: all)."""
+        self.filter = EventFilter(types=types) if types else None
+
+    # ── producer side ─────────────────────────────────────────────────────────
+
+    def deliver(self, ev: Event) -> None:
+        key = _type_key(ev.event)
+        flt = self.filter
+        if flt is not None and not flt.matches_type(key):
+            return
+        if self.mode == "sync":
+            self._call(ev)
+            return
+        i = hash(key) % len(self._shards)
+        with self._cond:
+            if self._closed:
+                return
+            q = self._shards[i]
+            while len(q) >= self.maxsize and self.overflow == "block":
+                self._cond.wait()
+            full = len(q) >= self.maxsize
+            if full:
+                self.dropped += 1
+            else:
+                q.append(ev)
+                depth = self._depth()
+                if depth > self.max_depth:
+                    self.max_depth = depth
+                self._cond.notify_all()
+        if full:
+            self._dropped(ev)  # outside the lock: the callback may resync from the store
+            return
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeups[i].set)
+
+    def _dropped(self, ev: Event) -> None:
+        if self.on_drop is not None:
+            try:
+                self.on_drop(ev)
+            except Exception:
+                logger.exception("on_drop handler error for %s", ev.event)
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until every queued event has been handled. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._depth() or any(self._busy):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Drain queued events, then stop the workers."""
+        if self.mode == "sync":
+            return
+        self.join(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._loop is not None:
+            for w in self._wakeups:
+                self._loop.call_soon_threadsafe(w.set)
+        for t in self._threads:
+            t.join(timeout)
+
+    def metrics(self) -> dict:
+        with self._cond:
+            depth = self._depth()
+        calls = self.processed + self.errors
+        return {
+            "name": self.name, "event_type": self.event_type or "*", "mode": self.mode,
+            "workers": len(self._shards) or None, "depth": depth, "max_depth": self.max_depth,
+            "processed": self.processed, "errors": self.errors, "dropped": self.dropped,
+            "latency_avg_ms": round(self._latency_total / calls * 1000, 3) if calls else 0.0,
+            "latency_max_ms": round(self._latency_max * 1000, 3),
+        }
+
+    # ── consumer side ─────────────────────────────────────────────────────────
+
+    def _depth(self) -> int:
+        return sum(len(q) for q in self._shards)
+
+    def _record(self, started: float, ok: bool) -> None:
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self._latency_total += elapsed
+            if elapsed > self._latency_max:
+                self._latency_max = elapsed
+            if ok:
+                self.processed += 1
+            else:
+                self.errors += 1
+
+    def _call(self, ev: Event) -> None:
+        t0 = time.perf_counter()
+        try:
+            self.handler(ev)
+        except Exception:
+            logger.exception("Event handler error for %s", ev.event)
+            self._record(t0, False)
+        else:
+            self._record(t0, True)
+
+    def _take(self, i: int) -> Event | None:
+        """Pop the next event of shard i, or None when closed. Caller holds _cond."""
+        q = self._shards[i]
+        if q:
+            self._busy[i] = True
+            ev = q.popleft()
+            self._cond.notify_all()  # wake blocked producers
+            return ev
+        return None
+
+    def _done(self, i: int) -> None:
+        with self._cond:
+            self._busy[i] = False
+            self._cond.notify_all()
+
+    def _thread_worker(self, i: int) -> None:
+        while True:
+            with self._cond:
+                while not self._shards[i] and not self._closed:
+                    self._cond.wait()
+                ev = self._take(i)
+            if ev is None:
+                return
+            self._call(ev)
+            self._done(i)
+
+    def _loop_main(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._wakeups = [asyncio.Event() for _ in self._shards]
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_until_complete(asyncio.gather(
+                *(self._async_worker(i) for i in range(len(self._shards)))))
+        finally:
+            loop.close()
+
+    async def _async_worker(self, i: int) -> None:
+        wakeup = self._wakeups[i]
+        while True:
+            with self._cond:
+                ev = self._take(i)
+                closed = self._closed
+            if ev is None:
+                if closed:
+                    return
+                wakeup.clear()
+                with self._cond:
+                    pending = bool(self._shards[i]) or self._closed
+                if not pending:
+                    await wakeup.wait()
+                continue
+            t0 = time.perf_counter()
+            try:
+                await self.handler(ev)
+            except Exception:
+                logger.exception("Event handler error for %s", ev.event)
+                self._record(t0, False)
+            else:
+                self._record(t0, True)
+            self._done(i)
+
+
+# ── Event Bus (mediator + observer pattern) ──────────────────────────────────
+
 
 class EventBus:
     """
@@ -127,23 +391,64 @@ class EventBus:
 
     def __init__(self, store: EventStore | None = None):
         self._store = store
-        self._handlers: dict[str, list[EventHandler]] = {}
-        self._global_handlers: list[EventHandler] = []
+        self._handlers: dict[str, list[Subscription]] = {}
+        self._global_handlers: list[Subscription] = []
         self._lock = threading.Lock()
 
     def set_store(self, store: EventStore) -> None:
         """Late-bind store (for startup ordering)."""
         self._store = store
 
-    def subscribe(self, event_type: str, handler: EventHandler) -> None:
-        """Subscribe to specific event type."""
+    def subscribe(self, event_type: str, handler: EventHandler, mode: str = "sync",
+                  **options) -> Subscription:
+        """Subscribe to specific event type.
+
+        mode/options (workers, maxsize, overflow, name) select how the handler
+        is dispatched — see Subscription.  Returns the subscription handle.
+        """
+        sub = Subscription(handler, _type_key(event_type), mode=mode, **options)
         with self._lock:
-            self._handlers.setdefault(event_type, []).append(handler)
+            self._handlers.setdefault(sub.event_type, []).append(sub)
+        return sub
 
-    def subscribe_all(self, handler: EventHandler) -> None:
+    def subscribe_all(self, handler: EventHandler, mode: str = "sync",
+                      **options) -> Subscription:
         """Subscribe to all events (for projections, logging)."""
+        sub = Subscription(handler, None, mode=mode, **options)
         with self._lock:
-            self._global_handlers.append(handler)
+            self._global_handlers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """Remove a subscription and stop its workers after draining them."""
+        with self._lock:
+            if sub in self._global_handlers:
+                self._global_handlers.remove(sub)
+            elif sub in self._handlers.get(sub.event_type, []):
+                self._handlers[sub.event_type].remove(sub)
+        sub.close()
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Wait until every non-sync subscription has drained its queues."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for sub in self._subscriptions():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not sub.join(remaining):
+                return False
+        return True
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Drain and stop all worker pools (shutdown)."""
+        for sub in self._subscriptions():
+            sub.close(timeout)
+
+    def metrics(self) -> list[dict]:
+        """Queue depth, drops and handler latency for every subscription."""
+        return [sub.metrics() for sub in self._subscriptions()]
+
+    def _subscriptions(self) -> list[Subscription]:
+        with self._lock:
+            return [s for subs in self._handlers.values() for s in subs] + self._global_handlers
 
     def emit(self, event_type: str, data: dict, src: str = "system") -> int:
         """
@@ -155,18 +460,19 @@ class EventBus:
             event_id = self._store.append(event_type, data, src)
 
         ev = Event(event=event_type, data=data, src=src, id=event_id)
+        self._notify(ev)
+        return event_id
 
-        with self._lock:
-            handlers = list(self._handlers.get(event_type, []))
-            global_h = list(self._global_handlers)
+    def publish(self, ev: Event) -> None:
+        """Notify handlers of an event that is already persisted (e.g. by the db write-behind queue)."""
+        self._notify(ev)
 
-        for h in handlers + global_h:
-            try:
-                h(ev)
-            except Exception:
-                logger.exception("Event handler error for %s", event_type)
+    def _notify(self, ev: Event) -> None:
+        with self._lock:
+            subs = self._handlers.get(_type_key(ev.event), []) + self._global_handlers
 
-        return event_id
+        for sub in subs:
+            sub.deliver(ev)
 
     def query_events(self, since_id: int = 0, limit: int = 500) -> list[dict]:
         """Query side: read events from store."""
@@ -180,24 +486,213 @@ class EventBus:
             return 0
         return self._store.get_max_id()
 
-    def replay(self, since_id: int = 0, handler: EventHandler | None = None) -> int:
-        """Replay events from store through a handler (for rebuilding projections)."""
+    def replay(self, since_id: int = 0, handler: EventHandler | None = None,
+               page_size: int = 1000) -> int:
+        """Replay events from store through a handler (for rebuilding projections).
+
+        Streams the store in pages of `page_size`, so history of any length is
+        replayed without loading it into memory at once.
+        """
         if not self._store:
             return 0
-        events = self._store.get_since(since_id, limit=10000)
-        for e in events:
-            ev = Event(event=e["event"], data=e["data"], src=e["src"],
-                       ts=e["ts"], id=e["id"])
+        count = 0
+        for ev in self.iter_events(since_id, page_size):
+            count += 1
             if handler:
                 handler(ev)
             else:
                 with self._lock:
-                    for h in self._global_handlers:
-                        try:
-                            h(ev)
-                        except Exception:
-                            logger.exception("Replay handler error for %s", e["event"])
-        return len(events)
+                    global_h = [sub.handler for sub in self._global_handlers if sub.mode != "asyncio"]
+                for h in global_h:
+                    try:
+                        h(ev)
+                    except Exception:
+                        logger.exception("Replay handler error for %s", ev.event)
+        return count
+
+    def iter_events(self, since_id: int = 0, page_size: int = 1000):
+        """Query side: lazily iterate all stored events after `since_id`, page by page."""
+        if not self._store:
+            return
+        cursor = since_id
+        while True:
+            page = self._store.get_since(cursor, page_size)
+            for e in page:
+                cursor = e["id"]
+                yield Event.from_dict(e)
+            if len(page) < page_size:
+                return
+
+
+# ── Subscription filters ──────────────────────────────────────────────────────
+
+class EventFilter:
+    """Server-side event filter for stream / polling clients.
+
+    types      — event type names or globs ("ticket.*"); any match passes
+    srcs       — event sources ("web", "cli", "api", ...)
+    tickets    — ticket ids, matched against data["id"] / data["ticket_id"]
+    containers — container names, matched against data["container"]
+                 (or data["name"] on container.* events)
+
+    Empty criteria match everything.  Type decisions are memoised per event
+    type, so repeated events cost one dict lookup.
+    """
+
+    def __init__(self, types=(), srcs=(), tickets=(), containers=()):
+        self.types = tuple(types)
+        self.srcs = frozenset(srcs)
+        self.tickets = frozenset(tickets)
+        self.containers = frozenset(containers)
+        self._type_cache: dict[str, bool] = {}
+
+    @classmethod
+    def from_args(cls, args) -> "EventFilter":
+        """Build from query args; each key accepts comma-separated and repeated values."""
+        def _values(key):
+            raw = args.getlist(key) if hasattr(args, "getlist") else [args.get(key) or ""]
+            return [v.strip() for item in raw for v in item.split(",") if v.strip()]
+        return cls(_values("type"), _values("src"), _values("ticket"), _values("container"))
+
+    def __bool__(self) -> bool:
+        return bool(self.types or self.srcs or self.tickets or self.containers)
+
+    @property
+    def needs_payload(self) -> bool:
+        """True when matching looks into event data (not expressible as an SQL filter)."""
+        return bool(self.tickets or self.containers)
+
+    def matches_type(self, event_type: str) -> bool:
+        hit = self._type_cache.get(event_type)
+        if hit is None:
+            hit = not self.types or any(fnmatch.fnmatchcase(event_type, p) for p in self.types)
+            self._type_cache[event_type] = hit
+        return hit
+
+    def matches(self, ev: dict) -> bool:
+        if not self.matches_type(ev["event"]):
+            return False
+        if self.srcs and ev["src"] not in self.srcs:
+            return False
+        data = ev["data"] if isinstance(ev["data"], dict) else {}
+        if self.tickets and not (data.get("id") in self.tickets
+                                 or data.get("ticket_id") in self.tickets):
+            return False
+        if self.containers:
+            name = data.get("container")
+            if name is None and ev["event"].startswith("container."):
+                name = data.get("name")
+            if name not in self.containers:
+                return False
+        return True
+
+
+# ── Stream hub (push fan-out for SSE clients) ─────────────────────────────────
+
+class StreamSubscription:
+    """Bounded per-client event queue fed by StreamHub.
+
+    When the queue is full, log_line events are dropped first (counted in
+    `dropped`).  If the queue holds nothing droppable the subscription is
+    marked `lagged`, and the consumer should catch up from the store.
+    """
+
+    DROPPABLE = frozenset({EventType.LOG_LINE.value})
+
+    def __init__(self, maxsize: int = 1000, event_filter: EventFilter | None = None):
+        self.maxsize = maxsize
+        self.filter = event_filter or EventFilter()
+        self.dropped = 0
+        self.lagged = False
+        self._q: deque = deque()
+        self._cond = threading.Condition()
+
+    def offer(self, ev: dict) -> None:
+        with self._cond:
+            if len(self._q) >= self.maxsize:
+                if ev["event"] in self.DROPPABLE:
+                    self.dropped += 1
+                    return
+                for i, queued in enumerate(self._q):
+                    if queued["event"] in self.DROPPABLE:
+                        del self._q[i]
+                        self.dropped += 1
+                        break
+                else:
+                    self._q.clear()
+                    self.lagged = True
+                    self._cond.notify()
+                    return
+            self._q.append(ev)
+            self._cond.notify()
+
+    def get(self, timeout: float) -> list[dict]:
+        """Drain queued events, waiting up to `timeout` seconds for the first one."""
+        with self._cond:
+            if not self._q and not self.lagged:
+                self._cond.wait(timeout)
+            events = list(self._q)
+            self._q.clear()
+            return events
+
+    def take_dropped(self) -> int:
+        with self._cond:
+            n, self.dropped = self.dropped, 0
+            return n
+
+    def take_lagged(self) -> bool:
+        with self._cond:
+            lagged, self.lagged = self.lagged, False
+            return lagged
+
+
+class StreamHub:
+    """Fans out bus events to connected stream subscribers (push, no polling).
+
+    Subscribers are indexed by event type: the list of subscriptions whose
+    filter accepts a type is computed once and reused until a client
+    connects or disconnects, so a ticket board client never sees log_line.
+    """
+
+    def __init__(self, bus: "EventBus", maxsize: int = 1000):
+        self._subs: set[StreamSubscription] = set()
+        self._by_type: dict[str, list[StreamSubscription]] = {}
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        bus.subscribe_all(self._on_event)
+
+    def connect(self, event_filter: EventFilter | None = None) -> StreamSubscription:
+        sub = StreamSubscription(self.maxsize, event_filter)
+        with self._lock:
+            self._subs.add(sub)
+            self._by_type = {}
+        return sub
+
+    def disconnect(self, sub: StreamSubscription) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+            self._by_type = {}
+
+    def client_count(self) -> int:
+        return len(self._subs)
+
+    def _on_event(self, ev: Event) -> None:
+        if not ev.id:
+            return
+        etype = _type_key(ev.event)
+        with self._lock:
+            subs = self._by_type.get(etype)
+            if subs is None:
+                subs = self._by_type[etype] = [s for s in self._subs if s.filter.matches_type(etype)]
+        if not subs:
+            return
+        payload = ev.to_dict()
+        payload["event"] = etype
+        for sub in subs:
+            flt = sub.filter
+            if (flt.srcs or flt.needs_payload) and not flt.matches(payload):
+                continue
+            sub.offer(payload)
 
 
 # ── Singleton bus ─────────────────────────────────────────────────────────────
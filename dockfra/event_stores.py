@@ -0,0 +1,306 @@
+"""
+dockfra.event_stores — Alternative EventStore backends for the EventBus.
+
+Both classes implement the event_bus.EventStore protocol (append /
+get_since / get_max_id) next to the default SQLiteEventStore:
+
+  MemoryEventStore   — bounded in-memory ring; for tests and ephemeral CLI
+                       sessions.  Oldest events fall off once `capacity` is
+                       reached; ids keep increasing.
+  SegmentLogStore    — append-only log of memory-mapped segment files with a
+                       dense per-segment offset index, for very high write
+                       rates.  Survives crashes: recovery re-validates the
+                       tail of the active segment by CRC and sequence id.
+
+Usage:
+    bus = EventBus(MemoryEventStore(capacity=10_000))
+    bus = EventBus(SegmentLogStore(ROOT / ".dockfra-events"))
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+from collections import deque
+from enum import Enum
+from pathlib import Path
+
+
+def _type_name(event) -> str:
+    return event.value if isinstance(event, Enum) else event
+
+
+# ── In-memory ring ────────────────────────────────────────────────────────────
+
+class MemoryEventStore:
+    """Bounded ring buffer of event dicts; ids are contiguous so reads are O(1) seeks."""
+
+    def __init__(self, capacity: int = 100_000):
+        self.capacity = capacity
+        self._events: deque = deque(maxlen=capacity)
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def append(self, event: str, data: dict, src: str = "system") -> int:
+        with self._lock:
+            eid = self._next_id
+            self._next_id += 1
+            self._events.append({"id": eid, "ts": time.time(), "src": src,
+                                 "event": _type_name(event), "data": data})
+            return eid
+
+    def get_since(self, since_id: int = 0, limit: int = 500) -> list[dict]:
+        with self._lock:
+            if not self._events:
+                return []
+            start = max(0, since_id - self._events[0]["id"] + 1)
+            end = min(len(self._events), start + limit)
+            return [self._events[i] for i in range(start, end)]
+
+    def get_max_id(self) -> int:
+        return self._next_id - 1
+
+    def close(self) -> None:
+        pass
+
+
+# ── Memory-mapped segment log ─────────────────────────────────────────────────
+
+# Record: length, crc32(body), id, ts  +  body = JSON [src, event, data]
+_HEADER = struct.Struct("<IIQd")
+
+
+class _Segment:
+    """One segment file: base id, offsets of its records, and its mmap."""
+
+    __slots__ = ("base", "path", "offsets", "mm", "fd", "size", "written")
+
+    def __init__(self, base: int, path: Path):
+        self.base = base
+        self.path = path
+        self.offsets = array("Q")
+        self.mm: mmap.mmap | None = None
+        self.fd: int | None = None
+        self.size = 0
+        self.written = 0  # file length before open() extended it (bytes that may be non-zero)
+
+    @property
+    def end(self) -> int:
+        """Byte offset just past the last record."""
+        if not self.offsets:
+            return 0
+        off = self.offsets[-1]
+        return off + _HEADER.size + _HEADER.unpack_from(self.mm, off)[0]
+
+    def open(self, min_size: int = 0) -> None:
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = self.written = os.fstat(self.fd).st_size
+        if size < min_size:
+            os.ftruncate(self.fd, min_size)
+            size = min_size
+        self.size = size
+        self.mm = mmap.mmap(self.fd, size) if size else None
+
+    def close(self, truncate_to: int | None = None) -> None:
+        if self.mm is not None:
+            self.mm.flush()
+            self.mm.close()
+            self.mm = None
+        if self.fd is not None:
+            if truncate_to is not None:
+                os.ftruncate(self.fd, truncate_to)
+            os.close(self.fd)
+            self.fd = None
+
+
+class SegmentLogStore:
+    """Append-only event log in preallocated, memory-mapped segment files.
+
+    Appends copy one record into the active segment's mmap (no syscall per
+    event); `sync_every` > 0 flushes the mapping every N appends, flush()
+    on demand.  A segment is sealed — trimmed to its used length and its
+    offset index written to `<segment>.idx` — when the next record does not
+    fit.  On open, sealed segments load their index; the active segment is
+    scanned and its tail validated, and anything after the last valid
+    record is zeroed.
+    """
+
+    def __init__(self, directory, segment_bytes: int = 64 * 1024 * 1024, sync_every: int = 0):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.sync_every = sync_every
+        self._lock = threading.Lock()
+        self._segments: list[_Segment] = []
+        self._bases: list[int] = []
+        self._next_id = 1
+        self._pos = 0
+        self._unsynced = 0
+        self.recovery_seconds = 0.0
+        self._recover()
+
+    # ── EventStore protocol ───────────────────────────────────────────────────
+
+    def append(self, event: str, data: dict, src: str = "system") -> int:
+        body = json.dumps([src, _type_name(event), data], ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8")
+        need = _HEADER.size + len(body)
+        with self._lock:
+            seg = self._segments[-1]
+            if self._pos + need > seg.size:
+                seg = self._roll(need)
+            eid = self._next_id
+            _HEADER.pack_into(seg.mm, self._pos, len(body), zlib.crc32(body), eid, time.time())
+            seg.mm[self._pos + _HEADER.size:self._pos + need] = body
+            seg.offsets.append(self._pos)
+            self._pos += need
+            self._next_id += 1
+            if self.sync_every:
+                self._unsynced += 1
+                if self._unsynced >= self.sync_every:
+                    seg.mm.flush()
+                    self._unsynced = 0
+            return eid
+
+    def get_since(self, since_id: int = 0, limit: int = 500) -> list[dict]:
+        out: list[dict] = []
+        with self._lock:
+            want = max(since_id + 1, 1)
+            i = max(0, bisect.bisect_right(self._bases, want) - 1)
+            while i < len(self._segments) and len(out) < limit:
+                seg = self._segments[i]
+                k = max(0, want - seg.base)
+                mm = seg.mm if seg.mm is not None else self._map_sealed(seg)
+                while k < len(seg.offsets) and len(out) < limit:
+                    out.append(self._decode(mm, seg.offsets[k]))
+                    k += 1
+                i += 1
+        return out
+
+    def get_max_id(self) -> int:
+        return self._next_id - 1
+
+    # ── lifecycle ─────────────────────────────────────────────────────────────
+
+    def flush(self) -> None:
+        """Flush the active mapping to disk."""
+        with self._lock:
+            seg = self._segments[-1]
+            if seg.mm is not None:
+                seg.mm.flush()
+            self._unsynced = 0
+
+    def close(self) -> None:
+        """Trim and index the active segment; the store can be reopened later."""
+        with self._lock:
+            for seg in self._segments:
+                if seg is self._segments[-1]:
+                    self._write_index(seg)
+                    seg.close(truncate_to=self._pos)
+                else:
+                    seg.close()
+
+    # ── internal ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _decode(mm, off: int) -> dict:
+        length, _crc, eid, ts = _HEADER.unpack_from(mm, off)
+        start = off + _HEADER.size
+        src, event, data = json.loads(mm[start:start + length])
+        return {"id": eid, "ts": ts, "src": src, "event": event, "data": data}
+
+    def _seg_path(self, base: int) -> Path:
+        return self.dir / f"{base:020d}.log"
+
+    def _map_sealed(self, seg: _Segment):
+        """Sealed segments are mapped lazily on first read. Caller holds _lock."""
+        seg.open()
+        return seg.mm
+
+    def _write_index(self, seg: _Segment) -> None:
+        tmp = seg.path.with_suffix(".idx.tmp")
+        with open(tmp, "wb") as f:
+            seg.offsets.tofile(f)
+        os.replace(tmp, seg.path.with_suffix(".idx"))
+
+    def _roll(self, need: int) -> _Segment:
+        """Seal the active segment and start a new one. Caller holds _lock."""
+        old = self._segments[-1]
+        if old.offsets:
+            self._write_index(old)
+            old.close(truncate_to=self._pos)
+        else:
+            # Empty segment (record larger than segment_bytes) — reuse its base
+            old.close()
+            old.path.unlink(missing_ok=True)
+            self._segments.pop()
+            self._bases.pop()
+        seg = _Segment(self._next_id, self._seg_path(self._next_id))
+        seg.open(max(self.segment_bytes, need))
+        self._segments.append(seg)
+        self._bases.append(seg.base)
+        self._pos = 0
+        return seg
+
+    def _recover(self) -> None:
+        t0 = time.perf_counter()
+        paths = sorted(self.dir.glob("*.log"))
+        for n, path in enumerate(paths):
+            seg = _Segment(int(path.stem), path)
+            active = n == len(paths) - 1
+            idx = path.with_suffix(".idx")
+            if idx.exists():
+                raw = idx.read_bytes()
+                seg.offsets.frombytes(raw[:len(raw) - len(raw) % seg.offsets.itemsize])
+            if active or not idx.exists():
+                seg.open(self.segment_bytes if active else 0)
+                self._scan_tail(seg)
+            else:
+                seg.size = path.stat().st_size
+            self._segments.append(seg)
+            self._bases.append(seg.base)
+        if not self._segments:
+            seg = _Segment(1, self._seg_path(1))
+            seg.open(self.segment_bytes)
+            self._segments.append(seg)
+            self._bases.append(1)
+        last = self._segments[-1]
+        self._next_id = last.base + len(last.offsets)
+        self._pos = last.end
+        self.recovery_seconds = time.perf_counter() - t0
+
+    def _scan_tail(self, seg: _Segment) -> None:
+        """Validate indexed records and append any records written after the index."""
+        mm = seg.mm
+        if mm is None:
+            return
+        # Drop index entries that no longer point at valid records
+        while seg.offsets and not self._valid(mm, seg.offsets[-1], seg.base + len(seg.offsets) - 1):
+            seg.offsets.pop()
+        pos = seg.end
+        while self._valid(mm, pos, seg.base + len(seg.offsets)):
+            seg.offsets.append(pos)
+            pos += _HEADER.size + _HEADER.unpack_from(mm, pos)[0]
+        # Zero whatever follows (a torn record or stale bytes) so a later
+        # scan can never resurrect it; the extension past `written` is zeros
+        chunk = 1 << 20
+        zeros = bytes(chunk)
+        for start in range(pos, seg.written, chunk):
+            stop = min(start + chunk, seg.written)
+            if mm[start:stop] != zeros[:stop - start]:
+                mm[start:stop] = zeros[:stop - start]
+
+    @staticmethod
+    def _valid(mm, off: int, expect_id: int) -> bool:
+        if off + _HEADER.size > len(mm):
+            return False
+        length, crc, eid, _ts = _HEADER.unpack_from(mm, off)
+        end = off + _HEADER.size + length
+        return (length > 0 and eid == expect_id and end <= len(mm)
+                and zlib.crc32(mm[off + _HEADER.size:end]) == crc)
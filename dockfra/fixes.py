@@ -87,7 +87,7 @@ def _do_restart_container(name: str):
                 cli.containers.get(name).restart()
             msg(f"✅ `{name}` zrestartowany — sprawdzam status za 5s...")
             time.sleep(5)
-            containers = docker_ps()
+            containers = docker_ps(refresh=True)
             c = next((c for c in containers if c["name"] == name), None)
             if c:
                 ok = "Up" in c["status"] and "Restarting" not in c["status"]
@@ -532,7 +532,7 @@ def fix_acme_storage():
             else:
                 msg(f"⚠️ {shell_err}")
         time.sleep(5)
-        all_c = docker_ps()
+        all_c = docker_ps(refresh=True)
         c = next((c for c in all_c if c["name"] == _traefik), None)
         if c:
             ok = "Up" in c["status"] and "Restarting" not in c["status"]
@@ -0,0 +1,151 @@
+"""
+dockfra.health_analyzer — Concurrent log analysis for failing containers.
+
+The post-launch check, step_status and /api/health each ran `docker logs
+--tail 40` plus the health rules for every failing container, one after
+another, and again on every request.  HealthAnalyzer:
+
+  - analyses all requested containers in parallel on a bounded pool;
+  - caches each finding per container id + restart count (one `docker
+    inspect` call for the whole batch), so a container is re-read only
+    after it restarts or is re-created;
+  - returns results in the order the containers were given.
+
+wait_until_settled() replaces the fixed sleep after `docker compose up`:
+woken by container events, it returns once no container is still starting
+and none has changed state for `quiet` seconds, or after `timeout`.
+
+Usage:
+    analyzer = HealthAnalyzer(analyze_fn)          # analyze_fn(name, *extra) → result
+    analyzer.analyze_many(["app", "db"], lang)     # → [result_app, result_db]
+    rows = wait_until_settled(docker_ps, cache.wait_for_event, timeout=30, quiet=3)
+"""
+from __future__ import annotations
+
+import copy
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Status fragments of containers that are still coming up
+_STARTING = ("(health: starting)", "Created", "Removing")
+
+
+def docker_identities(names: list[str]) -> dict[str, tuple]:
+    """{name: (container id, restart count)} from one `docker inspect`; {} on failure."""
+    if not names:
+        return {}
+    try:
+        out = subprocess.check_output(
+            ["docker", "inspect", "--format", "{{.Name}} {{.Id}} {{.RestartCount}}", *names],
+            text=True, stderr=subprocess.DEVNULL, timeout=10)
+    except subprocess.CalledProcessError as e:
+        out = e.output or ""  # some names vanished; the rest are still listed
+    except Exception:
+        return {}
+    ids = {}
+    for line in out.splitlines():
+        parts = line.split()
+        if len(parts) == 3:
+            ids[parts[0].lstrip("/")] = (parts[1], parts[2])
+    return ids
+
+
+class HealthAnalyzer:
+    """Runs `analyze(name, *extra)` for many containers at once, caching by identity.
+
+    `identify(names)` maps names to a hashable identity (default: container id
+    + restart count); a container without one is always analysed afresh, as
+    is one whose last result failed `cache_if(result)`.
+    """
+
+    def __init__(self, analyze, identify=docker_identities, max_workers: int = 8,
+                 cache_if=None):
+        self._analyze = analyze
+        self._identify = identify
+        self._cache_if = cache_if
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._cache: dict[str, tuple] = {}  # name → (identity, extra, result)
+        self._stats = {"hits": 0, "misses": 0}
+
+    def analyze_many(self, names: list[str], *extra) -> list:
+        """Results for `names`, in order; only uncached containers are analysed."""
+        idents = self._identify(list(names)) if names else {}
+        results: dict[str, object] = {}
+        todo = []
+        with self._lock:
+            for name in dict.fromkeys(names):
+                ident = idents.get(name)
+                cached = self._cache.get(name)
+                if ident is not None and cached is not None and cached[:2] == (ident, extra):
+                    results[name] = cached[2]
+                    self._stats["hits"] += 1
+                else:
+                    todo.append(name)
+                    self._stats["misses"] += 1
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(todo)),
+                                    thread_name_prefix="health") as pool:
+                for name, result in zip(todo, pool.map(lambda n: self._analyze(n, *extra), todo)):
+                    results[name] = result
+            with self._lock:
+                for name in todo:
+                    ident = idents.get(name)
+                    if ident is None or (self._cache_if and not self._cache_if(results[name])):
+                        self._cache.pop(name, None)
+                    else:
+                        self._cache[name] = (ident, extra, results[name])
+        # Callers decorate the returned button lists — hand out copies
+        return [copy.deepcopy(results[name]) for name in names]
+
+    def invalidate(self, name: str | None = None) -> None:
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "cached": len(self._cache)}
+
+
+def _phase(status: str) -> str:
+    """Coarse container state; ignores the elapsed-time part of `docker ps` statuses."""
+    if any(s in status for s in _STARTING):
+        return "starting"
+    if "Restarting" in status or status.startswith("Exited") or "(unhealthy)" in status:
+        return "failed"
+    return "up" if status.startswith("Up") else status.split(" ", 1)[0]
+
+
+def wait_until_settled(rows, wait_for_event, timeout: float = 30.0, quiet: float = 3.0) -> list[dict]:
+    """Block until containers are healthy, failed or unchanged for `quiet` seconds.
+
+    `rows()` returns the current container list; `wait_for_event(t)` blocks
+    until the next container event or `t` seconds pass (it only wakes the
+    loop up early, so polling works too).  A container seen failing stays
+    failed, so a crash loop does not keep the window open.  Returns the
+    last rows read.
+    """
+    deadline = time.monotonic() + timeout
+    failed: set[str] = set()
+    signature = None
+    while True:
+        current = rows()
+        now = time.monotonic()
+        phases = {}
+        for r in current:
+            phase = _phase(r.get("status", ""))
+            if phase == "failed":
+                failed.add(r["name"])
+            phases[r["name"]] = "failed" if r["name"] in failed else phase
+        if phases != signature:
+            signature, last_change = phases, now
+        if now >= deadline:
+            return current
+        if now - last_change >= quiet and "starting" not in phases.values():
+            return current
+        wait_for_event(min(deadline - now, max(quiet - (now - last_change), 0.1)))
@@ -0,0 +1,304 @@
+"""
+dockfra.http_client — Shared HTTP client with per-host keep-alive pools.
+
+Used by the ticket integrations (GitHub, Jira, Trello, Linear), llm_client
+and the deployer HTTP health checks, so repeated calls to one host reuse a
+TCP/TLS connection instead of paying a handshake each time.
+
+  - idle http.client connections pooled per (scheme, host, port)
+  - gzip / deflate responses decoded transparently
+  - connection errors and 502/503/504 on idempotent requests retried with
+    jittered exponential backoff; a pooled connection the server already
+    closed is replaced without counting as a retry (POST/PATCH only when
+    the request never went out, so a processed request is not repeated)
+  - per-host request / error / latency metrics
+
+Usage:
+    resp = get_client().request("GET", "https://api.github.com/rate_limit",
+                                headers={"Authorization": "token ..."})
+    resp.status, resp.headers["ETag"], resp.json()
+    get_client().metrics()
+"""
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import logging
+import os
+import random
+import select
+import threading
+import time
+import urllib.parse
+import urllib.request
+import zlib
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_IDEMPOTENT = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+_RETRY_STATUS = frozenset({502, 503, 504})
+# Raised when a kept-alive connection was closed by the server between requests
+_STALE = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class HTTPError(Exception):
+    """Non-2xx/3xx response, raised by Response.raise_for_status()."""
+
+    def __init__(self, url: str, code: int, headers, body: bytes):
+        super().__init__(f"HTTP {code} for {url}")
+        self.url = url
+        self.code = code
+        self.headers = headers
+        self.body = body
+
+    def read(self) -> bytes:
+        return self.body
+
+
+class Response:
+    """Fully read response; the connection is already back in the pool."""
+
+    __slots__ = ("url", "status", "headers", "body")
+
+    def __init__(self, url: str, status: int, headers, body: bytes):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+    def raise_for_status(self) -> "Response":
+        if self.status >= 400:
+            raise HTTPError(self.url, self.status, self.headers, self.body)
+        return self
+
+
+class _HostStats:
+    __slots__ = ("requests", "errors", "retries", "opened", "reused", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.requests = self.errors = self.retries = self.opened = self.reused = 0
+        self.total_ms = self.max_ms = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests, "errors": self.errors, "retries": self.retries,
+            "connections_opened": self.opened, "connections_reused": self.reused,
+            "avg_ms": round(self.total_ms / self.requests, 2) if self.requests else 0.0,
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+class HTTPClient:
+    """Thread-safe HTTP/1.1 client keeping up to `max_idle` idle connections per host."""
+
+    def __init__(self, max_idle: int = 8, retries: int = 2, backoff: float = 0.25,
+                 timeout: float = 30):
+        self.max_idle = max_idle
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle: dict[tuple, deque] = {}
+        self._stats: dict[str, _HostStats] = {}
+
+    # ── public ────────────────────────────────────────────────────────────────
+
+    def request(self, method: str, url: str, headers: dict | None = None,
+                body: bytes | str | None = None, timeout: float | None = None,
+                retries: int | None = None) -> Response:
+        """Send one request and return the fully read Response (any status)."""
+        method = method.upper()
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        proxy = self._proxy_for(parts)
+        target = url if proxy and parts.scheme == "http" else (
+            urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, "")))
+        hdrs = {"Host": parts.netloc, "Accept-Encoding": "gzip, deflate",
+                "User-Agent": "dockfra"}
+        hdrs.update(headers or {})
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        timeout = self.timeout if timeout is None else timeout
+        retries = (self.retries if method in _IDEMPOTENT else 0) if retries is None else retries
+        stats = self._host_stats(key)
+
+        attempt = 0
+        while True:
+            conn, reused = self._checkout(key, proxy, timeout)
+            stale = _STALE if reused else ()
+            t0 = time.perf_counter()
+            sent = False
+            try:
+                conn.request(method, target, body=body, headers=hdrs)
+                sent = True
+                resp = conn.getresponse()
+                raw = resp.read()
+            except stale as e:
+                # Server dropped the idle connection — not the request's fault
+                conn.close()
+                if sent and method not in _IDEMPOTENT:
+                    # It may have processed the request before closing: never resend
+                    self._record(stats, t0, error=True)
+                    raise
+                logger.debug("stale connection to %s: %s", parts.netloc, e)
+                continue
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                self._record(stats, t0, error=True, retry=attempt < retries)
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                self._sleep(attempt, f"{parts.netloc}: {e}")
+                continue
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+            retry = resp.status in _RETRY_STATUS and attempt < retries
+            self._record(stats, t0, error=resp.status >= 500, retry=retry)
+            if retry:
+                attempt += 1
+                self._sleep(attempt, f"{parts.netloc}: HTTP {resp.status}")
+                continue
+            return Response(url, resp.status, resp.headers,
+                            _decode(raw, resp.headers.get("Content-Encoding", "")))
+
+    def metrics(self) -> dict:
+        """Per-host counters plus the number of idle pooled connections."""
+        with self._lock:
+            idle = {}
+            for key, conns in self._idle.items():
+                idle[f"{key[0]}://{key[1]}:{key[2]}"] = len(conns)
+            return {"hosts": {h: s.as_dict() for h, s in self._stats.items()}, "idle": idle}
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for conns in pools.values():
+            for conn in conns:
+                conn.close()
+
+    # ── internal ──────────────────────────────────────────────────────────────
+
+    def _checkout(self, key: tuple, proxy, timeout: float):
+        dead = []
+        with self._lock:
+            pool = self._idle.get(key)
+            conn = None
+            while pool:
+                conn = pool.pop()
+                if not _dropped(conn):
+                    break
+                # Closed by the server while idle — cheaper to notice now than
+                # after sending, where a POST could no longer be retried
+                dead.append(conn)
+                conn = None
+            stats = self._host_stats(key)
+            if conn is not None:
+                stats.reused += 1
+            else:
+                stats.opened += 1
+        for c in dead:
+            c.close()
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        if proxy:
+            conn = cls(proxy.hostname, proxy.port or 80, timeout=timeout)
+            if scheme == "https":
+                conn.set_tunnel(host, port)
+        else:
+            conn = cls(host, port, timeout=timeout)
+        return conn, False
+
+    def _checkin(self, key: tuple, conn) -> None:
+        with self._lock:
+            pool = self._idle.setdefault(key, deque())
+            if len(pool) < self.max_idle:
+                pool.append(conn)
+                return
+        conn.close()
+
+    def _host_stats(self, key: tuple) -> _HostStats:
+        scheme, host, port = key
+        label = host if port == (443 if scheme == "https" else 80) else f"{host}:{port}"
+        stats = self._stats.get(label)
+        if stats is None:
+            stats = self._stats.setdefault(label, _HostStats())
+        return stats
+
+    def _record(self, stats: _HostStats, t0: float, error: bool, retry: bool = False) -> None:
+        ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            stats.requests += 1
+            stats.errors += error
+            stats.retries += retry
+            stats.total_ms += ms
+            if ms > stats.max_ms:
+                stats.max_ms = ms
+
+    def _sleep(self, attempt: int, why: str) -> None:
+        delay = self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+        logger.warning("HTTP retry %d in %.2fs (%s)", attempt, delay, why)
+        time.sleep(delay)
+
+    @staticmethod
+    def _proxy_for(parts):
+        """Proxy from HTTP(S)_PROXY / NO_PROXY, as urllib.request would pick it."""
+        proxy = urllib.request.getproxies_environment().get(parts.scheme)
+        if not proxy or urllib.request.proxy_bypass_environment(parts.hostname or ""):
+            return None
+        return urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+
+
+def _dropped(conn) -> bool:
+    """True when an idle connection's socket is readable: EOF (or stray data) from the server."""
+    sock = conn.sock
+    if sock is None:
+        return False  # not connected yet; connects on the next request
+    try:
+        return bool(select.select([sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+def _decode(raw: bytes, encoding: str) -> bytes:
+    encoding = encoding.strip().lower()
+    if encoding == "gzip":
+        return gzip.decompress(raw)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(raw)
+        except zlib.error:  # raw deflate without zlib header
+            return zlib.decompress(raw, -zlib.MAX_WBITS)
+    return raw
+
+
+_client: HTTPClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HTTPClient:
+    """Process-wide client shared by all integrations."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient(max_idle=int(os.environ.get("DOCKFRA_HTTP_POOL", "8")))
+    return _client
@@ -0,0 +1,348 @@
+"""
+dockfra.log_mux — One follower per container log, served from ring buffers.
+
+/api/logs/<container>, /api/developer-logs and the chat's log view each
+spawned `docker logs --tail N`, so polling a noisy container re-read the
+same lines over and over.  LogMux follows each requested container once:
+
+  - the first read seeds the buffer with one `--tail` fetch (at least
+    `seed_lines`, more when that read asks for more), then a follower
+    streams everything after it (`follow=True`, timestamps used to drop
+    the overlap);
+  - each container keeps a ring buffer capped by bytes and lines; lines
+    are numbered by a per-container offset that only grows, so a client
+    polls with since=<offset> and gets just the new lines;
+  - live lines fan out to subscribers (SSE / SocketIO) through bounded
+    queues — a slow subscriber loses lines, never blocks the follower;
+  - a follower whose stream ends (container stopped) is restarted on the
+    next read; containers nobody read for `idle_timeout` are dropped.
+
+The source is pluggable: DockerSDKSource uses the Docker SDK
+(`container.logs(stream=True, follow=True)`), DockerCLISource the CLI.
+
+Usage:
+    mux = LogMux(DockerCLISource())
+    mux.tail("dockfra-app", 100)        # → {"lines", "first", "offset"}
+    mux.since("dockfra-app", 1234)      # lines with offset >= 1234
+    sub = mux.subscribe("dockfra-app"); sub.get(timeout=15); sub.close()
+"""
+from __future__ import annotations
+
+import calendar
+import logging
+import queue
+import subprocess
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+
+def _split_ts(raw: str) -> tuple[str, str]:
+    """'2024-05-01T10:00:00.123Z text' → (sortable timestamp, text)."""
+    ts, _, text = raw.partition(" ")
+    if len(ts) < 20 or ts[4] != "-" or not ts.endswith("Z"):
+        return "", raw
+    # Docker trims trailing zeros of the fraction — pad so strings sort by time
+    base, _, frac = ts[:-1].partition(".")
+    return f"{base}.{frac.ljust(9, '0')}Z", text
+
+
+def _ts_epoch(ts: str) -> float:
+    base, _, frac = ts[:-1].partition(".")
+    return calendar.timegm(time.strptime(base, "%Y-%m-%dT%H:%M:%S")) + float(f"0.{frac or 0}")
+
+
+# ── Sources: fetch(name, tail) → [(ts, text)], follow(name, since_ts) → (iterator, close) ──
+
+class DockerCLISource:
+    """`docker logs --timestamps`; follow() runs `docker logs -f --since`."""
+
+    def fetch(self, name: str, tail: int) -> list[tuple[str, str]]:
+        out = subprocess.run(["docker", "logs", "--timestamps", "--tail", str(tail), name],
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                             errors="replace", timeout=15)
+        if out.returncode != 0:
+            raise RuntimeError(out.stdout.strip() or f"docker logs {name} failed")
+        return [_split_ts(line) for line in out.stdout.splitlines()]
+
+    def follow(self, name: str, since: str):
+        cmd = ["docker", "logs", "--timestamps", "--follow", name]
+        cmd[3:3] = ["--since", since] if since else ["--tail", "0"]
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, errors="replace")
+
+        def lines():
+            try:
+                for line in proc.stdout:
+                    yield _split_ts(line.rstrip("\n"))
+            finally:
+                proc.kill()
+                proc.wait()
+        return lines(), proc.kill
+
+
+class DockerSDKSource:
+    """Docker SDK: container.logs(stream=True, follow=True, timestamps=True)."""
+
+    def __init__(self, client_factory):
+        self._client_factory = client_factory
+        self._client = None
+
+    def _container(self, name: str):
+        if self._client is None:
+            self._client = self._client_factory()
+            if self._client is None:
+                raise RuntimeError("Docker SDK client unavailable")
+        return self._client.containers.get(name)
+
+    def fetch(self, name: str, tail: int) -> list[tuple[str, str]]:
+        raw = self._container(name).logs(tail=tail, timestamps=True)
+        return [_split_ts(line) for line in raw.decode("utf-8", errors="replace").splitlines()]
+
+    def follow(self, name: str, since: str):
+        kw = {"since": int(_ts_epoch(since))} if since else {"tail": 0}
+        stream = self._container(name).logs(stream=True, follow=True, timestamps=True, **kw)
+
+        def lines():
+            buf = b""
+            for chunk in stream:
+                buf += chunk
+                *done, buf = buf.split(b"\n")
+                for line in done:
+                    yield _split_ts(line.decode("utf-8", errors="replace"))
+        return lines(), stream.close
+
+
+# ── Buffers and subscribers ───────────────────────────────────────────────────
+
+class Subscription:
+    """Live lines of one container as (offset, text); lossy when the consumer lags."""
+
+    def __init__(self, mux: "LogMux", name: str, maxsize: int):
+        self.name = name
+        self.dropped = 0
+        self.closed = False
+        self._mux = mux
+        self._q: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def _put(self, item) -> None:
+        try:
+            self._q.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def get(self, timeout: float | None = None) -> list[tuple[int, str]]:
+        """Block for the next line, then drain whatever else is queued; [] on timeout."""
+        try:
+            items = [self._q.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                items.append(self._q.get_nowait())
+            except queue.Empty:
+                return items
+
+    def close(self) -> None:
+        self.closed = True
+        self._mux._unsubscribe(self)
+
+
+class _Buffer:
+    __slots__ = ("name", "lines", "bytes", "first", "last_ts", "following", "close",
+                 "subscribers", "read_at", "ended_at", "ready", "error", "complete")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lines: deque = deque()  # (ts, text)
+        self.bytes = 0
+        self.first = 0               # offset of lines[0]
+        self.last_ts = ""
+        self.following = False
+        self.close = None
+        self.subscribers: set = set()
+        self.read_at = time.monotonic()
+        self.ended_at = 0.0
+        self.ready = threading.Event()  # set once the seed fetch finished
+        self.error = ""
+        self.complete = False  # holds the whole log: the seed got less than it asked for
+
+    @property
+    def end(self) -> int:
+        return self.first + len(self.lines)
+
+
+class LogMux:
+    """Per-container log ring buffers fed by one follower thread each."""
+
+    def __init__(self, source, max_bytes: int = 512 * 1024, max_lines: int = 5000,
+                 seed_lines: int = 500, idle_timeout: float = 600.0, queue_size: int = 1000,
+                 restart_delay: float = 2.0):
+        self.source = source
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.seed_lines = seed_lines
+        self.idle_timeout = idle_timeout
+        self.queue_size = queue_size
+        self.restart_delay = restart_delay
+        self._lock = threading.Lock()
+        self._buffers: dict[str, _Buffer] = {}
+        self._stats = {"reads": 0, "seeds": 0, "followers": 0, "lines": 0}
+
+    # ── public ────────────────────────────────────────────────────────────────
+
+    def tail(self, name: str, n: int = 100) -> dict:
+        """Last `n` lines; raises if the container's log cannot be read.
+
+        A cold buffer is seeded with max(seed_lines, n) lines; "truncated"
+        when fewer than `n` come back although the container logged more.
+        """
+        buf = self._ensure(name, n)
+        with self._lock:
+            start = max(buf.first, buf.end - n)
+            out = self._slice(buf, start, n)
+            out["truncated"] = len(out["lines"]) < n and not buf.complete
+            return out
+
+    def since(self, name: str, offset: int, limit: int = 1000) -> dict:
+        """Lines from `offset` on; "truncated" when older lines already left the buffer."""
+        buf = self._ensure(name)
+        with self._lock:
+            out = self._slice(buf, max(offset, buf.first), limit)
+            out["truncated"] = offset < buf.first
+            return out
+
+    def subscribe(self, name: str) -> Subscription:
+        buf = self._ensure(name)
+        sub = Subscription(self, name, self.queue_size)
+        with self._lock:
+            buf.subscribers.add(sub)
+        return sub
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "containers": {
+                b.name: {"lines": len(b.lines), "bytes": b.bytes, "offset": b.end,
+                         "following": b.following, "subscribers": len(b.subscribers)}
+                for b in self._buffers.values()}}
+
+    def close(self) -> None:
+        with self._lock:
+            buffers, self._buffers = list(self._buffers.values()), {}
+        for buf in buffers:
+            self._stop(buf)
+
+    # ── internal ──────────────────────────────────────────────────────────────
+
+    def _slice(self, buf: _Buffer, start: int, limit: int) -> dict:
+        """Caller holds _lock."""
+        i = start - buf.first
+        lines = [text for _ts, text in islice(buf.lines, i, i + limit)]
+        return {"lines": lines, "first": start, "offset": start + len(lines)}
+
+    def _ensure(self, name: str, seed: int = 0) -> _Buffer:
+        """Buffer for `name`, seeded (with at least `seed` lines) and followed.
+
+        Restarts a finished follower.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._stats["reads"] += 1
+            self._expire(now)
+            buf = self._buffers.get(name)
+            if buf is None:
+                buf = self._buffers[name] = _Buffer(name)
+            buf.read_at = now
+            # A stopped container's stream ends at once — don't respawn it per read
+            start = not buf.following and now - buf.ended_at >= self.restart_delay
+            if start:
+                buf.following = True  # claimed; other readers wait for the seed
+        if not start:
+            if not buf.ready.wait(timeout=30) or buf.error and not buf.lines:
+                raise RuntimeError(buf.error or f"logs of {name} not available")
+            return buf
+        try:
+            if not buf.ready.is_set():
+                want = max(self.seed_lines, seed)
+                rows = self.source.fetch(name, want)
+                with self._lock:
+                    self._stats["seeds"] += 1
+                    buf.complete = len(rows) < want
+                    self._append(buf, rows)
+            stream, close = self.source.follow(name, buf.last_ts)
+        except Exception as e:
+            with self._lock:
+                buf.following = False
+                buf.ended_at = time.monotonic()
+                buf.error = str(e)
+                if not buf.lines and self._buffers.get(name) is buf:
+                    del self._buffers[name]
+            buf.ready.set()
+            raise
+        with self._lock:
+            buf.close = close
+            buf.error = ""
+            self._stats["followers"] += 1
+        buf.ready.set()
+        threading.Thread(target=self._follow, args=(buf, stream), daemon=True,
+                         name=f"logs-{name}").start()
+        return buf
+
+    def _follow(self, buf: _Buffer, stream) -> None:
+        try:
+            for ts, text in stream:
+                with self._lock:
+                    # The follower starts at the seed's last timestamp — skip the overlap
+                    if ts and buf.last_ts and ts <= buf.last_ts:
+                        continue
+                    self._append(buf, [(ts, text)])
+        except Exception as e:
+            logger.debug("log follower for %s failed: %s", buf.name, e)
+            buf.error = str(e)
+        finally:
+            with self._lock:
+                buf.following = False
+                buf.ended_at = time.monotonic()
+                buf.close = None
+
+    def _append(self, buf: _Buffer, rows) -> None:
+        """Caller holds _lock."""
+        for ts, text in rows:
+            offset = buf.end
+            buf.lines.append((ts, text))
+            buf.bytes += len(text) + 1
+            if ts:
+                buf.last_ts = ts
+            self._stats["lines"] += 1
+            for sub in buf.subscribers:
+                sub._put((offset, text))
+        while buf.lines and (buf.bytes > self.max_bytes or len(buf.lines) > self.max_lines):
+            _ts, text = buf.lines.popleft()
+            buf.bytes -= len(text) + 1
+            buf.first += 1
+            buf.complete = False
+
+    def _expire(self, now: float) -> None:
+        """Drop buffers nobody has read or subscribed to lately. Caller holds _lock."""
+        for name, buf in list(self._buffers.items()):
+            if not buf.subscribers and now - buf.read_at > self.idle_timeout:
+                del self._buffers[name]
+                if buf.close is not None:
+                    threading.Thread(target=buf.close, daemon=True).start()
+
+    def _stop(self, buf: _Buffer) -> None:
+        if buf.close is not None:
+            try:
+                buf.close()
+            except Exception:
+                pass
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            buf = self._buffers.get(sub.name)
+            if buf is not None:
+                buf.subscribers.discard(sub)
+                buf.read_at = time.monotonic()
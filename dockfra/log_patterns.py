@@ -0,0 +1,110 @@
+"""
+dockfra.log_patterns — Ordered regex rule sets matched in one pass per line.
+
+run_cmd() checks every streamed build/launch line against the config-error
+and health rules.  Searching each rule separately costs one regex call per
+rule per line, although almost no line matches anything.  PatternSet works
+in two stages:
+
+  1. prefilter — every rule branch has a required literal (its longest
+     literal run, lower-cased); one case-sensitive scan of the lower-cased
+     line for any of them rejects nearly all lines;
+  2. confirm — rules whose literal occurs (plus any rule without a usable
+     literal) are searched in list order, so the first matching rule wins
+     and its groups are the rule's own.
+
+Usage:
+    rules = PatternSet([(r"port is already allocated", "hp_port_conflict"), ...])
+    hit = rules.search(line, skip=fired)    # → Hit(index, key, payload, match) | None
+"""
+from __future__ import annotations
+
+import re
+from collections import namedtuple
+
+try:
+    from re import _constants as _sre_const, _parser as _sre_parse  # 3.11+
+except ImportError:  # pragma: no cover
+    import sre_constants as _sre_const
+    import sre_parse as _sre_parse
+
+_MIN_LITERAL = 3
+
+# match is the rule's own re.Match, so group numbers are the rule's
+Hit = namedtuple("Hit", "index key payload match")
+
+
+class PatternSet:
+    """Ordered (pattern, payload) rules; search() returns the first rule that matches.
+
+    `keys` name each rule for the `skip` set (defaults to the pattern);
+    `flags` apply to every rule.
+    """
+
+    def __init__(self, rules, keys=None, flags: int = re.IGNORECASE):
+        rules = list(rules)
+        self.payloads = [payload for _pattern, payload in rules]
+        self.keys = list(keys) if keys is not None else [pattern for pattern, _ in rules]
+        self._rules = [re.compile(pattern, flags) for pattern, _ in rules]
+        # Per rule: literals of which at least one must occur, or None (always check)
+        self._literals = [_required_literals(pattern, flags) for pattern, _ in rules]
+        self._always = any(lits is None for lits in self._literals)
+        found = sorted({lit for lits in self._literals if lits for lit in lits}, key=len, reverse=True)
+        self._prefilter = re.compile("|".join(map(re.escape, found))) if found else None
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def search(self, text: str, skip=()) -> Hit | None:
+        """First rule (in list order) matching anywhere in `text`, ignoring keys in `skip`."""
+        # str.lower() matches IGNORECASE folding for the ASCII literals log rules use
+        lowered = text.lower()
+        if not self._always and (self._prefilter is None or self._prefilter.search(lowered) is None):
+            return None
+        for i, rule in enumerate(self._rules):
+            if self.keys[i] in skip:
+                continue
+            lits = self._literals[i]
+            if lits is not None and not any(lit in lowered for lit in lits):
+                continue
+            m = rule.search(text)
+            if m is not None:
+                return Hit(i, self.keys[i], self.payloads[i], m)
+        return None
+
+
+def _required_literals(pattern: str, flags: int):
+    """Lower-cased literals, one per alternative, one of which every match contains.
+
+    None when some alternative has no literal run of _MIN_LITERAL characters
+    (or the pattern cannot be analysed) — such a rule is always confirmed.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+    literals = _branch_literals(list(parsed))
+    return tuple(sorted(set(literals))) if literals is not None else None
+
+
+def _branch_literals(items: list):
+    # The parser factors common prefixes out of alternations ("ab|ac" becomes
+    # a, BRANCH[b, c]), so expand a top-level BRANCH back into full sequences
+    for n, (op, av) in enumerate(items):
+        if op is _sre_const.BRANCH:
+            out = []
+            for branch in av[1]:
+                lits = _branch_literals(items[:n] + list(branch) + items[n + 1:])
+                if lits is None:
+                    return None
+                out.extend(lits)
+            return out
+    best, run = "", []
+    for op, av in items + [(None, None)]:
+        if op is _sre_const.LITERAL:
+            run.append(chr(av))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+    return [best.lower()] if len(best) >= _MIN_LITERAL else None
@@ -0,0 +1,310 @@
+"""
+dockfra.projections — Materialized read models built from the event log.
+
+A Projection folds events into a JSON-serialisable state dict.  The
+ProjectionManager keeps each registered projection current:
+
+  - on startup it loads the persisted snapshot (state + last applied event
+    id) and catches up from there in streamed pages, never loading the full
+    history into memory;
+  - afterwards it applies live events from the bus as they are emitted;
+  - snapshots are re-saved every `snapshot_every` events and after catch-up.
+
+Usage:
+    mgr = ProjectionManager(get_bus(), db)
+    mgr.register(TicketBoardProjection())
+    mgr.catch_up_all()
+    mgr.state("ticket_board")
+"""
+from __future__ import annotations
+
+import fnmatch
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any
+
+from .event_bus import Event, EventBus, EventType
+
+logger = logging.getLogger(__name__)
+
+
+class Projection:
+    """Base class — subclasses set `name`/`events` and implement apply()."""
+
+    name: str = ""
+    # fnmatch globs of event types this projection consumes
+    events: tuple[str, ...] = ("*",)
+    # Bump when apply() changes meaning; stale snapshots are then rebuilt from scratch
+    version: int = 1
+
+    def initial_state(self) -> dict:
+        return {}
+
+    def apply(self, state: dict, ev: Event) -> None:
+        raise NotImplementedError
+
+    def wants(self, event_type: str) -> bool:
+        return any(fnmatch.fnmatchcase(event_type, p) for p in self.events)
+
+
+# ── Built-in projections ──────────────────────────────────────────────────────
+
+class TicketBoardProjection(Projection):
+    """Ticket id → {title, status, priority, assigned_to, comments, updated}."""
+
+    name = "ticket_board"
+    events = ("ticket.*",)
+
+    def apply(self, state: dict, ev: Event) -> None:
+        tid = ev.data.get("id")
+        if not tid:
+            return
+        t = state.setdefault(tid, {"status": "open", "comments": 0})
+        t["updated"] = ev.ts
+        if ev.event == EventType.TICKET_CREATED:
+            for k in ("title", "priority", "assigned_to"):
+                if ev.data.get(k) is not None:
+                    t[k] = ev.data[k]
+        elif ev.event in (EventType.TICKET_UPDATED, EventType.TICKET_CLOSED, EventType.TICKET_ASSIGNED):
+            t.update({k: v for k, v in (ev.data.get("changes") or {}).items()
+                      if k in ("title", "status", "priority", "assigned_to")})
+            if ev.event == EventType.TICKET_CLOSED:
+                t["status"] = (ev.data.get("changes") or {}).get("status", "closed")
+        elif ev.event == EventType.TICKET_COMMENTED:
+            t["comments"] = t.get("comments", 0) + 1
+
+
+class ContainerStateProjection(Projection):
+    """Container name → {state, health, since}."""
+
+    name = "container_state"
+    events = ("container.*",)
+
+    def apply(self, state: dict, ev: Event) -> None:
+        name = ev.data.get("name") or ev.data.get("container")
+        if not name:
+            return
+        c = state.setdefault(name, {"state": "unknown", "health": ""})
+        if ev.event == EventType.CONTAINER_STARTED:
+            c.update(state="running", since=ev.ts)
+        elif ev.event == EventType.CONTAINER_STOPPED:
+            c.update(state="stopped", since=ev.ts)
+        elif ev.event == EventType.CONTAINER_HEALTH:
+            c["health"] = ev.data.get("health") or ev.data.get("status", "")
+
+
+class PipelineScoresProjection(Projection):
+    """Ticket id → {status, runs, last_score, best_score, steps}."""
+
+    name = "pipeline_scores"
+    events = ("pipeline.*",)
+
+    def apply(self, state: dict, ev: Event) -> None:
+        tid = ev.data.get("ticket_id") or ev.data.get("id")
+        if not tid:
+            return
+        p = state.setdefault(tid, {"status": "", "runs": 0, "steps": 0,
+                                   "last_score": None, "best_score": None})
+        if ev.event == EventType.PIPELINE_STARTED:
+            p["runs"] += 1
+            p["status"] = "running"
+        elif ev.event == EventType.PIPELINE_STEP_DONE:
+            p["steps"] += 1
+        elif ev.event == EventType.PIPELINE_COMPLETED:
+            p["status"] = "completed"
+        elif ev.event == EventType.PIPELINE_FAILED:
+            p["status"] = "failed"
+        score = ev.data.get("score")
+        if isinstance(score, (int, float)):
+            p["last_score"] = score
+            p["best_score"] = score if p["best_score"] is None else max(p["best_score"], score)
+
+
+BUILTIN_PROJECTIONS = (TicketBoardProjection, ContainerStateProjection, PipelineScoresProjection)
+
+
+# ── Manager ───────────────────────────────────────────────────────────────────
+
+class _Slot:
+    __slots__ = ("projection", "state", "last_id", "lock", "pending", "ready",
+                 "since_snapshot", "stats")
+
+    def __init__(self, projection: Projection):
+        self.projection = projection
+        self.state: dict = projection.initial_state()
+        self.last_id = 0
+        self.lock = threading.Lock()
+        self.pending: deque = deque()  # live events that arrived while the lock was busy
+        self.ready = False             # live events are ignored until the first catch-up
+        self.since_snapshot = 0
+        self.stats: dict[str, Any] = {}
+
+
+class ProjectionManager:
+    """Keeps registered projections current from snapshots, catch-up and live events."""
+
+    def __init__(self, bus: EventBus, db_module=None, page_size: int = 1000,
+                 snapshot_every: int = 5000, mode: str = "sync"):
+        self._bus = bus
+        self._db = db_module
+        self.page_size = page_size
+        self.snapshot_every = snapshot_every
+        self._slots: dict[str, _Slot] = {}
+        # mode="thread" applies live events off the emitting thread (see Subscription).
+        # Projections are stateful, so the queue blocks instead of dropping, and
+        # only the event types some projection consumes are delivered at all
+        # (a log_line storm never reaches it).
+        self.subscription = bus.subscribe_all(self._on_event, mode=mode, name="projections",
+                                              overflow="block")
+
+    def register(self, projection: Projection) -> None:
+        slot = _Slot(projection)
+        snap = self._db.load_snapshot(projection.name) if self._db else None
+        if snap and snap["version"] == projection.version:
+            slot.state, slot.last_id = snap["state"], snap["last_id"]
+        self._slots[projection.name] = slot
+        types = {p for s in self._slots.values() for p in s.projection.events}
+        self.subscription.set_types(() if "*" in types else tuple(sorted(types)))
+
+    def names(self) -> list[str]:
+        return list(self._slots)
+
+    def state(self, name: str) -> dict | None:
+        slot = self._slots.get(name)
+        if not slot:
+            return None
+        with slot.lock:
+            return dict(slot.state)
+
+    def status(self) -> dict:
+        return {name: {"last_id": s.last_id, "version": s.projection.version, **s.stats}
+                for name, s in self._slots.items()}
+
+    def catch_up(self, name: str) -> dict:
+        """Apply stored events after the projection's last id, page by page."""
+        slot = self._slots[name]
+        t0 = time.perf_counter()
+        scanned = applied = 0
+        with slot.lock:
+            start_id = slot.last_id
+            # From here on live events are parked; anything published earlier
+            # is already in the store and is read below.
+            slot.ready = True
+            for ev in self._bus.iter_events(slot.last_id, self.page_size):
+                scanned += 1
+                applied += self._apply(slot, ev, live=False)
+            applied += self._drain(slot)
+            self._snapshot(slot)
+        if slot.pending:
+            with slot.lock:
+                self._drain(slot)
+        elapsed = time.perf_counter() - t0
+        slot.stats = {
+            "from_id": start_id, "scanned": scanned, "applied": applied,
+            "seconds": round(elapsed, 4),
+            "events_per_sec": round(scanned / elapsed) if elapsed > 0 else scanned,
+        }
+        return slot.stats
+
+    def catch_up_all(self) -> dict:
+        return {name: self.catch_up(name) for name in self._slots}
+
+    def rebuild(self, name: str) -> dict:
+        """Drop the snapshot and replay the projection from the first event."""
+        slot = self._slots[name]
+        with slot.lock:
+            slot.state = slot.projection.initial_state()
+            slot.last_id = 0
+            slot.pending.clear()
+            if self._db:
+                self._db.delete_snapshot(name)
+        return self.catch_up(name)
+
+    def save_snapshots(self) -> None:
+        for slot in self._slots.values():
+            with slot.lock:
+                self._snapshot(slot)
+
+    # ── internal ──────────────────────────────────────────────────────────────
+
+    def _on_event(self, ev: Event) -> None:
+        if not ev.id:
+            return
+        for slot in list(self._slots.values()):
+            if not slot.ready:
+                continue
+            # Never block the emitting thread behind a catch-up; park the event instead
+            slot.pending.append(ev)
+            if not slot.lock.acquire(blocking=False):
+                continue
+            try:
+                if self._drain(slot) and slot.since_snapshot >= self.snapshot_every:
+                    self._snapshot(slot)
+            finally:
+                slot.lock.release()
+
+    def _drain(self, slot: _Slot) -> int:
+        """Apply parked live events in id order. Caller holds slot.lock."""
+        applied = 0
+        while slot.pending:
+            batch = sorted((slot.pending.popleft() for _ in range(len(slot.pending))),
+                           key=lambda e: e.id)
+            for ev in batch:
+                applied += self._apply(slot, ev)
+        return applied
+
+    def _apply(self, slot: _Slot, ev: Event, live: bool = True) -> int:
+        """Apply one event if it is new and wanted. Caller holds slot.lock."""
+        if ev.id <= slot.last_id:
+            return 0
+        applied = 0
+        if live and ev.id > slot.last_id + 1:
+            # Live events from different publishers (db commit listener, bus.emit)
+            # can arrive out of id order, and other types are not delivered at
+            # all: read whatever this projection missed below ev.id from the store
+            applied = self._fill_gap(slot, ev.id)
+            if ev.id <= slot.last_id:
+                return applied
+        slot.last_id = ev.id
+        etype = ev.event.value if isinstance(ev.event, Enum) else ev.event
+        if not slot.projection.wants(etype):
+            return 0
+        try:
+            slot.projection.apply(slot.state, ev)
+        except Exception:
+            logger.exception("Projection %s failed on event %s", slot.projection.name, ev.id)
+        slot.since_snapshot += 1
+        return applied + 1
+
+    def _fill_gap(self, slot: _Slot, upto: int) -> int:
+        """Apply stored events with last_id < id < upto. Caller holds slot.lock."""
+        applied = 0
+        if self._db is not None:
+            # Only this projection's types — skips the log lines in between
+            events = slot.projection.events
+            types = None if "*" in events else list(events)
+            while True:
+                page = self._db.get_events(since_id=slot.last_id, limit=self.page_size,
+                                           event_type=types)
+                page = [e for e in page if e["id"] < upto]
+                for e in page:
+                    applied += self._apply(slot, Event.from_dict(e), live=False)
+                if len(page) < self.page_size:
+                    break
+        else:
+            for ev in self._bus.iter_events(slot.last_id, self.page_size):
+                if ev.id >= upto:
+                    break
+                applied += self._apply(slot, ev, live=False)
+        slot.last_id = max(slot.last_id, upto - 1)
+        slot.stats["gap_fills"] = slot.stats.get("gap_fills", 0) + 1
+        return applied
+
+    def _snapshot(self, slot: _Slot) -> None:
+        if self._db:
+            self._db.save_snapshot(slot.projection.name, slot.projection.version,
+                                   slot.last_id, slot.state)
+        slot.since_snapshot = 0
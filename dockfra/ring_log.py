@@ -0,0 +1,145 @@
+"""
+dockfra.ring_log — Bounded in-process history for the chat and run_cmd logs.
+
+core._conversation and core._logs were plain lists of dicts: they grew for
+as long as the wizard ran, /api/history serialised them whole, and every
+new client was sent the entire conversation.  RingLog keeps the newest
+entries only, capped by count and by text bytes, in `__slots__` records:
+
+  - every entry gets a sequence number from a SeqClock shared by both
+    rings, so one cursor covers conversation and logs
+    (/api/history?since=<cursor> returns only what is new);
+  - ids are derived from the sequence number, so they stay unique after
+    old entries are evicted or the rings are cleared;
+  - before(seq) pages backwards for the chat's "load older" button.
+
+Usage:
+    clock = SeqClock()
+    conversation = RingLog(2000, id_prefix="msg", clock=clock)
+    m = conversation.append({"role": "bot", "text": "hi", "timestamp": time.time()})
+    conversation.since(cursor), conversation.last(50), conversation.before(m["seq"])
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from itertools import islice
+
+
+class SeqClock:
+    """Sequence numbers shared by several RingLogs; `last` is the newest issued."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last = 0
+
+    def cursor(self) -> int:
+        with self.lock:
+            return self.last
+
+
+class _Entry:
+    __slots__ = ("seq", "id", "role", "text", "timestamp", "extra")
+
+    def __init__(self, seq: int, record: dict):
+        self.seq = seq
+        self.id = record.pop("id")
+        self.role = record.pop("role", None)
+        self.text = record.pop("text", "")
+        self.timestamp = record.pop("timestamp", None)
+        self.extra = record or None  # rare keys such as "src"
+
+    def as_dict(self) -> dict:
+        d = {"id": self.id, "seq": self.seq}
+        if self.role is not None:
+            d["role"] = self.role
+        d["text"] = self.text
+        if self.timestamp is not None:
+            d["timestamp"] = self.timestamp
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+
+class RingLog:
+    """Newest `capacity` entries (and at most `max_bytes` of text), oldest evicted first."""
+
+    def __init__(self, capacity: int, max_bytes: int = 8 * 1024 * 1024,
+                 id_prefix: str = "entry", clock: SeqClock | None = None):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.id_prefix = id_prefix
+        self._clock = clock or SeqClock()
+        self._items: deque = deque()
+        self._bytes = 0
+        self.evicted = 0
+
+    # ── writing ───────────────────────────────────────────────────────────────
+
+    def append(self, record: dict) -> dict:
+        """Store `record` (id defaults to "<prefix>-<seq>"); returns it with id and seq."""
+        record = dict(record)
+        with self._clock.lock:
+            self._clock.last += 1
+            seq = self._clock.last
+            record.setdefault("id", f"{self.id_prefix}-{seq}")
+            entry = _Entry(seq, record)
+            self._items.append(entry)
+            self._bytes += len(entry.text)
+            while self._items and (len(self._items) > self.capacity or self._bytes > self.max_bytes):
+                self._bytes -= len(self._items.popleft().text)
+                self.evicted += 1
+        return entry.as_dict()
+
+    def clear(self) -> None:
+        """Drop all entries; sequence numbers (and so ids) keep counting."""
+        with self._clock.lock:
+            self._items.clear()
+            self._bytes = 0
+
+    # ── reading ───────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        with self._clock.lock:
+            items = list(self._items)
+        return (e.as_dict() for e in items)
+
+    @property
+    def oldest_seq(self) -> int | None:
+        with self._clock.lock:
+            return self._items[0].seq if self._items else None
+
+    def last(self, n: int) -> list[dict]:
+        with self._clock.lock:
+            items = list(islice(reversed(self._items), n))
+        return [e.as_dict() for e in reversed(items)]
+
+    def since(self, seq: int, limit: int = 500) -> list[dict]:
+        """Up to `limit` entries with a sequence number above `seq`, oldest first."""
+        with self._clock.lock:
+            # New entries sit at the right end — walk back only over those
+            newer = []
+            for e in reversed(self._items):
+                if e.seq <= seq:
+                    break
+                newer.append(e)
+        return [e.as_dict() for e in reversed(newer[-limit:])] if newer else []
+
+    def before(self, seq: int, limit: int = 50) -> list[dict]:
+        """The `limit` entries just before `seq`, oldest first."""
+        with self._clock.lock:
+            older = []
+            for e in reversed(self._items):
+                if e.seq < seq:
+                    older.append(e)
+                    if len(older) >= limit:
+                        break
+        return [e.as_dict() for e in reversed(older)]
+
+    def stats(self) -> dict:
+        with self._clock.lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "evicted": self.evicted,
+                    "capacity": self.capacity}
@@ -14,7 +14,8 @@ const TRANSLATIONS = {
        errProcesses:'Błąd ładowania procesów', failAction:'Nie udało się {action} {name}: {msg}',
        errAction:'Błąd {action} na {name}: {msg}', services:'🌐 Usługi', noServices:'Brak usług',
        errServices:'Błąd ładowania usług', stats:'📊 Statystyki', noStats:'Brak danych',
-       save:'💾 Zapisz', cancel:'Anuluj', apply:'Zastosuj' },
+       save:'💾 Zapisz', cancel:'Anuluj', apply:'Zastosuj',
+       loadOlder:'⬆ Wcześniejsze wiadomości' },
   en:{ chat:'💬 Chat', processes:'⚙️ Processes', logs:'📋 Logs', copy:'📋 Copy',
        connecting:'Connecting...', connected:'Connected', disconnected:'Disconnected', sub:'Setup Wizard',
        stop:'Stop', restart:'Restart', changePort:'Change Port', fix:'Fix it',
@@ -22,7 +23,8 @@ const TRANSLATIONS = {
        errProcesses:'Error loading processes', failAction:'Failed to {action} {name}: {msg}',
        errAction:'Error executing {action} on {name}: {msg}', services:'🌐 Services', noServices:'No services',
        errServices:'Error loading services', stats:'📊 Statistics', noStats:'No data',
-       save:'💾 Save', cancel:'Cancel', apply:'Apply' },
+       save:'💾 Save', cancel:'Cancel', apply:'Apply',
+       loadOlder:'⬆ Load older messages' },
   de:{ chat:'💬 Chat', processes:'⚙️ Prozesse', logs:'📋 Protokolle', copy:'📋 Kopieren',
        connecting:'Verbinde...', connected:'Verbunden', disconnected:'Getrennt', sub:'Einrichtungsassistent',
        stop:'Stoppen', restart:'Neustart', changePort:'Port ändern', fix:'Reparieren',
@@ -30,7 +32,8 @@ const TRANSLATIONS = {
        errProcesses:'Fehler beim Laden der Prozesse', failAction:'{action} für {name} fehlgeschlagen: {msg}',
        errAction:'Fehler bei {action} für {name}: {msg}', services:'🌐 Dienste', noServices:'Keine Dienste',
        errServices:'Fehler beim Laden der Dienste', stats:'📊 Statistiken', noStats:'Keine Daten',
-       save:'💾 Speichern', cancel:'Abbrechen', apply:'Anwenden' },
+       save:'💾 Speichern', cancel:'Abbrechen', apply:'Anwenden',
+       loadOlder:'⬆ Ältere Nachrichten laden' },
   fr:{ chat:'💬 Chat', processes:'⚙️ Processus', logs:'📋 Journaux', copy:'📋 Copier',
        connecting:'Connexion...', connected:'Connecté', disconnected:'Déconnecté', sub:'Assistant de configuration',
        stop:'Arrêter', restart:'Redémarrer', changePort:'Changer le port', fix:'Réparer',
@@ -38,7 +41,8 @@ const TRANSLATIONS = {
        errProcesses:'Erreur de chargement des processus', failAction:'Échec de {action} {name} : {msg}',
        errAction:'Erreur {action} sur {name} : {msg}', services:'🌐 Services', noServices:'Aucun service',
        errServices:'Erreur de chargement des services', stats:'📊 Statistiques', noStats:'Pas de données',
-       save:'💾 Enregistrer', cancel:'Annuler', apply:'Appliquer' },
+       save:'💾 Enregistrer', cancel:'Annuler', apply:'Appliquer',
+       loadOlder:'⬆ Messages précédents' },
   es:{ chat:'💬 Chat', processes:'⚙️ Procesos', logs:'📋 Registros', copy:'📋 Copiar',
        connecting:'Conectando...', connected:'Conectado', disconnected:'Desconectado', sub:'Asistente de configuración',
        stop:'Detener', restart:'Reiniciar', changePort:'Cambiar puerto', fix:'Reparar',
@@ -46,7 +50,8 @@ const TRANSLATIONS = {
        errProcesses:'Error al cargar procesos', failAction:'Error al {action} {name}: {msg}',
        errAction:'Error {action} en {name}: {msg}', services:'🌐 Servicios', noServices:'Sin servicios',
        errServices:'Error al cargar servicios', stats:'📊 Estadísticas', noStats:'Sin datos',
-       save:'💾 Guardar', cancel:'Cancelar', apply:'Aplicar' },
+       save:'💾 Guardar', cancel:'Cancelar', apply:'Aplicar',
+       loadOlder:'⬆ Mensajes anteriores' },
   it:{ chat:'💬 Chat', processes:'⚙️ Processi', logs:'📋 Log', copy:'📋 Copia',
        connecting:'Connessione...', connected:'Connesso', disconnected:'Disconnesso', sub:'Procedura guidata',
        stop:'Ferma', restart:'Riavvia', changePort:'Cambia porta', fix:'Ripara',
@@ -54,7 +59,8 @@ const TRANSLATIONS = {
        errProcesses:'Errore caricamento processi', failAction:'Errore {action} {name}: {msg}',
        errAction:'Errore {action} su {name}: {msg}', services:'🌐 Servizi', noServices:'Nessun servizio',
        errServices:'Errore caricamento servizi', stats:'📊 Statistiche', noStats:'Nessun dato',
-       save:'💾 Salva', cancel:'Annulla', apply:'Applica' },
+       save:'💾 Salva', cancel:'Annulla', apply:'Applica',
+       loadOlder:'⬆ Messaggi precedenti' },
   pt:{ chat:'💬 Chat', processes:'⚙️ Processos', logs:'📋 Registos', copy:'📋 Copiar',
        connecting:'A ligar...', connected:'Ligado', disconnected:'Desligado', sub:'Assistente de configuração',
        stop:'Parar', restart:'Reiniciar', changePort:'Mudar porta', fix:'Corrigir',
@@ -62,7 +68,8 @@ const TRANSLATIONS = {
        errProcesses:'Erro ao carregar processos', failAction:'Erro ao {action} {name}: {msg}',
        errAction:'Erro {action} em {name}: {msg}', services:'🌐 Serviços', noServices:'Sem serviços',
        errServices:'Erro ao carregar serviços', stats:'📊 Estatísticas', noStats:'Sem dados',
-       save:'💾 Guardar', cancel:'Cancelar', apply:'Aplicar' },
+       save:'💾 Guardar', cancel:'Cancelar', apply:'Aplicar',
+       loadOlder:'⬆ Mensagens anteriores' },
   cs:{ chat:'💬 Chat', processes:'⚙️ Procesy', logs:'📋 Logy', copy:'📋 Kopírovat',
        connecting:'Připojování...', connected:'Připojeno', disconnected:'Odpojeno', sub:'Průvodce nastavením',
        stop:'Zastavit', restart:'Restartovat', changePort:'Změnit port', fix:'Opravit',
@@ -70,7 +77,8 @@ const TRANSLATIONS = {
        errProcesses:'Chyba načítání procesů', failAction:'Chyba {action} {name}: {msg}',
        errAction:'Chyba {action} na {name}: {msg}', services:'🌐 Služby', noServices:'Žádné služby',
        errServices:'Chyba načítání služeb', stats:'📊 Statistiky', noStats:'Žádná data',
-       save:'💾 Uložit', cancel:'Zrušit', apply:'Použít' },
+       save:'💾 Uložit', cancel:'Zrušit', apply:'Použít',
+       loadOlder:'⬆ Starší zprávy' },
   ro:{ chat:'💬 Chat', processes:'⚙️ Procese', logs:'📋 Jurnale', copy:'📋 Copiați',
        connecting:'Se conectează...', connected:'Conectat', disconnected:'Deconectat', sub:'Expert configurare',
        stop:'Oprire', restart:'Repornire', changePort:'Schimbă portul', fix:'Repară',
@@ -78,7 +86,8 @@ const TRANSLATIONS = {
        errProcesses:'Eroare la încărcarea proceselor', failAction:'Eroare {action} {name}: {msg}',
        errAction:'Eroare {action} pe {name}: {msg}', services:'🌐 Servicii', noServices:'Fără servicii',
        errServices:'Eroare la încărcarea serviciilor', stats:'📊 Statistici', noStats:'Fără date',
-       save:'💾 Salvează', cancel:'Anulează', apply:'Aplică' },
+       save:'💾 Salvează', cancel:'Anulează', apply:'Aplică',
+       loadOlder:'⬆ Mesaje anterioare' },
   nl:{ chat:'💬 Chat', processes:'⚙️ Processen', logs:'📋 Logboek', copy:'📋 Kopiëren',
        connecting:'Verbinden...', connected:'Verbonden', disconnected:'Verbroken', sub:'Installatiewizard',
        stop:'Stoppen', restart:'Herstarten', changePort:'Poort wijzigen', fix:'Repareren',
@@ -86,7 +95,8 @@ const TRANSLATIONS = {
        errProcesses:'Fout bij laden processen', failAction:'Fout bij {action} {name}: {msg}',
        errAction:'Fout {action} op {name}: {msg}', services:'🌐 Services', noServices:'Geen services',
        errServices:'Fout bij laden services', stats:'📊 Statistieken', noStats:'Geen gegevens',
-       save:'💾 Opslaan', cancel:'Annuleren', apply:'Toepassen' },
+       save:'💾 Opslaan', cancel:'Annuleren', apply:'Toepassen',
+       loadOlder:'⬆ Oudere berichten' },
 };
 let _lang = localStorage.getItem('wizard_lang') || 'pl';
 function t(k){ return (TRANSLATIONS[_lang]||TRANSLATIONS.pl)[k]||k; }
@@ -297,8 +307,8 @@ function stripMotd(text) {
 }
 
 // ── Messages ──────────────────────────────────────────────────────────────────
-socket.on('message', d => {
-  if (d.id && document.querySelector(`[data-msg-id="${d.id}"]`)) return;
+function renderMessage(d) {
+  if (d.id && document.querySelector(`[data-msg-id="${d.id}"]`)) return null;
   const div = document.createElement('div');
   div.className = `msg ${d.role}`;
   if (d.id) div.setAttribute('data-msg-id', d.id);
@@ -315,10 +325,41 @@ socket.on('message', d => {
       <div class="bubble">${srcBadge}${renderMd(text)}</div>
       <div class="msg-copy" onclick="copyMessage(this)" title="Copy message">📋</div>`;
   }
+  return div;
+}
+
+socket.on('message', d => {
+  const div = renderMessage(d);
+  if (!div) return;
   chat.appendChild(div);
   chat.scrollTop = chat.scrollHeight;
 });
 
+// ── Older history (only the latest messages are replayed on connect) ──────────
+function showLoadOlder(before) {
+  const old = chat.querySelector('.load-older');
+  if (old) old.remove();
+  if (before == null) return;
+  const btn = document.createElement('button');
+  btn.className = 'load-older';
+  btn.textContent = t('loadOlder');
+  btn.onclick = async () => {
+    btn.disabled = true;
+    try {
+      const r = await fetch(`/api/history?before=${before}&limit=50&logs=0`);
+      const d = await r.json();
+      const anchor = btn.nextSibling;
+      (d.conversation || []).forEach(m => {
+        const div = renderMessage(m);
+        if (div) chat.insertBefore(div, anchor);
+      });
+      showLoadOlder(d.older);
+    } catch(e) { btn.disabled = false; }
+  };
+  chat.insertBefore(btn, chat.firstChild);
+}
+socket.on('history_more', d => showLoadOlder(d.before));
+
 // Delegate ticket card button clicks (in chat bubbles)
 chat.addEventListener('click', e => {
   const btn = e.target.closest('.ticket-btn');
@@ -1162,7 +1203,7 @@ async function updateStats() {
   try {
     const [s, tickets] = await Promise.all([
       fetch('/api/stats').then(r => r.json()),
-      fetch('/api/tickets').then(r => r.json()),
+      fetch('/api/tickets?fields=title,description,status,priority,github_issue_number,github_repo').then(r => r.json()),
     ]);
     let html = '';
 
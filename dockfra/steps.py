@@ -66,8 +66,8 @@ def step_status():
     msg(t('system_status', ok=len(running), fail=len(failing)))
     if failing:
         msg(t('problem_analysis', n=len(failing)))
-        for c in failing:
-            finding, btns = _analyze_container_log(c["name"])
+        findings = _analyze_containers([c["name"] for c in failing])
+        for c, (finding, btns) in zip(failing, findings):
             msg(f"#### `{c['name']}` — {c['status']}\n{finding}")
             if btns:
                 btns.insert(0, {"label": t('logs_for_container', name=c['name']), "value": f"logs::{c['name']}"})
@@ -92,7 +92,7 @@ def step_show_logs(container):
     clear_widgets()
     msg(t('logs_title', name=container, n=60))
     try:
-        out = subprocess.check_output(["docker","logs","--tail","60",container],text=True,stderr=subprocess.STDOUT)
+        out = "\n".join(_log_mux.tail(container, 60)["lines"])
         code_block(out[-4000:])
     except Exception as e: msg(t('cannot_get_logs', err=e))
     buttons([{"label": t('refresh'),"value":f"logs::{container}"},{"label": t('other_logs'),"value":"pick_logs"}])
@@ -521,16 +521,15 @@ def step_do_launch(form):
         # docker compose up -d exits 0 even if containers crash on startup.
         # Wait for containers to stabilise, then check their runtime status.
         progress(t('health_checking'))
-        time.sleep(8)
+        all_containers = _wait_containers_settled()
         progress(t('health_checking'), done=True)
-        all_containers = docker_ps()
         restarting = [c for c in all_containers
                       if "Restarting" in c["status"] or
                          ("Exit" in c["status"] and c["status"] != "Exited (0)")]
         if restarting:
             msg(t('containers_problems_post', n=len(restarting)))
-            for c in restarting:
-                finding, btns = _analyze_container_log(c["name"])
+            findings = _analyze_containers([c["name"] for c in restarting])
+            for c, (finding, btns) in zip(restarting, findings):
                 msg(f"#### 🔴 `{c['name']}` — {c['status']}\n{finding}")
                 if btns:
                     btns.insert(0, {"label": t('logs_for_container', name=c['name']), "value": f"logs::{c['name']}"})
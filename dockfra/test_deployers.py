@@ -109,15 +109,13 @@ def test_http_health_checker_with_mock(monkeypatch):
     class DummyResp:
         status = 204
 
-        def __enter__(self):
-            return self
+    class DummyClient:
+        def request(self, *_a, **_kw):
+            return DummyResp()
 
-        def __exit__(self, exc_type, exc, tb):
-            return False
+    import dockfra.deployers.health as _health
 
-    import urllib.request as _url
-
-    monkeypatch.setattr(_url, "urlopen", lambda *_a, **_kw: DummyResp())
+    monkeypatch.setattr(_health, "get_client", lambda: DummyClient())
     result = checker.check_http("http://example.test")
 
     assert result["ok"] is True
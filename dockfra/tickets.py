@@ -7,13 +7,41 @@ Canonical module used by:
 
 Tickets stored as JSON files in TICKETS_DIR.
 Optional sync with GitHub Issues, Jira, Trello, Linear.
+
+Reads go through an in-memory index (_TicketIndex) keyed by status,
+assignee, priority and external issue ids.  The JSON files stay the source
+of truth — containers sharing /shared/tickets write them directly — so the
+index is re-validated against file mtime/size/inode and only files that
+changed are re-parsed.  Creates and deletes (directory mtime) are seen on
+the next query; in-place edits by other processes within
+DOCKFRA_TICKETS_RESCAN seconds (default 1).
+
+sync_all() pulls all configured providers concurrently.  Each pull pages
+through the provider's API and resumes from a cursor (ETag / since) kept in
+TICKETS_DIR/.sync_state.json; rate-limit headers are honoured.
 """
 import os
+import re
 import json
 import glob
+import math
+import time
+import heapq
+import random
+import itertools
+import bisect
 import logging
+import threading
+from contextlib import contextmanager
+from collections import namedtuple
 from pathlib import Path
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows — O_EXCL in create() still prevents overwrites
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +67,25 @@ TRELLO_LIST = os.environ.get("TRELLO_LIST", "")
 LINEAR_TOKEN = os.environ.get("LINEAR_TOKEN", "")
 LINEAR_TEAM = os.environ.get("LINEAR_TEAM", "")
 
+# API endpoints (overridable for GitHub Enterprise, proxies and test stubs)
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+TRELLO_API_URL = os.environ.get("TRELLO_API_URL", "https://api.trello.com/1")
+LINEAR_API_URL = os.environ.get("LINEAR_API_URL", "https://api.linear.app/graphql")
+
+SYNC_TIMEOUT = float(os.environ.get("DOCKFRA_SYNC_TIMEOUT", "30"))
+SYNC_MAX_WAIT = float(os.environ.get("DOCKFRA_SYNC_MAX_WAIT", "60"))
+LOCK_TIMEOUT = float(os.environ.get("DOCKFRA_TICKET_LOCK_TIMEOUT", "10"))
+
+
+class RevisionConflict(Exception):
+    """update() was given an expected_revision that is no longer current."""
+
+    def __init__(self, ticket_id, expected, actual):
+        super().__init__(f"{ticket_id} is at revision {actual}, expected {expected}")
+        self.ticket_id = ticket_id
+        self.expected = expected
+        self.actual = actual
+
 
 def reload_env():
     """Re-read integration credentials from environment (call after save_env)."""
@@ -46,6 +93,7 @@ def reload_env():
     global JIRA_URL, JIRA_EMAIL, JIRA_TOKEN, JIRA_PROJECT
     global TRELLO_KEY, TRELLO_TOKEN_ENV, TRELLO_BOARD, TRELLO_LIST
     global LINEAR_TOKEN, LINEAR_TEAM
+    global GITHUB_API_URL, TRELLO_API_URL, LINEAR_API_URL
     GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
     GITHUB_REPO = os.environ.get("GITHUB_REPO", "")
     JIRA_URL = os.environ.get("JIRA_URL", "")
@@ -58,6 +106,9 @@ def reload_env():
     TRELLO_LIST = os.environ.get("TRELLO_LIST", "")
     LINEAR_TOKEN = os.environ.get("LINEAR_TOKEN", "")
     LINEAR_TEAM = os.environ.get("LINEAR_TEAM", "")
+    GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+    TRELLO_API_URL = os.environ.get("TRELLO_API_URL", "https://api.trello.com/1")
+    LINEAR_API_URL = os.environ.get("LINEAR_API_URL", "https://api.linear.app/graphql")
 
 
 def _ensure_dir():
@@ -109,25 +160,205 @@ def _safe_write(path, data: dict):
         raise PermissionError(f"Cannot write {p}: {e}") from e
 
 
+def _atomic_write(path, data: dict):
+    """Write ticket JSON to a temp file and rename it over `path`.
+
+    Readers (and the index) never see a half-written file.  Raises
+    PermissionError when the rename is refused (root-owned file in the
+    sticky tickets dir) — callers fall back to _safe_write.
+    """
+    raw = json.dumps(data, indent=2).encode()
+    tmp = os.path.join(os.path.dirname(path),
+                       f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            _write_all(fd, raw)
+            if hasattr(os, "fchmod"):
+                os.fchmod(fd, 0o666)  # umask-proof, so any container UID can edit it
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_all(fd, raw: bytes):
+    view = memoryview(raw)
+    while view:
+        view = view[os.write(fd, view):]
+
+
 def _now():
     return datetime.now(timezone.utc).isoformat()
 
 
+def parse_iso(value):
+    """ISO 8601 timestamp (a trailing "Z" allowed) → aware UTC datetime.
+
+    A timestamp without an offset is taken as UTC, like the ones _now()
+    writes.  Raises ValueError for anything else.
+    """
+    value = str(value).strip()
+    if value[-1:] in ("Z", "z"):
+        value = value[:-1] + "+00:00"
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
 def _ticket_path(ticket_id):
     return os.path.join(TICKETS_DIR, f"{ticket_id}.json")
 
 
-def _next_id():
-    _ensure_dir()
-    existing = glob.glob(os.path.join(TICKETS_DIR, "T-*.json"))
+# Comments live in an append-only JSONL log next to the ticket; the ticket
+# document keeps only comment_count and a last_comment summary.
+_COMMENTS_SUFFIX = ".comments.jsonl"
+_SUMMARY_CHARS = 200
+
+
+def _comments_path(ticket_id):
+    return os.path.join(TICKETS_DIR, f"{ticket_id}{_COMMENTS_SUFFIX}")
+
+
+def _append_comments(ticket_id, comments):
+    """Append comments to the ticket's log. Caller holds _ticket_locked()."""
+    path = _comments_path(ticket_id)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+    try:
+        _chmod_world_rw(path)
+        _write_all(fd, "".join(json.dumps(c, ensure_ascii=False) + "\n"
+                               for c in comments).encode())
+    finally:
+        os.close(fd)
+
+
+def _read_comments(path):
+    """Comments in a log file, oldest first; a torn last line is skipped."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return []
+    comments = []
+    for line in lines:
+        try:
+            c = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(c, dict):
+            comments.append(c)
+    return comments
+
+
+@contextmanager
+def _ticket_locked(ticket_id, timeout=None):
+    """Hold the ticket's advisory lock (flock on .<id>.lock) for a read-modify-write.
+
+    flock works across the wizard, the autopilot and every SSH container
+    sharing the tickets volume.  Acquisition is retried with jittered
+    exponential backoff (1 ms doubling to 50 ms) until `timeout` seconds
+    (LOCK_TIMEOUT by default), then TimeoutError is raised.
+    """
+    path = os.path.join(TICKETS_DIR, f".{ticket_id}.lock")
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        _chmod_world_rw(path)
+        if fcntl:
+            deadline = time.monotonic() + (LOCK_TIMEOUT if timeout is None else timeout)
+            delay = 0.001
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Ticket {ticket_id} is locked by another writer")
+                    time.sleep(delay * random.uniform(0.5, 1.5))
+                    delay = min(delay * 2, 0.05)
+        yield
+    finally:
+        os.close(fd)  # releases the lock
+
+
+def _write_ticket(path, ticket):
+    """Bump the revision and replace the file atomically (in place if renames are refused)."""
+    ticket["revision"] = ticket.get("revision", 0) + 1
+    try:
+        _atomic_write(path, ticket)
+    except PermissionError:
+        _safe_write(path, ticket)
+    _index.note_write(path, ticket)
+
+
+def _comment_count(ticket):
+    """Number of comments, for documents written before the log existed too."""
+    if "comment_count" in ticket:
+        return ticket["comment_count"]
+    return len(ticket.get("comments") or ())
+
+
+# Last allocated ticket number, shared by the wizard and SSH containers.
+# Guarded by flock on the file itself; rewritten in place under the lock.
+_SEQ_FILE = ".ticket_seq"
+
+
+@contextmanager
+def _seq_locked():
+    """Open the counter file with an exclusive cross-process lock held."""
+    path = os.path.join(TICKETS_DIR, _SEQ_FILE)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        _chmod_world_rw(path)
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield fd
+    finally:
+        os.close(fd)  # releases the lock
+
+
+def _scan_max_id():
+    """Highest T-NNNN number present on disk (recovery path only)."""
     nums = []
-    for f in existing:
+    for f in glob.glob(os.path.join(TICKETS_DIR, "T-*.json")):
         name = os.path.basename(f).replace(".json", "")
         try:
             nums.append(int(name.split("-")[1]))
         except (IndexError, ValueError):
             pass
-    return f"T-{max(nums, default=0) + 1:04d}"
+    return max(nums, default=0)
+
+
+def _next_id():
+    """Allocate the next ticket id in O(1), atomically across processes.
+
+    A missing or corrupt counter is rebuilt by rescanning the directory once
+    (only a corrupt one is worth a warning); ids already taken on disk
+    (e.g. by an older allocator) are skipped.
+    """
+    _ensure_dir()
+    with _seq_locked() as fd:
+        raw = os.read(fd, 32).strip()
+        try:
+            n = int(raw)
+        except ValueError:
+            if raw:
+                logger.warning("Ticket counter %r unreadable — rescanning %s", raw, TICKETS_DIR)
+            else:
+                logger.debug("Ticket counter empty — rescanning %s", TICKETS_DIR)
+            n = _scan_max_id()
+        n += 1
+        while os.path.exists(_ticket_path(f"T-{n:04d}")):
+            n += 1
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.write(fd, f"{n}\n".encode())
+        os.ftruncate(fd, len(f"{n}\n"))
+    return f"T-{n:04d}"
 
 
 # ── CRUD ──────────────────────────────────────────────
@@ -148,74 +379,613 @@ def create(title, description="", priority="normal", assigned_to="developer",
         "created_by": created_by,
         "created_at": _now(),
         "updated_at": _now(),
-        "comments": [],
+        "comment_count": 0,
+        "last_comment": None,
         "github_issue_number": None,
+        "revision": 1,
     }
-    p = _ticket_path(ticket_id)
-    with open(p, "w") as f:
-        json.dump(ticket, f, indent=2)
+    while True:
+        p = _ticket_path(ticket_id)
+        try:
+            # "x" never clobbers a ticket written by an allocator that bypassed the counter
+            with open(p, "x") as f:
+                json.dump(ticket, f, indent=2)
+            break
+        except FileExistsError:
+            ticket_id = ticket["id"] = _next_id()
     _chmod_world_rw(p)
+    _index.note_write(p, ticket)
     logger.info(f"Created ticket {ticket_id}: {title}")
     return ticket
 
 
-def get(ticket_id):
-    """Get a ticket by ID."""
+def get(ticket_id, with_comments=False):
+    """Get a ticket by ID.
+
+    The document carries comment_count/last_comment only; with_comments=True
+    also reads the comment log into ticket["comments"].
+    """
     path = _ticket_path(ticket_id)
     if not os.path.exists(path):
         return None
     with open(path) as f:
-        return json.load(f)
+        ticket = json.load(f)
+    if with_comments:
+        # Comments embedded by older writers follow the logged ones
+        ticket["comments"] = (_read_comments(_comments_path(ticket_id))
+                              + list(ticket.get("comments") or ()))
+    return ticket
 
 
-def update(ticket_id, **fields):
-    """Update ticket fields."""
-    ticket = get(ticket_id)
-    if not ticket:
+# Fields update()/bulk_update() never overwrite
+_READONLY_FIELDS = ("id", "created_at", "created_by", "revision")
+# Criteria bulk_update() accepts besides "ids" — all served by the index
+BULK_FILTERS = ("status", "assigned_to", "priority")
+
+
+def update(ticket_id, expected_revision=None, **fields):
+    """Update ticket fields under the ticket's cross-process lock.
+
+    With `expected_revision` the write is a compare-and-swap: it raises
+    RevisionConflict unless the stored revision still matches.  Every
+    write bumps `revision`.
+    """
+    if not os.path.exists(_ticket_path(ticket_id)):
         return None
-    for k, v in fields.items():
-        if k not in ("id", "created_at", "created_by"):
-            ticket[k] = v
-    ticket["updated_at"] = _now()
-    p = _ticket_path(ticket_id)
-    _safe_write(p, ticket)
+    with _ticket_locked(ticket_id):
+        ticket = get(ticket_id)
+        if not ticket:
+            return None
+        if expected_revision is not None and ticket.get("revision", 0) != int(expected_revision):
+            raise RevisionConflict(ticket_id, expected_revision, ticket.get("revision", 0))
+        for k, v in fields.items():
+            if k not in _READONLY_FIELDS:
+                ticket[k] = v
+        ticket["updated_at"] = _now()
+        _write_ticket(_ticket_path(ticket_id), ticket)
     return ticket
 
 
 def add_comment(ticket_id, author, text):
-    """Add a comment to a ticket."""
-    ticket = get(ticket_id)
-    if not ticket:
+    """Add a comment to a ticket.
+
+    The comment is appended as one line to the ticket's log under the
+    ticket lock, so concurrent writers never lose each other's comments; the
+    document is rewritten only to bump comment_count/last_comment.
+    Comments embedded by an older version move to the log on the first new
+    comment.
+    """
+    if not os.path.exists(_ticket_path(ticket_id)):
         return None
-    ticket.setdefault("comments", []).append({
-        "author": author,
-        "text": text,
-        "timestamp": _now(),
-    })
-    ticket["updated_at"] = _now()
-    p = _ticket_path(ticket_id)
-    _safe_write(p, ticket)
+    comment = {"author": author, "text": text, "timestamp": _now()}
+    with _ticket_locked(ticket_id):
+        ticket = get(ticket_id)
+        if not ticket:
+            return None
+        count = ticket.get("comment_count", 0)
+        embedded = ticket.pop("comments", None) or []
+        _append_comments(ticket_id, [*embedded, comment])
+        ticket["comment_count"] = count + len(embedded) + 1
+        ticket["last_comment"] = dict(comment, text=str(text)[:_SUMMARY_CHARS])
+        ticket["updated_at"] = comment["timestamp"]
+        _write_ticket(_ticket_path(ticket_id), ticket)
     return ticket
 
 
+def bulk_update(filter, changes):
+    """Apply `changes` to every ticket matching `filter` in a single pass.
+
+    filter: {"status"/"assigned_to"/"priority": value, "ids": [...]}, ANDed;
+    at least one criterion is required.  Candidates come from the index;
+    each is re-read and re-checked under its lock, written once (temp file +
+    rename) and returned.  Raises ValueError for an empty filter or change
+    set.
+    """
+    criteria = dict(filter or {})
+    ids = criteria.pop("ids", None)
+    unknown = set(criteria) - set(BULK_FILTERS)
+    if unknown:
+        raise ValueError(f"Unsupported filter field(s): {', '.join(sorted(unknown))}")
+    criteria = {k: v for k, v in criteria.items() if v not in (None, "")}
+    if not criteria and not ids:
+        raise ValueError("Bulk update needs a filter (status, assigned_to, priority or ids)")
+    changes = {k: v for k, v in (changes or {}).items() if k not in _READONLY_FIELDS}
+    if not changes:
+        raise ValueError("No changes given")
+
+    _ensure_dir()
+    matched = _index.query(**criteria)
+    if ids:
+        wanted = set(ids)
+        matched = [t for t in matched if t.get("id") in wanted]
+    now = _now()
+    done = []
+    for candidate in matched:
+        with _ticket_locked(candidate["id"]):
+            ticket = get(candidate["id"])
+            # Another writer may have moved it out of the filter meanwhile
+            if not ticket or any(ticket.get(k) != v for k, v in criteria.items()):
+                continue
+            ticket.update(changes)
+            ticket["updated_at"] = now
+            _write_ticket(_ticket_path(ticket["id"]), ticket)
+        done.append(ticket)
+    logger.info(f"Bulk-updated {len(done)} ticket(s): {', '.join(sorted(changes))}")
+    return done
+
+
+def search(query, limit=20):
+    """Full-text search over title, description, labels and comments.
+
+    All words must match (`word*` matches a prefix); results are ticket
+    copies with a `score`, best first.
+    """
+    _ensure_dir()
+    return _index.search(query or "", limit)
+
+
 def list_tickets(status=None, assigned_to=None, priority=None):
     """List tickets with optional filters."""
     _ensure_dir()
-    tickets = []
-    for path in sorted(glob.glob(os.path.join(TICKETS_DIR, "T-*.json"))):
+    return _index.query(status=status, assigned_to=assigned_to, priority=priority)
+
+
+def list_page(limit=None, cursor=None, fields=None, updated_since=None,
+              status=None, assigned_to=None, priority=None):
+    """One page of tickets in id order, for list views that render a subset.
+
+    `cursor` is the `next_cursor` of the previous page; `fields` limits each
+    ticket to those keys (id is always kept, "comment_count" is derived);
+    `updated_since` (ISO timestamp or aware datetime) keeps tickets updated
+    at or after it; a malformed string raises ValueError.
+    Returns {"tickets", "next_cursor", "version"} — version changes whenever
+    any ticket does, so it can serve as an ETag.
+    """
+    if isinstance(updated_since, str):
+        updated_since = parse_iso(updated_since)
+    _ensure_dir()
+    tickets, next_cursor, version = _index.page(
+        limit=limit, after=cursor, fields=fields, updated_since=updated_since,
+        status=status, assigned_to=assigned_to, priority=priority)
+    return {"tickets": tickets, "next_cursor": next_cursor, "version": version}
+
+
+def list_version():
+    """Token that changes whenever any ticket is created, changed or deleted."""
+    _ensure_dir()
+    return _index.current_version()
+
+
+def _project(ticket, fields):
+    if not fields:
+        return dict(ticket)
+    out = {"id": ticket.get("id")}
+    for f in fields:
+        if f == "comment_count":
+            out[f] = _comment_count(ticket)
+        elif f in ticket:
+            out[f] = ticket[f]
+    return out
+
+
+def external_ids(field):
+    """Set of non-empty values of an indexed external id field (e.g. "jira_key")."""
+    _ensure_dir()
+    return _index.values(field)
+
+
+# ── Index ─────────────────────────────────────────────
+
+_WORD = re.compile(r"\w+")
+
+
+def _tokens(text):
+    return _WORD.findall(str(text).casefold()) if text else []
+
+
+class _SearchIndex:
+    """Inverted index over title, description, labels and comments.
+
+    Each posting holds a precomputed weight — field-weighted log term
+    frequency over sqrt(document length) — so a score is a sum of
+    idf-scaled weights.  Queries walk the rarest term's postings in weight
+    order and stop once no remaining document can enter the top `limit`;
+    the weight-ordered view of a large posting list is built on first use
+    and then kept current by add()/remove().  A trailing `*` makes a term
+    a prefix match (at most MAX_EXPANSIONS terms).
+    """
+
+    FIELD_WEIGHTS = (("title", 3.0), ("labels", 2.0), ("description", 1.0))
+    MAX_EXPANSIONS = 64
+    _SORTED_MIN = 256   # posting lists shorter than this are sorted per query
+
+    def __init__(self):
+        self._postings: dict = {}   # term → {name: weight}
+        self._sorted: dict = {}     # term → [(-weight, name)] ascending, for large postings
+        self._docs: dict = {}       # name → terms, for removal
+        self._vocab: list = []      # sorted terms, for prefix queries
+        self._vocab_dirty = False
+
+    def add(self, name, ticket):
+        tf: dict = {}
+        for field, weight in self.FIELD_WEIGHTS:
+            value = ticket.get(field)
+            if isinstance(value, list):
+                value = " ".join(str(v) for v in value)
+            for term in _tokens(value):
+                tf[term] = tf.get(term, 0.0) + weight
+        for comment in ticket.get("comments") or ():
+            if isinstance(comment, dict):
+                for term in _tokens(comment.get("text")):
+                    tf[term] = tf.get(term, 0.0) + 1.0
+        if not tf:
+            return
+        norm = math.sqrt(sum(tf.values()))
+        for term, f in tf.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                self._vocab_dirty = True
+            w = posting[name] = (1.0 + math.log(f)) / norm
+            ordered = self._sorted.get(term)
+            if ordered is not None:
+                bisect.insort(ordered, (-w, name))
+        self._docs[name] = tuple(tf)
+
+    def remove(self, name):
+        for term in self._docs.pop(name, ()):
+            posting = self._postings.get(term)
+            if posting is None or name not in posting:
+                continue
+            w = posting.pop(name)
+            ordered = self._sorted.get(term)
+            if ordered is not None:
+                i = bisect.bisect_left(ordered, (-w, name))
+                if i < len(ordered) and ordered[i][1] == name:
+                    del ordered[i]
+            if not posting:
+                del self._postings[term]
+                self._sorted.pop(term, None)
+                self._vocab_dirty = True
+
+    def search(self, query, limit):
+        """[(score, name)] best first; every query term must match."""
+        terms = []  # (posting, idf, term or None for a merged prefix)
+        n_docs = len(self._docs) or 1
+        for raw in query.split():
+            words = _tokens(raw)
+            if not words:
+                continue
+            *exact, last = words
+            expanded = self._expand(last) if raw.endswith("*") else [last]
+            if len(expanded) == 1:
+                exact.append(expanded[0])
+            for word in exact:
+                posting = self._postings.get(word)
+                if not posting:
+                    return []
+                terms.append((posting, math.log(1.0 + n_docs / (1 + len(posting))), word))
+            if len(expanded) > 1:
+                merged: dict = {}
+                for word in expanded:
+                    posting = self._postings[word]
+                    idf = math.log(1.0 + n_docs / (1 + len(posting)))
+                    for name, w in posting.items():
+                        if w * idf > merged.get(name, 0.0):
+                            merged[name] = w * idf
+                terms.append((merged, 1.0, None))
+            elif not expanded:
+                return []
+        if not terms or limit <= 0:
+            return []
+
+        terms.sort(key=lambda t: len(t[0]))
+        (lead, lead_idf, lead_term), rest = terms[0], terms[1:]
+        rest_bound = sum(idf * (-self._ordered(p, t)[0][0] if t else max(p.values()))
+                         for p, idf, t in rest)
+        top: list = []  # min-heap of (score, name)
+        for neg_w, name in self._ordered(lead, lead_term):
+            head = -neg_w * lead_idf
+            if len(top) == limit and head + rest_bound <= top[0][0]:
+                break
+            score = head
+            for posting, idf, _ in rest:
+                w = posting.get(name)
+                if w is None:
+                    break
+                score += w * idf
+            else:
+                if len(top) < limit:
+                    heapq.heappush(top, (score, name))
+                elif score > top[0][0]:
+                    heapq.heapreplace(top, (score, name))
+        return sorted(top, reverse=True)
+
+    def _ordered(self, posting, term):
+        """Postings as (-weight, name), heaviest first."""
+        if term is None or len(posting) < self._SORTED_MIN:
+            return sorted((-w, n) for n, w in posting.items())
+        ordered = self._sorted.get(term)
+        if ordered is None:
+            ordered = self._sorted[term] = sorted((-w, n) for n, w in posting.items())
+        return ordered
+
+    def _expand(self, stem):
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+        i = bisect.bisect_left(self._vocab, stem)
+        out = []
+        while (i < len(self._vocab) and self._vocab[i].startswith(stem)
+               and len(out) < self.MAX_EXPANSIONS):
+            out.append(self._vocab[i])
+            i += 1
+        return out
+
+
+def _updated_at_or_after(ticket, since) -> bool:
+    """Compare as instants — stored offsets and precision need not match the query's."""
+    try:
+        return parse_iso(ticket.get("updated_at") or "") >= since
+    except ValueError:
+        return False
+
+
+class _TicketIndex:
+    """In-memory index of TICKETS_DIR, re-validated against file metadata.
+
+    Each T-*.json is cached with its (mtime_ns, size, inode) signature and
+    re-parsed only when that changes.  The per-file stat sweep is skipped
+    while the directory mtime is unchanged and the last sweep is younger
+    than `rescan_ns`.  Anything modified within _RACY_NS of being read is
+    re-checked until it ages past that window, so a same-size rewrite inside
+    one mtime tick is never missed.  Secondary indexes map each INDEXED
+    field value to the set of file names holding it.
+    """
+
+    INDEXED = ("status", "assigned_to", "priority",
+               "github_issue_number", "jira_key", "trello_card_id", "linear_id")
+    _RACY_NS = 2_000_000_000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rescan_ns = int(float(os.environ.get("DOCKFRA_TICKETS_RESCAN", "1")) * 1e9)
+        # counts() only sweeps when the directory changed or this much time passed
+        self.stats_rescan_ns = int(float(os.environ.get("DOCKFRA_TICKETS_STATS_RESCAN", "30")) * 1e9)
+        self._reset(None)
+
+    def _reset(self, directory):
+        self.dir = directory
+        self._files: dict = {}   # name → (signature, ticket, clean)
+        self._by: dict = {f: {} for f in self.INDEXED}
+        self._order = None       # sorted file names, rebuilt after a create/delete
+        # Bumped on every content change; with the per-reset epoch it is the list ETag
+        self._epoch = os.urandom(4).hex()
+        self._gen = 0
+        self._text = None        # _SearchIndex, built on the first search()
+        self._dir_sig = None
+        self._swept_at = 0
+
+    def note_write(self, path, ticket):
+        """Write-through after this process saved a ticket file."""
+        with self._lock:
+            if os.path.dirname(str(path)) != self.dir:
+                return
+            try:
+                st = os.stat(path)
+            except OSError:
+                return
+            now = time.time_ns()
+            self._put(os.path.basename(str(path)), (st.st_mtime_ns, st.st_size, st.st_ino),
+                      json.loads(json.dumps(ticket)), now - st.st_mtime_ns > self._RACY_NS)
+
+    def query(self, **filters) -> list:
+        with self._lock:
+            self._refresh()
+            names = None
+            for field, value in filters.items():
+                if value is None or value == "":
+                    continue
+                hit = self._by[field].get(value, set())
+                names = set(hit) if names is None else names & hit
+            if names is None:
+                names = self._files
+            return [dict(self._files[n][1]) for n in sorted(names)]
+
+    def page(self, limit=None, after=None, fields=None, updated_since=None, **filters):
+        """Tickets in id order after the `after` id, at most `limit` of them.
+
+        Returns (tickets, next_cursor, version); next_cursor is the last id
+        returned when more tickets match.  With `fields` only those keys
+        (plus "id", and "comment_count" on request) are copied, so comment
+        threads never leave the index.
+        """
+        with self._lock:
+            self._refresh()
+            names = None
+            for field, value in filters.items():
+                if value is None or value == "":
+                    continue
+                hit = self._by[field].get(value, set())
+                names = set(hit) if names is None else names & hit
+            if names is None:
+                if self._order is None:
+                    self._order = sorted(self._files)
+                order = self._order
+            else:
+                order = sorted(names)
+            start = bisect.bisect_right(order, f"{after}.json") if after else 0
+            out, next_cursor = [], None
+            for name in itertools.islice(order, start, None):
+                ticket = self._files[name][1]
+                if updated_since and not _updated_at_or_after(ticket, updated_since):
+                    continue
+                if limit is not None and len(out) >= limit:
+                    next_cursor = out[-1]["id"] if out else None
+                    break
+                out.append(_project(ticket, fields))
+            return out, next_cursor, self.version()
+
+    def version(self) -> str:
+        """Changes whenever any indexed ticket does. Caller holds _lock."""
+        return f"{self._epoch}-{self._gen}"
+
+    def current_version(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self.version()
+
+    def values(self, field) -> set:
+        with self._lock:
+            self._refresh()
+            return {v for v in self._by[field] if v}
+
+    def search(self, query, limit) -> list:
+        with self._lock:
+            self._refresh()
+            if self._text is None:
+                self._text = _SearchIndex()
+                for name, (_sig, ticket, _clean) in self._files.items():
+                    self._text.add(name, self._searchable(name, ticket))
+            return [dict(self._files[n][1], score=round(score, 4))
+                    for score, n in self._text.search(query, limit)]
+
+    def counts(self, *fields) -> tuple:
+        """(total, {value: count} per field) straight from the secondary indexes.
+
+        Writes from this process update the buckets directly, so this costs
+        one stat() of the directory, plus a name listing after it changed;
+        other processes' edits to existing tickets are reconciled by a full
+        sweep every stats_rescan_ns.
+        """
+        with self._lock:
+            self._refresh(self.stats_rescan_ns, lenient=True)
+            return len(self._files), tuple(
+                {v: len(names) for v, names in self._by[f].items() if v is not None}
+                for f in fields)
+
+    def _refresh(self, max_age_ns=None, lenient=False):
+        """Sweep the directory unless it is unchanged and swept within max_age_ns.
+
+        `lenient` trusts an unchanged directory mtime even when it is recent
+        (a create inside the same mtime tick then waits for the next sweep).
+        """
+        directory = str(TICKETS_DIR)
+        if directory != self.dir:
+            self._reset(directory)
+        now = time.time_ns()
         try:
-            with open(path) as f:
-                t = json.load(f)
-        except Exception:
-            continue
-        if status and t.get("status") != status:
-            continue
-        if assigned_to and t.get("assigned_to") != assigned_to:
-            continue
-        if priority and t.get("priority") != priority:
-            continue
-        tickets.append(t)
-    return tickets
+            st = os.stat(directory)
+            dir_sig = (st.st_mtime_ns, st.st_ino)
+        except OSError:
+            dir_sig = None
+        max_age = self.rescan_ns if max_age_ns is None else max_age_ns
+        if (dir_sig == self._dir_sig and now - self._swept_at < max_age
+                and (lenient or now - dir_sig[0] > self._RACY_NS)):
+            return
+        if lenient and dir_sig is not None and now - self._swept_at < max_age:
+            # Something was created, deleted or renamed over: reconcile the
+            # name set without stat-ing every file (readdir only)
+            self._dir_sig = dir_sig
+            self._sync_names(directory, now)
+            return
+        self._dir_sig, self._swept_at = dir_sig, now
+        seen = set()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            entries = []
+        for e in entries:
+            name = e.name
+            if not (name.startswith("T-") and name.endswith(".json")):
+                continue
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            seen.add(name)
+            sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+            cached = self._files.get(name)
+            if cached and cached[0] == sig and cached[2]:
+                continue
+            try:
+                with open(e.path) as f:
+                    ticket = json.load(f)
+            except Exception:
+                # Unreadable or half-written — skip it this time
+                seen.discard(name)
+                continue
+            self._put(name, sig, ticket, now - st.st_mtime_ns > self._RACY_NS)
+        for name in set(self._files) - seen:
+            self._drop(name)
+
+    def _sync_names(self, directory, now):
+        """Index new T-*.json names and drop vanished ones; known files are not re-checked."""
+        try:
+            names = {n for n in os.listdir(directory) if n.startswith("T-") and n.endswith(".json")}
+        except OSError:
+            return
+        for name in names - set(self._files):
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+                with open(path) as f:
+                    ticket = json.load(f)
+            except Exception:
+                continue  # vanished or half-written — the next sweep retries
+            self._put(name, (st.st_mtime_ns, st.st_size, st.st_ino), ticket,
+                      now - st.st_mtime_ns > self._RACY_NS)
+        for name in set(self._files) - names:
+            self._drop(name)
+
+    def _put(self, name, sig, ticket, clean):
+        old = self._files.get(name)
+        if old and old[1] == ticket:
+            # Re-read of an unchanged ticket (racy window): keep the indexes
+            self._files[name] = (sig, old[1], clean)
+            return
+        order = self._order
+        self._drop(name)
+        self._files[name] = (sig, ticket, clean)
+        self._gen += 1
+        # A rewrite keeps the name set, so the sorted order survives it
+        self._order = order if old else None
+        for field in self.INDEXED:
+            value = ticket.get(field)
+            try:
+                self._by[field].setdefault(value, set()).add(name)
+            except TypeError:  # unhashable value in a hand-edited file
+                pass
+        if self._text is not None:
+            self._text.add(name, self._searchable(name, ticket))
+
+    def _searchable(self, name, ticket):
+        """The ticket with its logged comments attached, for the text index."""
+        if not ticket.get("comment_count"):
+            return ticket
+        logged = _read_comments(os.path.join(self.dir, name[:-len(".json")] + _COMMENTS_SUFFIX))
+        return dict(ticket, comments=logged + list(ticket.get("comments") or ()))
+
+    def _drop(self, name):
+        old = self._files.pop(name, None)
+        if not old:
+            return
+        self._gen += 1
+        self._order = None
+        if self._text is not None:
+            self._text.remove(name)
+        for field in self.INDEXED:
+            try:
+                bucket = self._by[field].get(old[1].get(field))
+            except TypeError:
+                continue
+            if bucket is not None:
+                bucket.discard(name)
+                if not bucket:
+                    del self._by[field][old[1].get(field)]
+
+
+_index = _TicketIndex()
 
 
 def close(ticket_id, closed_by="manager"):
@@ -223,29 +993,138 @@ def close(ticket_id, closed_by="manager"):
     return update(ticket_id, status="closed")
 
 
-# ── GitHub Integration ────────────────────────────────
+# ── HTTP + incremental sync plumbing ──────────────────
 
-def _github_api(method, endpoint, data=None):
-    """Make a GitHub API request."""
-    import urllib.request
-    import urllib.error
+_Response = namedtuple("_Response", "status headers data")
 
-    if not GITHUB_TOKEN or not GITHUB_REPO:
-        return None
+# Per-provider sync cursors (ETag, since, synced_at); the leading dot keeps
+# it out of the ticket index.
+_SYNC_STATE = ".sync_state.json"
+_sync_state_lock = threading.Lock()
+_quota_until: dict = {}        # host → epoch seconds when an exhausted quota resets
+_sync_tls = threading.local()  # per-provider request counter inside sync_all()
+
+
+def _rate_limit_wait(headers, now=None):
+    """Seconds to back off per Retry-After / X-RateLimit-*, or None if unsaid."""
+    now = time.time() if now is None else now
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    if headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            return max(0.0, float(headers.get("X-RateLimit-Reset", "")) - now)
+        except ValueError:
+            pass
+    return None
+
+
+def _throttle(host):
+    """Sleep until a quota this host reported as exhausted has reset."""
+    wait = _quota_until.get(host, 0) - time.time()
+    if wait <= 0:
+        return
+    if wait > SYNC_MAX_WAIT:
+        raise RuntimeError(f"{host} rate limit exhausted for another {wait:.0f}s")
+    time.sleep(wait)
+
+
+def _request(method, url, headers=None, data=None, etag=None, retries=3):
+    """JSON HTTP request with conditional GET and rate-limit backoff.
+
+    Returns _Response(status, headers, data); a 304 for `etag` has data=None.
+    429s (and 403s with an exhausted quota) are retried after Retry-After /
+    X-RateLimit-Reset, up to SYNC_MAX_WAIT; other errors raise
+    dockfra.http_client.HTTPError.  Connections come from the shared
+    keep-alive pool.
+    """
+    import urllib.parse
+    from dockfra.http_client import get_client
+
+    host = urllib.parse.urlsplit(url).netloc
+    headers = dict(headers or {})
+    if etag:
+        headers["If-None-Match"] = etag
+    body = json.dumps(data).encode() if data is not None else None
+    for attempt in range(retries + 1):
+        _throttle(host)
+        _sync_tls.requests = getattr(_sync_tls, "requests", 0) + 1
+        resp = get_client().request(method, url, headers, body, timeout=SYNC_TIMEOUT)
+        if resp.status == 304:
+            return _Response(304, resp.headers, None)
+        if resp.status < 400:
+            if resp.headers.get("X-RateLimit-Remaining") == "0":
+                _quota_until[host] = time.time() + (_rate_limit_wait(resp.headers) or 0)
+            return _Response(resp.status, resp.headers, resp.json())
+        wait = _rate_limit_wait(resp.headers)
+        limited = resp.status == 429 or (
+            resp.status == 403 and resp.headers.get("X-RateLimit-Remaining") == "0")
+        delay = wait if wait is not None else 2 ** attempt
+        if not limited or attempt == retries or delay > SYNC_MAX_WAIT:
+            resp.raise_for_status()
+        logger.warning("%s rate limited (HTTP %s) — retrying in %.1fs", host, resp.status, delay)
+        time.sleep(delay)
+
+
+def _sync_cursor(provider):
+    try:
+        with open(os.path.join(TICKETS_DIR, _SYNC_STATE)) as f:
+            return json.load(f).get(provider) or {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _set_sync_cursor(provider, **cursor):
+    """Persist one provider's cursor; called only after its pull fully succeeded."""
+    path = os.path.join(TICKETS_DIR, _SYNC_STATE)
+    with _sync_state_lock:
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        state[provider] = {"synced_at": time.time(), **cursor}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, path)
+
+
+def _next_link(headers):
+    """URL of rel="next" in an RFC 5988 Link header (GitHub pagination)."""
+    for part in (headers.get("Link") or "").split(","):
+        url, _, params = part.partition(";")
+        if 'rel="next"' in params:
+            return url.strip().strip("<>")
+    return None
 
-    url = f"https://api.github.com/repos/{GITHUB_REPO}{endpoint}"
-    headers = {
+
+# ── GitHub Integration ────────────────────────────────
+
+def _github_headers():
+    return {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json",
         "Content-Type": "application/json",
     }
 
-    body = json.dumps(data).encode() if data else None
-    req = urllib.request.Request(url, data=body, headers=headers, method=method)
+
+def _github_api(method, endpoint, data=None):
+    """Make a GitHub API request."""
+    from dockfra.http_client import HTTPError
+
+    if not GITHUB_TOKEN or not GITHUB_REPO:
+        return None
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_REPO}{endpoint}"
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode())
-    except urllib.error.HTTPError as e:
+        return _request(method, url, _github_headers(), data).data
+    except HTTPError as e:
         logger.error(f"GitHub API {e.code}: {e.read().decode()[:200]}")
         return None
     except Exception as e:
@@ -279,17 +1158,32 @@ def push_to_github(ticket_id):
     return None
 
 
-def pull_from_github():
-    """Pull open GitHub Issues and create local tickets for new ones."""
-    issues = _github_api("GET", "/issues?state=open&per_page=50")
-    if not issues:
+def _pull_github():
+    """Pull open GitHub Issues and create local tickets for new ones.
+
+    Follows Link pagination.  The first page carries the stored since= cursor
+    and ETag, so a repo with no issue activity costs a single 304.
+    """
+    if not GITHUB_TOKEN or not GITHUB_REPO:
+        return []
+    cursor = _sync_cursor("github")
+    started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    url = f"{GITHUB_API_URL}/repos/{GITHUB_REPO}/issues?state=open&per_page=100"
+    if cursor.get("since"):
+        url += f"&since={cursor['since']}"
+    resp = _request("GET", url, _github_headers(), etag=cursor.get("etag"))
+    if resp.status == 304:
         return []
+    etag = resp.headers.get("ETag")
+    issues = list(resp.data or [])
+    next_url = _next_link(resp.headers)
+    while next_url:
+        page = _request("GET", next_url, _github_headers())
+        issues.extend(page.data or [])
+        next_url = _next_link(page.headers)
 
     created = []
-    existing_nums = set()
-    for t in list_tickets():
-        if t.get("github_issue_number"):
-            existing_nums.add(t["github_issue_number"])
+    existing_nums = external_ids("github_issue_number")
 
     for issue in issues:
         if issue["number"] in existing_nums:
@@ -304,32 +1198,42 @@ def pull_from_github():
         )
         update(ticket["id"], github_issue_number=issue["number"])
         created.append(ticket)
+    if issues:
+        # Move the window forward; the new URL has no ETag yet
+        _set_sync_cursor("github", since=started)
+    else:
+        # Keep the URL stable so the next sync can be answered with a 304
+        _set_sync_cursor("github", since=cursor.get("since"), etag=etag)
     return created
 
 
-# ── Jira Integration ─────────────────────────────────
+def pull_from_github():
+    """GitHub pull for direct callers (CLI): logs a failure and returns [].
 
-def _jira_api(method, endpoint, data=None):
-    """Make a Jira Cloud REST API request."""
-    import urllib.request
-    import urllib.error
-    import base64
+    sync_all() calls _pull_github() and reports the error instead.
+    """
+    return _quiet_pull(_pull_github, "GitHub")
 
-    if not all([JIRA_URL, JIRA_EMAIL, JIRA_TOKEN]):
-        return None
 
-    url = f"{JIRA_URL.rstrip('/')}/rest/api/3{endpoint}"
+# ── Jira Integration ─────────────────────────────────
+
+def _jira_headers():
+    import base64
     cred = base64.b64encode(f"{JIRA_EMAIL}:{JIRA_TOKEN}".encode()).decode()
-    headers = {
+    return {
         "Authorization": f"Basic {cred}",
         "Accept": "application/json",
         "Content-Type": "application/json",
     }
-    body = json.dumps(data).encode() if data else None
-    req = urllib.request.Request(url, data=body, headers=headers, method=method)
+
+
+def _jira_api(method, endpoint, data=None):
+    """Make a Jira Cloud REST API request."""
+    if not all([JIRA_URL, JIRA_EMAIL, JIRA_TOKEN]):
+        return None
+    url = f"{JIRA_URL.rstrip('/')}/rest/api/3{endpoint}"
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode())
+        return _request(method, url, _jira_headers(), data).data
     except Exception as e:
         logger.error(f"Jira API error: {e}")
         return None
@@ -363,16 +1267,36 @@ def push_to_jira(ticket_id):
     return None
 
 
-def pull_from_jira():
-    """Pull open Jira issues and create local tickets."""
-    if not JIRA_PROJECT:
-        return []
-    result = _jira_api("GET", f"/search?jql=project={JIRA_PROJECT}+AND+status!=Done&maxResults=50")
-    if not result or "issues" not in result:
+def _pull_jira():
+    """Pull open Jira issues and create local tickets.
+
+    Pages through startAt/total.  After the first sync only issues updated
+    since the last one (plus a minute of slack) are requested.
+    """
+    import urllib.parse
+
+    if not JIRA_PROJECT or not all([JIRA_URL, JIRA_EMAIL, JIRA_TOKEN]):
         return []
-    existing_keys = {t.get("jira_key") for t in list_tickets() if t.get("jira_key")}
+    cursor = _sync_cursor("jira")
+    started = time.time()
+    jql = f"project={JIRA_PROJECT} AND status!=Done"
+    if cursor.get("synced_at"):
+        # Relative JQL dates sidestep the Jira user's timezone
+        minutes = int((started - cursor["synced_at"]) // 60) + 2
+        jql += f' AND updated >= "-{minutes}m"'
+    base = f"{JIRA_URL.rstrip('/')}/rest/api/3/search?jql={urllib.parse.quote(jql)}&maxResults=100"
+    issues, start = [], 0
+    while True:
+        page = _request("GET", f"{base}&startAt={start}", _jira_headers()).data or {}
+        batch = page.get("issues") or []
+        issues.extend(batch)
+        start += len(batch)
+        if not batch or start >= page.get("total", 0):
+            break
+
+    existing_keys = external_ids("jira_key")
     created = []
-    for issue in result["issues"]:
+    for issue in issues:
         if issue["key"] in existing_keys:
             continue
         desc = ""
@@ -384,31 +1308,35 @@ def pull_from_jira():
         ticket = create(title=issue["fields"]["summary"], description=desc, created_by="jira")
         update(ticket["id"], jira_key=issue["key"])
         created.append(ticket)
+    _set_sync_cursor("jira", synced_at=started)
     return created
 
 
-# ── Trello Integration ───────────────────────────────
+def pull_from_jira():
+    """Jira pull for direct callers (CLI): logs a failure and returns [].
 
-def _trello_api(method, endpoint, params=None, data=None):
-    """Make a Trello REST API request."""
-    import urllib.request
-    import urllib.error
-    import urllib.parse
+    sync_all() calls _pull_jira() and reports the error instead.
+    """
+    return _quiet_pull(_pull_jira, "Jira")
 
-    if not all([TRELLO_KEY, TRELLO_TOKEN_ENV]):
-        return None
 
+# ── Trello Integration ───────────────────────────────
+
+def _trello_url(endpoint, params=None):
+    import urllib.parse
     base_params = {"key": TRELLO_KEY, "token": TRELLO_TOKEN_ENV}
     if params:
         base_params.update(params)
-    qs = urllib.parse.urlencode(base_params)
-    url = f"https://api.trello.com/1{endpoint}?{qs}"
-    body = json.dumps(data).encode() if data else None
+    return f"{TRELLO_API_URL}{endpoint}?{urllib.parse.urlencode(base_params)}"
+
+
+def _trello_api(method, endpoint, params=None, data=None):
+    """Make a Trello REST API request."""
+    if not all([TRELLO_KEY, TRELLO_TOKEN_ENV]):
+        return None
     headers = {"Content-Type": "application/json"} if data else {}
-    req = urllib.request.Request(url, data=body, headers=headers, method=method)
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode())
+        return _request(method, _trello_url(endpoint, params), headers, data).data
     except Exception as e:
         logger.error(f"Trello API error: {e}")
         return None
@@ -433,43 +1361,66 @@ def push_to_trello(ticket_id):
     return None
 
 
-def pull_from_trello():
-    """Pull cards from Trello board and create local tickets."""
-    if not TRELLO_BOARD:
-        return []
-    result = _trello_api("GET", f"/boards/{TRELLO_BOARD}/cards")
-    if not result:
+_TRELLO_PAGE = 1000
+
+
+def _pull_trello():
+    """Pull cards from Trello board and create local tickets.
+
+    Only cards created after the newest one seen last time are requested
+    (card ids grow with creation time); full pages continue with before=.
+    """
+    if not TRELLO_BOARD or not all([TRELLO_KEY, TRELLO_TOKEN_ENV]):
         return []
-    existing_ids = {t.get("trello_card_id") for t in list_tickets() if t.get("trello_card_id")}
+    cursor = _sync_cursor("trello")
+    params = {"limit": _TRELLO_PAGE}
+    if cursor.get("since"):
+        params["since"] = cursor["since"]
+    cards = []
+    while True:
+        page = _request("GET", _trello_url(f"/boards/{TRELLO_BOARD}/cards", params)).data or []
+        cards.extend(page)
+        if len(page) < _TRELLO_PAGE:
+            break
+        params["before"] = min(c["id"] for c in page)
+
+    existing_ids = external_ids("trello_card_id")
     created = []
-    for card in result:
+    for card in cards:
         if card["id"] in existing_ids or card.get("closed"):
             continue
         ticket = create(title=card["name"], description=card.get("desc", ""), created_by="trello")
         update(ticket["id"], trello_card_id=card["id"])
         created.append(ticket)
+    newest = max([c["id"] for c in cards] + ([cursor["since"]] if cursor.get("since") else []), default=None)
+    _set_sync_cursor("trello", since=newest)
     return created
 
 
+def pull_from_trello():
+    """Trello pull for direct callers (CLI): logs a failure and returns [].
+
+    sync_all() calls _pull_trello() and reports the error instead.
+    """
+    return _quiet_pull(_pull_trello, "Trello")
+
+
 # ── Linear Integration ───────────────────────────────
 
+def _linear_headers():
+    return {
+        "Authorization": LINEAR_TOKEN,
+        "Content-Type": "application/json",
+    }
+
+
 def _linear_api(query, variables=None):
     """Make a Linear GraphQL API request."""
-    import urllib.request
-    import urllib.error
-
     if not LINEAR_TOKEN:
         return None
-    url = "https://api.linear.app/graphql"
-    headers = {
-        "Authorization": LINEAR_TOKEN,
-        "Content-Type": "application/json",
-    }
-    body = json.dumps({"query": query, "variables": variables or {}}).encode()
-    req = urllib.request.Request(url, data=body, headers=headers, method="POST")
     try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode())
+        return _request("POST", LINEAR_API_URL, _linear_headers(),
+                        {"query": query, "variables": variables or {}}).data
     except Exception as e:
         logger.error(f"Linear API error: {e}")
         return None
@@ -503,22 +1454,40 @@ def push_to_linear(ticket_id):
     return None
 
 
-def pull_from_linear():
-    """Pull open Linear issues and create local tickets."""
-    if not LINEAR_TEAM:
+def _pull_linear():
+    """Pull open Linear issues and create local tickets.
+
+    Walks the issues connection by endCursor, filtered to issues updated
+    since the previous sync.
+    """
+    if not LINEAR_TEAM or not LINEAR_TOKEN:
         return []
-    result = _linear_api("""
-        query($teamId: String!) {
+    cursor = _sync_cursor("linear")
+    started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    query = """
+        query($teamId: String!, $since: DateTimeOrDuration!, $after: String) {
             team(id: $teamId) {
-                issues(filter: {state: {type: {nin: ["completed","canceled"]}}}, first: 50) {
+                issues(filter: {state: {type: {nin: ["completed","canceled"]}},
+                                updatedAt: {gt: $since}}, first: 100, after: $after) {
                     nodes { id identifier title description priority }
+                    pageInfo { hasNextPage endCursor }
                 }
             }
-        }""", {"teamId": LINEAR_TEAM})
-    if not result or "data" not in result:
-        return []
-    issues = result["data"].get("team", {}).get("issues", {}).get("nodes", [])
-    existing_ids = {t.get("linear_id") for t in list_tickets() if t.get("linear_id")}
+        }"""
+    variables = {"teamId": LINEAR_TEAM, "since": cursor.get("since") or "1970-01-01T00:00:00.000Z"}
+    issues = []
+    while True:
+        result = _request("POST", LINEAR_API_URL, _linear_headers(), {"query": query, "variables": variables}).data or {}
+        if result.get("errors"):
+            raise RuntimeError(f"Linear API: {result['errors'][0].get('message', result['errors'])}")
+        conn = ((result.get("data") or {}).get("team") or {}).get("issues") or {}
+        issues.extend(conn.get("nodes") or [])
+        info = conn.get("pageInfo") or {}
+        if not info.get("hasNextPage"):
+            break
+        variables["after"] = info["endCursor"]
+
+    existing_ids = external_ids("linear_id")
     created = []
     for issue in issues:
         if issue["identifier"] in existing_ids:
@@ -526,22 +1495,29 @@ def pull_from_linear():
         ticket = create(title=issue["title"], description=issue.get("description", ""), created_by="linear")
         update(ticket["id"], linear_id=issue["identifier"])
         created.append(ticket)
+    _set_sync_cursor("linear", since=started)
     return created
 
 
+def pull_from_linear():
+    """Linear pull for direct callers (CLI): logs a failure and returns [].
+
+    sync_all() calls _pull_linear() and reports the error instead.
+    """
+    return _quiet_pull(_pull_linear, "Linear")
+
+
 # ── Statistics ───────────────────────────────────────
 
 def stats():
-    """Return ticket statistics summary."""
-    tickets = list_tickets()
-    total = len(tickets)
-    by_status = {}
-    by_priority = {}
-    by_assignee = {}
-    for t in tickets:
-        by_status[t["status"]] = by_status.get(t["status"], 0) + 1
-        by_priority[t["priority"]] = by_priority.get(t["priority"], 0) + 1
-        by_assignee[t["assigned_to"]] = by_assignee.get(t["assigned_to"], 0) + 1
+    """Return ticket statistics summary.
+
+    Histograms are the sizes of the index buckets, which create/update/
+    add_comment keep current — no rescan while the directory is unchanged.
+    """
+    _ensure_dir()
+    total, (by_status, by_priority, by_assignee) = _index.counts(
+        "status", "priority", "assigned_to")
     integrations = {
         "github": bool(GITHUB_TOKEN and GITHUB_REPO),
         "jira": bool(JIRA_URL and JIRA_EMAIL and JIRA_TOKEN),
@@ -557,35 +1533,50 @@ def stats():
     }
 
 
+def _quiet_pull(pull, provider):
+    try:
+        return pull()
+    except Exception as e:
+        logger.error(f"{provider} pull failed: {e}")
+        return []
+
+
+def _sync_one(pull):
+    _sync_tls.requests = 0
+    t0 = time.perf_counter()
+    try:
+        result = {"pulled": len(pull()), "ok": True}
+    except Exception as e:
+        result = {"error": str(e), "ok": False}
+    result["requests"] = _sync_tls.requests
+    result["seconds"] = round(time.perf_counter() - t0, 3)
+    return result
+
+
 def sync_all():
-    """Sync tickets with all configured external services. Returns summary."""
+    """Sync tickets with all configured external services. Returns summary.
+
+    Providers run concurrently; each resumes from its persisted cursor in
+    TICKETS_DIR/.sync_state.json.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
     reload_env()
-    results = {}
+    pulls = {}
     if GITHUB_TOKEN and GITHUB_REPO:
-        try:
-            pulled = pull_from_github()
-            results["github"] = {"pulled": len(pulled), "ok": True}
-        except Exception as e:
-            results["github"] = {"error": str(e), "ok": False}
+        pulls["github"] = _pull_github
     if JIRA_URL and JIRA_EMAIL and JIRA_TOKEN and JIRA_PROJECT:
-        try:
-            pulled = pull_from_jira()
-            results["jira"] = {"pulled": len(pulled), "ok": True}
-        except Exception as e:
-            results["jira"] = {"error": str(e), "ok": False}
+        pulls["jira"] = _pull_jira
     if TRELLO_KEY and TRELLO_TOKEN_ENV and TRELLO_BOARD:
-        try:
-            pulled = pull_from_trello()
-            results["trello"] = {"pulled": len(pulled), "ok": True}
-        except Exception as e:
-            results["trello"] = {"error": str(e), "ok": False}
+        pulls["trello"] = _pull_trello
     if LINEAR_TOKEN and LINEAR_TEAM:
-        try:
-            pulled = pull_from_linear()
-            results["linear"] = {"pulled": len(pulled), "ok": True}
-        except Exception as e:
-            results["linear"] = {"error": str(e), "ok": False}
-    return results
+        pulls["linear"] = _pull_linear
+    if not pulls:
+        return {}
+    _ensure_dir()
+    with ThreadPoolExecutor(max_workers=len(pulls), thread_name_prefix="ticket-sync") as pool:
+        futures = {name: pool.submit(_sync_one, pull) for name, pull in pulls.items()}
+        return {name: f.result() for name, f in futures.items()}
 
 
 # ── CLI ───────────────────────────────────────────────
@@ -598,12 +1589,27 @@ def format_ticket(t, verbose=False):
     if t.get("github_issue_number"):
         line += f"  (GH#{t['github_issue_number']})"
     if verbose:
-        line += f"\n    Status: {t['status']} | Created: {t['created_at'][:10]} | Comments: {len(t.get('comments', []))}"
+        line += f"\n    Status: {t['status']} | Created: {t['created_at'][:10]} | Comments: {_comment_count(t)}"
         if t.get("description"):
             line += f"\n    {t['description'][:100]}"
     return line
 
 
+def _parse_bulk_args(args):
+    """`--field=value` → filter (--ids= is comma-separated), `field=value` → change."""
+    flt, changes = {}, {}
+    for a in args:
+        if "=" not in a:
+            continue
+        k, v = a.split("=", 1)
+        if k.startswith("--"):
+            k = k[2:]
+            flt[k] = [i for i in v.split(",") if i] if k == "ids" else v
+        else:
+            changes[k] = v
+    return flt, changes
+
+
 if __name__ == "__main__":
     import sys
     args = sys.argv[1:]
@@ -613,6 +1619,8 @@ if __name__ == "__main__":
         print("  create <title> [--desc=...] [--priority=normal] [--assign=developer]")
         print("  show <T-XXXX>")
         print("  update <T-XXXX> --status=in_progress")
+        print("  search <words...>     (ranked; word* matches a prefix)")
+        print("  bulk --status=open [--ids=T-0001,T-0002] priority=high assigned_to=monitor")
         print("  comment <T-XXXX> <text>")
         print("  push <T-XXXX>        (push to GitHub)")
         print("  pull                  (pull from GitHub)")
@@ -648,6 +1656,17 @@ if __name__ == "__main__":
                 fields[k] = v
         t = update(args[1], **fields)
         print(f"Updated: {args[1]}" if t else f"Not found: {args[1]}")
+    elif cmd == "search" and len(args) > 1:
+        for t in search(" ".join(args[1:])):
+            print(format_ticket(t))
+    elif cmd == "bulk" and len(args) > 1:
+        flt, changes = _parse_bulk_args(args[1:])
+        try:
+            done = bulk_update(flt, changes)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Updated {len(done)} ticket(s)")
     elif cmd == "comment" and len(args) > 2:
         t = add_comment(args[1], os.environ.get("SERVICE_ROLE", "unknown"), " ".join(args[2:]))
         print(f"Comment added to {args[1]}" if t else f"Not found: {args[1]}")
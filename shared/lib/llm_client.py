@@ -9,6 +9,11 @@ import logging
 import urllib.request
 import urllib.error
 
+try:  # shared keep-alive pool on the host; plain urllib in standalone containers
+    from dockfra.http_client import get_client as _http_client
+except ImportError:
+    _http_client = None
+
 logger = logging.getLogger(__name__)
 
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
@@ -57,6 +62,18 @@ def chat(user_message, system_prompt=None, model=None, history=None):
         "X-Title": f"infra-deploy-{os.environ.get('SERVICE_ROLE', 'unknown')}",
     }
 
+    if _http_client is not None:
+        try:
+            resp = _http_client().request("POST", OPENROUTER_URL, headers,
+                                          json.dumps(payload).encode(), timeout=60)
+            if resp.status >= 400:
+                logger.error(f"LLM HTTP {resp.status}: {resp.text}")
+                return f"[LLM] HTTP Error {resp.status}: {resp.text[:200]}"
+            return resp.json()["choices"][0]["message"]["content"]
+        except Exception as e:
+            logger.error(f"LLM error: {e}")
+            return f"[LLM] Error: {e}"
+
     try:
         req = urllib.request.Request(
             OPENROUTER_URL,
@@ -18,7 +18,7 @@ try:
     # Try importing from dockfra package (works on host / when installed)
     from dockfra.tickets import *          # noqa: F401,F403
     from dockfra.tickets import (          # explicit re-exports for CLI
-        create, get, update, add_comment, list_tickets, close,
+        create, get, update, bulk_update, add_comment, list_tickets, close, search,
         push_to_github, pull_from_github,
         push_to_jira, pull_from_jira,
         push_to_trello, pull_from_trello,
@@ -57,15 +57,34 @@ except ImportError:
     def _ticket_path(tid):
         return os.path.join(TICKETS_DIR, f"{tid}.json")
 
-    def _next_id():
-        _ensure_dir()
+    def _scan_max_id():
         nums = []
         for f in glob.glob(os.path.join(TICKETS_DIR, "T-*.json")):
             try:
                 nums.append(int(os.path.basename(f).replace(".json","").split("-")[1]))
             except (IndexError, ValueError):
                 pass
-        return f"T-{max(nums, default=0)+1:04d}"
+        return max(nums, default=0)
+
+    def _next_id():
+        # Same counter protocol as dockfra.tickets: flock'ed .ticket_seq
+        import fcntl
+        _ensure_dir()
+        path = os.path.join(TICKETS_DIR, ".ticket_seq")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            _chmod_world_rw(path)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try: n = int(os.read(fd, 32).strip())
+            except ValueError: n = _scan_max_id()
+            n += 1
+            while os.path.exists(_ticket_path(f"T-{n:04d}")): n += 1
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, f"{n}\n".encode())
+            os.ftruncate(fd, len(f"{n}\n"))
+        finally:
+            os.close(fd)
+        return f"T-{n:04d}"
 
     def create(title, description="", priority="normal", assigned_to="developer",
                labels=None, created_by="manager"):
@@ -74,36 +93,113 @@ except ImportError:
         ticket = {"id":tid,"title":title,"description":description,"status":"open",
                   "priority":priority,"assigned_to":assigned_to,"labels":labels or [],
                   "created_by":created_by,"created_at":_now(),"updated_at":_now(),
-                  "comments":[],"github_issue_number":None}
-        p = _ticket_path(tid)
-        with open(p,"w") as f: json.dump(ticket,f,indent=2)
+                  "comment_count":0,"last_comment":None,"github_issue_number":None,"revision":1}
+        while True:
+            p = _ticket_path(tid)
+            try:
+                with open(p,"x") as f: json.dump(ticket,f,indent=2)
+                break
+            except FileExistsError:
+                tid = ticket["id"] = _next_id()
         _chmod_world_rw(p)
         return ticket
 
-    def get(tid):
+    def _read_comments(tid):
+        # Same log format as dockfra.tickets: <id>.comments.jsonl, one comment per line
+        try:
+            with open(os.path.join(TICKETS_DIR, f"{tid}.comments.jsonl"), encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        out = []
+        for line in lines:
+            try: out.append(json.loads(line))
+            except ValueError: pass
+        return out
+
+    def get(tid, with_comments=False):
         p = _ticket_path(tid)
         if not os.path.exists(p): return None
-        with open(p) as f: return json.load(f)
-
-    def update(tid, **fields):
-        t = get(tid)
-        if not t: return None
-        for k,v in fields.items():
-            if k not in ("id","created_at","created_by"): t[k]=v
-        t["updated_at"]=_now()
-        p = _ticket_path(tid)
-        with open(p,"w") as f: json.dump(t,f,indent=2)
-        _chmod_world_rw(p)
+        with open(p) as f: t = json.load(f)
+        if with_comments: t["comments"] = _read_comments(tid) + list(t.get("comments") or [])
+        return t
+
+    class RevisionConflict(Exception):
+        pass
+
+    from contextlib import contextmanager
+
+    @contextmanager
+    def _locked(tid, timeout=10.0):
+        # Same per-ticket lock as dockfra.tickets: flock on .<id>.lock, retried with backoff
+        import fcntl, random, time
+        path = os.path.join(TICKETS_DIR, f".{tid}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            _chmod_world_rw(path)
+            deadline, delay = time.monotonic() + timeout, 0.001
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB); break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Ticket {tid} is locked by another writer")
+                    time.sleep(delay * random.uniform(0.5, 1.5)); delay = min(delay * 2, 0.05)
+            yield
+        finally:
+            os.close(fd)
+
+    def _write(t):
+        # Bump the revision, then temp file + rename so readers never see a partial file
+        import tempfile
+        t["revision"] = t.get("revision", 0) + 1
+        p, tmp = _ticket_path(t["id"]), None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=TICKETS_DIR, prefix=".", suffix=".tmp")
+            with os.fdopen(fd,"w") as f: json.dump(t,f,indent=2)
+            _chmod_world_rw(tmp)
+            os.replace(tmp, p)
+        except PermissionError:
+            # Read-only dir or a root-owned file in the sticky dir: rename refused,
+            # so write in place like dockfra.tickets._safe_write does
+            if tmp:
+                try: os.unlink(tmp)
+                except OSError: pass
+            with open(p,"w") as f: json.dump(t,f,indent=2)
+            _chmod_world_rw(p)
+
+    def update(tid, expected_revision=None, **fields):
+        if not os.path.exists(_ticket_path(tid)): return None
+        with _locked(tid):
+            t = get(tid)
+            if not t: return None
+            if expected_revision is not None and t.get("revision",0) != int(expected_revision):
+                raise RevisionConflict(f"{tid} is at revision {t.get('revision',0)}, expected {expected_revision}")
+            for k,v in fields.items():
+                if k not in ("id","created_at","created_by","revision"): t[k]=v
+            t["updated_at"]=_now()
+            _write(t)
         return t
 
     def add_comment(tid, author, text):
-        t = get(tid)
-        if not t: return None
-        t.setdefault("comments",[]).append({"author":author,"text":text,"timestamp":_now()})
-        t["updated_at"]=_now()
-        p = _ticket_path(tid)
-        with open(p,"w") as f: json.dump(t,f,indent=2)
-        _chmod_world_rw(p)
+        # Append to the comment log under the ticket lock; the document keeps count + summary
+        if not os.path.exists(_ticket_path(tid)): return None
+        c = {"author":author,"text":text,"timestamp":_now()}
+        with _locked(tid):
+            t = get(tid)
+            if not t: return None
+            embedded = t.pop("comments", None) or []
+            log = os.path.join(TICKETS_DIR, f"{tid}.comments.jsonl")
+            fd = os.open(log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+            try:
+                _chmod_world_rw(log)
+                os.write(fd, "".join(json.dumps(x, ensure_ascii=False)+"\n" for x in embedded+[c]).encode())
+            finally:
+                os.close(fd)
+            t["comment_count"] = t.get("comment_count",0) + len(embedded) + 1
+            t["last_comment"] = dict(c, text=str(text)[:200])
+            t["updated_at"] = c["timestamp"]
+            _write(t)
         return t
 
     def list_tickets(status=None, assigned_to=None, priority=None):
@@ -122,6 +218,34 @@ except ImportError:
     def close(tid, closed_by="manager"):
         return update(tid, status="closed")
 
+    def bulk_update(filter, changes):
+        # Same contract as dockfra.tickets.bulk_update: re-checked under each ticket's lock
+        flt = dict(filter or {}); ids = flt.pop("ids", None)
+        if not flt and not ids: raise ValueError("Bulk update needs a filter")
+        changes = {k:v for k,v in (changes or {}).items() if k not in ("id","created_at","created_by","revision")}
+        if not changes: raise ValueError("No changes given")
+        done = []
+        for cand in list_tickets(**flt):
+            if ids and cand.get("id") not in ids: continue
+            with _locked(cand["id"]):
+                t = get(cand["id"])
+                if not t or any(t.get(k) != v for k,v in flt.items() if v): continue
+                t.update(changes); t["updated_at"]=_now()
+                _write(t)
+            done.append(t)
+        return done
+
+    def search(query, limit=20):
+        # Linear scan; the wizard side uses dockfra.tickets' inverted index
+        words = query.casefold().split()
+        hits = []
+        for t in list_tickets():
+            text = " ".join([t.get("title",""), t.get("description",""), " ".join(t.get("labels",[]))]
+                            + [c.get("text","") for c in _read_comments(t["id"]) + t.get("comments",[])]).casefold()
+            if all(w.rstrip("*") in text for w in words):
+                hits.append(dict(t, score=float(sum(text.count(w.rstrip("*")) for w in words))))
+        return sorted(hits, key=lambda t: -t["score"])[:limit]
+
     def push_to_github(tid): return None
     def pull_from_github(): return []
     def push_to_jira(tid): return None
@@ -139,7 +263,7 @@ except ImportError:
         line=f"  {si} {t['id']:8s} {pi} {t['title'][:50]:50s} → {t['assigned_to']}"
         if t.get("github_issue_number"): line+=f"  (GH#{t['github_issue_number']})"
         if verbose:
-            line+=f"\n    Status: {t['status']} | Created: {t['created_at'][:10]} | Comments: {len(t.get('comments',[]))}"
+            line+=f"\n    Status: {t['status']} | Created: {t['created_at'][:10]} | Comments: {t.get('comment_count', len(t.get('comments',[])))}"
             if t.get("description"): line+=f"\n    {t['description'][:100]}"
         return line
 
@@ -178,6 +302,20 @@ if __name__ == "__main__":
                 fields[k] = v
         t = update(args[1], **fields)
         print(f"Updated: {args[1]}" if t else f"Not found: {args[1]}")
+    elif cmd == "search" and len(args) > 1:
+        for t in search(" ".join(args[1:])):
+            print(format_ticket(t))
+    elif cmd == "bulk" and len(args) > 1:
+        flt, changes = {}, {}
+        for a in args[1:]:
+            if "=" not in a: continue
+            k, v = a.split("=", 1)
+            if k.startswith("--"): flt[k[2:]] = v.split(",") if k == "--ids" else v
+            else: changes[k] = v
+        try:
+            print(f"Updated {len(bulk_update(flt, changes))} ticket(s)")
+        except ValueError as e:
+            print(f"Error: {e}")
     elif cmd == "comment" and len(args) > 2:
         t = add_comment(args[1], os.environ.get("SERVICE_ROLE", "unknown"), " ".join(args[2:]))
         print(f"Comment added to {args[1]}" if t else f"Not found: {args[1]}")
@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for Dockfra hot paths.
+
+Run: python tests/bench.py [name ...]     (no name → run all)
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _rate(n, secs):
+    return f"{n / secs:>12,.0f} /s  ({secs * 1000:8.1f} ms for {n:,})"
+
+
+def bench_db_append(n=5000):
+    """events/s for append_event: connect-per-call baseline vs pooled WAL connection."""
+    from dockfra import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Baseline: the pre-pool behaviour — fresh connection + commit per event
+        path = Path(tmp) / "naive.db"
+        db.init_db(path)
+        db.close_db()
+        conn = sqlite3.connect(str(path))
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        t0 = time.perf_counter()
+        for i in range(n):
+            with sqlite3.connect(str(path), timeout=5) as c:
+                c.execute("INSERT INTO events (ts, src, event, data) VALUES (?,?,?,?)",
+                          (time.time(), "bench", "log_line",
+                           json.dumps({"id": f"log-{i}", "text": "x" * 80})))
+                c.commit()
+        print(f"  append  connect-per-call      {_rate(n, time.perf_counter() - t0)}")
+
+        for level in ("FULL", "NORMAL", "OFF"):
+            db.init_db(Path(tmp) / f"pool-{level}.db", synchronous=level)
+            t0 = time.perf_counter()
+            for i in range(n):
+                db.append_event("log_line", {"id": f"log-{i}", "text": "x" * 80}, src="bench")
+            print(f"  append  pooled WAL sync={level:<6} {_rate(n, time.perf_counter() - t0)}")
+
+        t0 = time.perf_counter()
+        for _ in range(n):
+            db.get_max_id()
+        print(f"  get_max_id pooled reader      {_rate(n, time.perf_counter() - t0)}")
+        db.close_db()
+
+
+def bench_db_write_behind(n=20000):
+    """emitter-side cost of enqueue_event (group commit) vs synchronous append_event."""
+    from dockfra import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.init_db(Path(tmp) / "sync.db")
+        t0 = time.perf_counter()
+        for i in range(n):
+            db.append_event("log_line", {"id": f"log-{i}", "text": "x" * 80}, src="bench")
+        print(f"  append_event (sync)           {_rate(n, time.perf_counter() - t0)}")
+
+        db.init_db(Path(tmp) / "wb.db")
+        db.start_write_behind()
+        t0 = time.perf_counter()
+        for i in range(n):
+            db.enqueue_event("log_line", {"id": f"log-{i}", "text": "x" * 80}, src="bench")
+        emit = time.perf_counter() - t0
+        db.flush()
+        total = time.perf_counter() - t0
+        stats = db.write_behind_stats()
+        print(f"  enqueue_event (emitter)       {_rate(n, emit)}")
+        print(f"  enqueue_event (until durable) {_rate(n, total)}"
+              f"  batches={stats['batches']} largest={stats['largest_batch']}")
+        db.close_db()
+
+
+def bench_db_read(n=100000):
+    """get_events read throughput: JSON payload rows vs typed log_line/message columns."""
+    from dockfra import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = [("log_line", {"id": f"log-{i}", "text": "x" * 80}, "bench") if i % 10
+                else ("message", {"id": f"msg-{i}", "role": "bot", "text": "y" * 120}, "bench")
+                for i in range(n)]
+        saved = db._TYPED_PAYLOADS
+        for typed in (False, True):
+            db._TYPED_PAYLOADS = typed
+            db.init_db(Path(tmp) / f"read-{typed}.db", synchronous="OFF")
+            db.append_batch(rows)
+            t0 = time.perf_counter()
+            cursor = read = 0
+            while True:
+                page = db.get_events(since_id=cursor, limit=500)
+                if not page:
+                    break
+                cursor = page[-1]["id"]
+                read += len(page)
+            label = "typed columns" if typed else "JSON text"
+            print(f"  get_events pages  {label:<13} {_rate(read, time.perf_counter() - t0)}")
+        db._TYPED_PAYLOADS = saved
+        db.close_db()
+
+
+def bench_projection_rebuild(n=50000):
+    """ticket_board rebuild throughput and incremental catch-up after a snapshot."""
+    from dockfra import db
+    from dockfra.event_bus import EventBus, SQLiteEventStore
+    from dockfra.projections import ProjectionManager, TicketBoardProjection
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.init_db(Path(tmp) / "proj.db", synchronous="OFF")
+        db.append_batch([
+            ("ticket.updated" if i % 5 else "log_line",
+             {"id": f"T-{i % 500:04d}", "changes": {"status": "in_progress"}}, "bench")
+            for i in range(n)])
+        bus = EventBus(SQLiteEventStore(db))
+        mgr = ProjectionManager(bus, db)
+        mgr.register(TicketBoardProjection())
+        s = mgr.rebuild("ticket_board")
+        print(f"  full rebuild                  {_rate(s['scanned'], s['seconds'])}")
+        db.append_batch([("ticket.commented", {"id": "T-0001"}, "bench")] * 100)
+        mgr2 = ProjectionManager(bus, db)
+        mgr2.register(TicketBoardProjection())
+        s = mgr2.catch_up("ticket_board")
+        print(f"  resume from snapshot          scanned {s['scanned']} events in {s['seconds'] * 1000:.1f} ms")
+        db.close_db()
+
+
+def bench_bus_dispatch(n=2000, handler_ms=0.5):
+    """emit() cost with a slow subscriber: inline sync vs thread-pool dispatch."""
+    from dockfra.event_bus import EventBus
+
+    def slow(ev):
+        time.sleep(handler_ms / 1000)
+
+    for mode in ("sync", "thread"):
+        bus = EventBus()
+        bus.subscribe_all(slow, mode=mode, workers=4, maxsize=n)
+        t0 = time.perf_counter()
+        for i in range(n):
+            bus.emit(f"type{i % 8}", {"n": i})
+        emit = time.perf_counter() - t0
+        bus.join()
+        total = time.perf_counter() - t0
+        m = bus.metrics()[0]
+        print(f"  emit {mode:<6} (emitter)          {_rate(n, emit)}")
+        print(f"  emit {mode:<6} (handled)          {_rate(n, total)}  max_depth={m['max_depth']}")
+        bus.close()
+
+
+def bench_event_stores(n=20000):
+    """EventStore backends: append latency, range-read throughput, recovery time."""
+    from dockfra import db
+    from dockfra.event_bus import SQLiteEventStore
+    from dockfra.event_stores import MemoryEventStore, SegmentLogStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def open_sqlite():
+            db.init_db(Path(tmp) / "stores.db")
+            return SQLiteEventStore(db)
+
+        backends = {
+            "memory": lambda: MemoryEventStore(capacity=n),
+            "sqlite": open_sqlite,
+            "segment": lambda: SegmentLogStore(Path(tmp) / "seg"),
+        }
+        for name, factory in backends.items():
+            store = factory()
+            lat = []
+            for i in range(n):
+                t0 = time.perf_counter()
+                store.append("log_line", {"id": f"log-{i}", "text": "x" * 80}, "bench")
+                lat.append(time.perf_counter() - t0)
+            lat.sort()
+            p50, p99 = lat[len(lat) // 2] * 1e6, lat[int(len(lat) * 0.99)] * 1e6
+            t0 = time.perf_counter()
+            cursor = read = 0
+            while True:
+                page = store.get_since(cursor, 500)
+                if not page:
+                    break
+                cursor = page[-1]["id"]
+                read += len(page)
+            reads = time.perf_counter() - t0
+            if name == "memory":
+                recovery = "n/a"
+            else:
+                if name == "sqlite":
+                    db.close_db()
+                else:
+                    store.close()
+                t0 = time.perf_counter()
+                store = factory()
+                recovery = f"{(time.perf_counter() - t0) * 1000:.1f} ms"
+                assert store.get_max_id() == n
+            print(f"  {name:<8} append p50 {p50:6.1f} µs  p99 {p99:7.1f} µs   "
+                  f"range reads {read / reads:>10,.0f} /s   recovery {recovery}")
+            if hasattr(store, "close"):
+                store.close()
+        db.close_db()
+
+
+def bench_stream_filters(n=20000, clients=20):
+    """StreamHub fan-out + SSE encoding during a build: unfiltered vs ticket.* clients."""
+    from dockfra.event_bus import EventBus, EventFilter, StreamHub
+    from dockfra.event_stores import MemoryEventStore
+
+    for label, flt in (("unfiltered", None), ("type=ticket.*", EventFilter(types=["ticket.*"]))):
+        bus = EventBus(MemoryEventStore(capacity=n))
+        hub = StreamHub(bus, maxsize=n)
+        subs = [hub.connect(flt) for _ in range(clients)]
+        t0 = time.perf_counter()
+        for i in range(n):
+            if i % 50:
+                bus.emit("log_line", {"id": f"log-{i}", "text": "#12 RUN pip install -r requirements.txt"})
+            else:
+                bus.emit("ticket.updated", {"id": f"T-{i % 40:04d}", "changes": {"status": "in_progress"}})
+        sent = 0
+        for sub in subs:
+            for ev in sub.get(0):
+                sent += len(f"data: {json.dumps(ev, ensure_ascii=False)}\n\n")
+        elapsed = time.perf_counter() - t0
+        print(f"  {label:<14} {elapsed * 1000:8.1f} ms   {sent / 1024:10,.0f} KiB sent to {clients} clients")
+
+
+def bench_tickets_list(n=5000, rounds=20):
+    """list_tickets over n ticket files: glob + json.load per call vs the mtime-validated index."""
+    import glob as _glob
+    from dockfra import tickets
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old = time.time() - 60
+        for i in range(1, n + 1):
+            p = Path(tmp) / f"T-{i:04d}.json"
+            p.write_text(json.dumps({
+                "id": f"T-{i:04d}", "title": f"Ticket {i}", "description": "x" * 200,
+                "status": ("open", "in_progress", "review", "closed")[i % 4],
+                "priority": "normal", "assigned_to": "developer", "labels": [],
+                "comments": [{"author": "a", "text": "b", "timestamp": "t"}] * (i % 3),
+            }, indent=2))
+            os.utime(p, (old, old))
+        saved = tickets.TICKETS_DIR
+        tickets.TICKETS_DIR = tmp
+
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            found = []
+            for path in sorted(_glob.glob(os.path.join(tmp, "T-*.json"))):
+                with open(path) as f:
+                    t = json.load(f)
+                if t.get("status") == "review":
+                    found.append(t)
+        print(f"  glob + json.load  {(time.perf_counter() - t0) / rounds * 1000:8.1f} ms/call")
+
+        t0 = time.perf_counter()
+        tickets.list_tickets()
+        print(f"  index cold build  {(time.perf_counter() - t0) * 1000:8.1f} ms")
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            tickets.list_tickets(status="review")
+        print(f"  index (status=)   {(time.perf_counter() - t0) / rounds * 1000:8.1f} ms/call")
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            tickets.list_tickets()
+        print(f"  index (all)       {(time.perf_counter() - t0) / rounds * 1000:8.1f} ms/call")
+        tickets.TICKETS_DIR = saved
+
+
+def bench_tickets_search(n=50000, rounds=50):
+    """tickets.search over n tickets: linear substring scan vs the inverted index."""
+    import random
+    from dockfra import tickets
+
+    rng = random.Random(1)
+    vocab = ("deploy docker build fix crash login auth token cache nginx postgres redis "
+             "timeout memory leak ssh key retry queue worker api endpoint flaky css").split()
+    vocab += [f"term{i}" for i in range(5000)]
+    weights = [1 / (r + 1) for r in range(len(vocab))]
+    with tempfile.TemporaryDirectory() as tmp:
+        old = time.time() - 60
+        for i in range(1, n + 1):
+            p = Path(tmp) / f"T-{i:05d}.json"
+            p.write_text(json.dumps({
+                "id": f"T-{i:05d}", "title": " ".join(rng.choices(vocab, weights, k=6)),
+                "description": " ".join(rng.choices(vocab, weights, k=40)),
+                "status": "open", "priority": "normal", "assigned_to": "developer", "labels": [],
+                "comments": [{"author": "a", "text": " ".join(rng.choices(vocab, weights, k=15))}],
+            }))
+            os.utime(p, (old, old))
+        saved = tickets.TICKETS_DIR
+        tickets.TICKETS_DIR = tmp
+        tickets._index.rescan_ns = 60 * 10**9
+        all_t = tickets.list_tickets()
+        t0 = time.perf_counter()
+        hits = [t for t in all_t if "nginx" in t["title"] or "nginx" in t["description"]]
+        print(f"  substring scan        {(time.perf_counter() - t0) * 1000:8.2f} ms  ({len(hits)} hits)")
+        t0 = time.perf_counter()
+        tickets.search("warmup")
+        print(f"  index build           {(time.perf_counter() - t0) * 1000:8.1f} ms")
+        for query in ("nginx", "nginx timeout", "term42", "post*"):
+            tickets.search(query)
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                tickets.search(query, 20)
+            print(f"  search {query!r:<15} {(time.perf_counter() - t0) / rounds * 1000:8.2f} ms/query")
+        tickets._index.rescan_ns = int(float(os.environ.get("DOCKFRA_TICKETS_RESCAN", "1")) * 1e9)
+        tickets.TICKETS_DIR = saved
+
+
+def bench_tickets_bulk(n=300):
+    """re-prioritising n tickets through the API: n × PUT /api/tickets/<id> vs one POST /api/tickets/bulk."""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DOCKFRA_ROOT"] = tmp
+        os.environ["TICKETS_DIR"] = tmp
+        from dockfra import tickets
+        from dockfra.app import app
+        tickets.TICKETS_DIR = tmp
+        client = app.test_client()
+        for i in range(n):
+            tickets.create(f"Ticket {i}", description="x" * 200)
+        ids = [tk["id"] for tk in tickets.list_tickets(status="open")]
+        t0 = time.perf_counter()
+        for tid in ids:
+            client.put(f"/api/tickets/{tid}", json={"priority": "high"})
+        print(f"  PUT per ticket        {_rate(n, time.perf_counter() - t0)}")
+        t0 = time.perf_counter()
+        r = client.post("/api/tickets/bulk", json={"filter": {"status": "open"},
+                                                   "changes": {"priority": "low"}})
+        print(f"  POST /api/tickets/bulk {_rate(json.loads(r.data)['updated'], time.perf_counter() - t0)}")
+
+
+def bench_tickets_page(n=2000, comments=20):
+    """GET /api/tickets with n commented tickets: full list vs a 50-ticket sparse page vs 304."""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DOCKFRA_ROOT"] = tmp
+        os.environ["TICKETS_DIR"] = tmp
+        from dockfra import tickets
+        from dockfra.app import app
+        tickets.TICKETS_DIR = tmp
+        client = app.test_client()
+        for i in range(n):
+            tickets.create(f"Ticket {i}", description="x" * 200)
+            path = os.path.join(tmp, f"T-{i + 1:04d}.json")
+            with open(path) as f:
+                tk = json.load(f)
+            tk["comments"] = [{"author": "dev", "text": "y" * 200, "ts": tk["created_at"]}] * comments
+            with open(path, "w") as f:
+                json.dump(tk, f)
+        client.get("/api/tickets")  # warm the index
+        for label, url, headers in (
+                ("full list", "/api/tickets", {}),
+                ("limit=50&fields=title,status", "/api/tickets?limit=50&fields=title,status", {}),
+                ("If-None-Match → 304", "/api/tickets?limit=50&fields=title,status", None)):
+            if headers is None:
+                headers = {"If-None-Match": client.get(url).headers["ETag"]}
+            t0 = time.perf_counter()
+            for _ in range(20):
+                r = client.get(url, headers=headers)
+            ms = (time.perf_counter() - t0) / 20 * 1000
+            print(f"  {label:<34} {ms:8.2f} ms  {len(r.data):>10,} bytes  (HTTP {r.status_code})")
+
+
+def bench_tickets_comment(n=2000, text_len=500):
+    """n comments on one ticket: cost of the first vs last 100 (append-only log keeps it flat)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        from dockfra import tickets
+        tickets.TICKETS_DIR = tmp
+        tid = tickets.create("Busy ticket")["id"]
+        text = "z" * text_len
+        times = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            tickets.add_comment(tid, "pipeline", text)
+            times.append(time.perf_counter() - t0)
+        print(f"  first 100 comments    {_rate(100, sum(times[:100]))}")
+        print(f"  last 100 comments     {_rate(100, sum(times[-100:]))}")
+        print(f"  ticket document       {os.path.getsize(tickets._ticket_path(tid)):>10,} bytes")
+
+
+def _contention_worker(mode, tid, n):
+    from dockfra import tickets
+    conflicts = 0
+    for _ in range(n):
+        if mode == "unlocked":
+            # The pre-lock read-modify-write; readers can catch a half-written file
+            while True:
+                try:
+                    t = tickets.get(tid)
+                    break
+                except ValueError:
+                    conflicts += 1
+            t["labels"] = t["labels"] + ["x"]
+            tickets._safe_write(tickets._ticket_path(tid), t)
+            continue
+        while True:
+            t = tickets.get(tid)
+            try:
+                tickets.update(tid, expected_revision=t["revision"], labels=t["labels"] + ["x"])
+                break
+            except tickets.RevisionConflict:
+                conflicts += 1
+    return conflicts
+
+
+def bench_tickets_contention(procs=4, n=100):
+    """procs processes appending to one ticket's labels: unlocked RMW vs flock + revision CAS."""
+    import multiprocessing
+    ctx = multiprocessing.get_context("fork")
+    with tempfile.TemporaryDirectory() as tmp:
+        from dockfra import tickets
+        tickets.TICKETS_DIR = tmp
+        for mode in ("unlocked", "cas"):
+            tid = tickets.create(f"Contended {mode}")["id"]
+            t0 = time.perf_counter()
+            with ctx.Pool(procs) as pool:
+                conflicts = sum(pool.starmap(_contention_worker, [(mode, tid, n)] * procs))
+            secs = time.perf_counter() - t0
+            kept = len(tickets.get(tid)["labels"])
+            print(f"  {mode:<9} {_rate(procs * n, secs)}  kept {kept}/{procs * n}"
+                  f"  retried {conflicts} (torn reads / CAS conflicts)")
+
+
+def _idle_stream():
+    yield None  # connected, then a quiet event stream
+    while True:
+        time.sleep(3600)
+        yield None
+
+
+def bench_container_cache(n=200):
+    """docker_ps() callers: a `docker ps` spawn per call vs the event-fed ContainerCache."""
+    import shutil
+    import subprocess
+    from dockfra.container_cache import ContainerCache
+    # Without a docker CLI, `true` stands in for the process spawn
+    cmd = ["docker", "ps", "--format", "{{.Names}}::{{.Status}}::{{.Ports}}"] \
+        if shutil.which("docker") else ["true"]
+
+    def snapshot():
+        subprocess.run(cmd, capture_output=True)
+        return [{"name": f"svc-{i}", "status": "Up 2 hours (healthy)", "ports": ""} for i in range(12)]
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        snapshot()
+    print(f"  spawn per call ({cmd[0]:<6}) {_rate(n, time.perf_counter() - t0)}")
+    cache = ContainerCache(snapshot, events=_idle_stream)
+    cache.rows()
+    time.sleep(0.05)
+    t0 = time.perf_counter()
+    for _ in range(n * 100):
+        cache.rows()
+    print(f"  ContainerCache.rows()  {_rate(n * 100, time.perf_counter() - t0)}  "
+          f"snapshots {cache.stats()['snapshots']}")
+    cache.close()
+
+
+def bench_log_mux(n=200, log_lines=5000):
+    """/api/logs polling: `docker logs --tail 100` per request vs LogMux tail / since."""
+    import shutil
+    import subprocess
+    from dockfra.log_mux import LogMux
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "container.log"
+        log.write_text("".join(f"2024-05-01T10:00:00.{i:09d}Z GET /api/items/{i} 200 1.2ms\n"
+                               for i in range(log_lines)))
+        # Without a docker CLI, `tail` on a file stands in for the spawn + read
+        cmd = ["docker", "logs", "--tail", "100", "dockfra-app"] if shutil.which("docker") \
+            else ["tail", "-n", "100", str(log)]
+        t0 = time.perf_counter()
+        for _ in range(n):
+            subprocess.run(cmd, capture_output=True, text=True).stdout.splitlines()
+        print(f"  spawn per request ({cmd[0]:<6}) {_rate(n, time.perf_counter() - t0)}")
+
+        class Source:
+            def fetch(self, name, tail):
+                from dockfra.log_mux import _split_ts
+                return [_split_ts(l) for l in log.read_text().splitlines()[-tail:]]
+
+            def follow(self, name, since):
+                return _idle_stream_lines(), lambda: None
+
+        mux = LogMux(Source())
+        t0 = time.perf_counter()
+        for _ in range(n * 100):
+            mux.tail("dockfra-app", 100)
+        print(f"  LogMux.tail(100)             {_rate(n * 100, time.perf_counter() - t0)}")
+        offset = mux.tail("dockfra-app", 1)["offset"]
+        t0 = time.perf_counter()
+        for _ in range(n * 100):
+            mux.since("dockfra-app", offset)
+        print(f"  LogMux.since (no new lines)  {_rate(n * 100, time.perf_counter() - t0)}")
+        mux.close()
+
+
+def bench_history(n=200, messages=20000):
+    """/api/history after a long session: whole list vs RingLog last / since."""
+    import json
+    from dockfra.ring_log import RingLog
+
+    plain = [{"id": f"msg-{i}", "role": "bot", "text": f"Container dockfra-app {i} is up",
+              "timestamp": time.time()} for i in range(messages)]
+    t0 = time.perf_counter()
+    for _ in range(n):
+        size = len(json.dumps({"conversation": plain}))
+    print(f"  list, whole history        {_rate(n, time.perf_counter() - t0)}  {size // 1024} KiB")
+    ring = RingLog(2000, id_prefix="msg")
+    for m in plain:
+        ring.append({k: v for k, v in m.items() if k != "id"})
+    t0 = time.perf_counter()
+    for _ in range(n):
+        size = len(json.dumps({"conversation": ring.last(500)}))
+    print(f"  RingLog.last(500)          {_rate(n, time.perf_counter() - t0)}  {size // 1024} KiB")
+    cursor = ring.last(1)[0]["seq"]
+    ring.append({"role": "bot", "text": "new"})
+    t0 = time.perf_counter()
+    for _ in range(n * 100):
+        size = len(json.dumps({"conversation": ring.since(cursor)}))
+    print(f"  RingLog.since(cursor)      {_rate(n * 100, time.perf_counter() - t0)}  {size} B")
+
+
+def _idle_stream_lines():
+    while True:
+        time.sleep(3600)
+        yield from ()
+
+
+def _build_log(n, seed=1):
+    """`docker compose build`-style output with a port conflict every 5,000 lines."""
+    import random
+    rnd = random.Random(seed)
+    tmpl = ["#{n} [backend {s}/9] RUN pip install --no-cache-dir -r requirements.txt",
+            "#{n} {t} Collecting requests>=2.31 (from -r requirements.txt (line {s}))",
+            "#{n} {t}   Downloading urllib3-2.2.1-py3-none-any.whl (121 kB)",
+            "#{n} sha256:{h} 12.58MB / 31.42MB {t}s",
+            "#{n} exporting layers {t}s done",
+            "#{n} [frontend 3/7] COPY package.json yarn.lock ./",
+            "#{n} {t} npm WARN deprecated inflight@1.0.6: This module is not supported",
+            "#{n} CACHED [ssh-developer 4/12] RUN apt-get update && apt-get install -y openssh-server",
+            " Container dockfra-traefik  Started",
+            " Network dockfra-shared  Created"]
+    lines = [rnd.choice(tmpl).format(n=rnd.randint(1, 60), s=rnd.randint(1, 9),
+                                     t=round(rnd.random() * 90, 1), h="%064x" % rnd.getrandbits(256))
+             for _ in range(n)]
+    for i in range(0, n, 5000):
+        lines[i] = ("Error response from daemon: driver failed programming external connectivity: "
+                    "Bind for 0.0.0.0:8080 failed: port is already allocated")
+    return lines
+
+
+def bench_log_patterns(n=100000):
+    """lines/s through the config-error + health rules: per-rule re.search vs PatternSet."""
+    import re
+    from dockfra.core import _CONFIG_ERROR_PATTERNS, _HEALTH_PATTERNS
+    from dockfra.log_patterns import PatternSet
+
+    lines = _build_log(n)
+    patterns = [r[0] for r in _CONFIG_ERROR_PATTERNS + _HEALTH_PATTERNS]
+    t0 = time.perf_counter()
+    for line in lines:
+        for p in patterns:
+            if re.search(p, line, re.IGNORECASE):
+                break
+    print(f"  re.search per rule     {_rate(n, time.perf_counter() - t0)}")
+    compiled = [re.compile(p, re.IGNORECASE) for p in patterns]
+    t0 = time.perf_counter()
+    for line in lines:
+        for rx in compiled:
+            if rx.search(line):
+                break
+    print(f"  precompiled per rule   {_rate(n, time.perf_counter() - t0)}")
+    ps = PatternSet([(p, None) for p in patterns])
+    t0 = time.perf_counter()
+    hits = sum(ps.search(line) is not None for line in lines)
+    print(f"  PatternSet             {_rate(n, time.perf_counter() - t0)}  hits={hits}")
+
+
+def bench_health_analysis(containers=12, log_ms=80):
+    """failing-container analyses: serial (old loop) vs HealthAnalyzer pool vs cached."""
+    from dockfra.health_analyzer import HealthAnalyzer
+
+    def analyze(name):
+        time.sleep(log_ms / 1000)  # stands in for `docker logs --tail 40`
+        return (f"finding for {name}", [{"value": f"logs::{name}"}])
+
+    names = [f"dockfra-svc-{i}" for i in range(containers)]
+    t0 = time.perf_counter()
+    for name in names:
+        analyze(name)
+    print(f"  serial                 {_rate(containers, time.perf_counter() - t0)}")
+    an = HealthAnalyzer(analyze, identify=lambda ns: {n: (n, "0") for n in ns})
+    t0 = time.perf_counter()
+    an.analyze_many(names)
+    print(f"  HealthAnalyzer (8)     {_rate(containers, time.perf_counter() - t0)}")
+    t0 = time.perf_counter()
+    for _ in range(100):
+        an.analyze_many(names)
+    print(f"  cached (same restarts) {_rate(containers * 100, time.perf_counter() - t0)}")
+
+
+def bench_http_pool(n=500):
+    """sequential requests to one local host: urllib connect-per-call vs keep-alive pool."""
+    import threading
+    import urllib.request
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from dockfra.http_client import HTTPClient
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/issues"
+    t0 = time.perf_counter()
+    for _ in range(n):
+        with urllib.request.urlopen(url, timeout=5) as r:
+            r.read()
+    print(f"  urllib.urlopen         {_rate(n, time.perf_counter() - t0)}")
+    client = HTTPClient()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        client.request("GET", url)
+    m = next(iter(client.metrics()["hosts"].values()))
+    print(f"  HTTPClient keep-alive  {_rate(n, time.perf_counter() - t0)}"
+          f"  connections={m['connections_opened']}")
+    client.close()
+    server.shutdown()
+
+
+BENCHES = {
+    "db_append": bench_db_append,
+    "db_write_behind": bench_db_write_behind,
+    "db_read": bench_db_read,
+    "projection_rebuild": bench_projection_rebuild,
+    "bus_dispatch": bench_bus_dispatch,
+    "event_stores": bench_event_stores,
+    "stream_filters": bench_stream_filters,
+    "tickets_list": bench_tickets_list,
+    "tickets_search": bench_tickets_search,
+    "tickets_bulk": bench_tickets_bulk,
+    "tickets_page": bench_tickets_page,
+    "tickets_comment": bench_tickets_comment,
+    "tickets_contention": bench_tickets_contention,
+    "container_cache": bench_container_cache,
+    "log_mux": bench_log_mux,
+    "history": bench_history,
+    "log_patterns": bench_log_patterns,
+    "health_analysis": bench_health_analysis,
+    "http_pool": bench_http_pool,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHES)
+    for name in names:
+        fn = BENCHES.get(name)
+        if not fn:
+            print(f"unknown benchmark: {name} (available: {', '.join(BENCHES)})")
+            sys.exit(1)
+        print(f"── {name}: {fn.__doc__.strip()}")
+        fn()
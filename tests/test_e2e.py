@@ -10,6 +10,7 @@ import shutil
 import tempfile
 import pytest
 import sys
+import time
 from pathlib import Path
 
 # Ensure dockfra package is importable
@@ -18,6 +19,14 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 # ── Fixtures ──────────────────────────────────────────────────────────────────
 
+@pytest.fixture(scope="session", autouse=True)
+def event_db(tmp_path_factory):
+    """Keep the event store out of the working tree (dockfra.app opens it on import)."""
+    path = tmp_path_factory.mktemp("db") / "dockfra.db"
+    os.environ["DOCKFRA_DB_PATH"] = str(path)
+    return path
+
+
 @pytest.fixture(scope="session")
 def tickets_dir(tmp_path_factory):
     """Create a temp tickets dir and point dockfra.tickets at it."""
@@ -42,8 +51,11 @@ def app_client(tickets_dir):
 @pytest.fixture(autouse=True)
 def clean_tickets(tickets_dir):
     """Clean tickets dir before each test."""
-    for f in tickets_dir.glob("T-*.json"):
+    for f in [*tickets_dir.glob("T-*.json"), *tickets_dir.glob("T-*.comments.jsonl"),
+              *tickets_dir.glob(".T-*.lock")]:
         f.unlink()
+    (tickets_dir / ".ticket_seq").unlink(missing_ok=True)
+    (tickets_dir / ".sync_state.json").unlink(missing_ok=True)
     yield
 
 
@@ -113,10 +125,161 @@ class TestTicketsModule:
         from dockfra import tickets
         tickets.create("Comment me")
         t = tickets.add_comment("T-0001", "tester", "This is a comment")
+        assert t["comment_count"] == 1 and "comments" not in t
+        assert t["last_comment"]["author"] == "tester"
+        t = tickets.get("T-0001", with_comments=True)
         assert len(t["comments"]) == 1
         assert t["comments"][0]["author"] == "tester"
         assert t["comments"][0]["text"] == "This is a comment"
 
+    def test_comment_log_appends_and_migrates(self, tickets_dir):
+        import threading
+        from dockfra import tickets
+        tickets.create("Legacy")
+        path = tickets_dir / "T-0001.json"
+        doc = json.loads(path.read_text())
+        del doc["comment_count"]
+        doc["comments"] = [{"author": "old", "text": "embedded", "timestamp": "2024-01-01T00:00:00"}]
+        path.write_text(json.dumps(doc))
+        assert tickets.get("T-0001", with_comments=True)["comments"][0]["text"] == "embedded"
+        tickets.add_comment("T-0001", "new", "x" * 500)
+        doc = json.loads(path.read_text())
+        assert "comments" not in doc and doc["comment_count"] == 2
+        assert len(doc["last_comment"]["text"]) == tickets._SUMMARY_CHARS
+        log = (tickets_dir / "T-0001.comments.jsonl").read_text().splitlines()
+        assert [json.loads(line)["author"] for line in log] == ["old", "new"]
+        workers = [threading.Thread(target=tickets.add_comment, args=("T-0001", f"w{i}", "hi"))
+                   for i in range(8)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        t = tickets.get("T-0001", with_comments=True)
+        assert len(t["comments"]) == t["comment_count"] == 10
+        assert tickets.list_page(fields=["comment_count"])["tickets"][0]["comment_count"] == 10
+
+    def test_update_revision_cas(self, tickets_dir):
+        from dockfra import tickets
+        t = tickets.create("CAS")
+        assert t["revision"] == 1
+        t = tickets.update("T-0001", expected_revision=1, status="in_progress", revision=99)
+        assert t["revision"] == 2
+        with pytest.raises(tickets.RevisionConflict) as exc:
+            tickets.update("T-0001", expected_revision=1, status="review")
+        assert exc.value.actual == 2
+        assert tickets.get("T-0001")["status"] == "in_progress"
+        assert tickets.add_comment("T-0001", "dev", "hi")["revision"] == 3
+
+    def test_concurrent_updates_across_processes(self, tickets_dir):
+        import multiprocessing
+        from dockfra import tickets
+        tickets.create("Contended", labels=[])
+
+        def worker(n):
+            for _ in range(n):
+                while True:
+                    t = tickets.get("T-0001")
+                    try:
+                        tickets.update("T-0001", expected_revision=t["revision"],
+                                       labels=t["labels"] + ["x"])
+                        break
+                    except tickets.RevisionConflict:
+                        continue
+
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=worker, args=(20,)) for _ in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(30)
+        assert [p.exitcode for p in procs] == [0, 0, 0, 0]
+        t = tickets.get("T-0001")
+        assert len(t["labels"]) == 80 and t["revision"] == 81
+
+    def test_lock_timeout(self, tickets_dir):
+        from dockfra import tickets
+        tickets.create("Locked")
+        with tickets._ticket_locked("T-0001"):
+            with pytest.raises(TimeoutError):
+                with tickets._ticket_locked("T-0001", timeout=0.05):
+                    pass
+
+    def test_id_counter_recovers_and_skips_taken_ids(self, tickets_dir, caplog):
+        import logging
+        from dockfra import tickets
+        with caplog.at_level(logging.WARNING, logger=tickets.logger.name):
+            for title in "ABC":
+                tickets.create(title)
+        assert not caplog.records  # a fresh (empty) counter is not worth a warning
+        assert (tickets_dir / ".ticket_seq").read_text().strip() == "3"
+        (tickets_dir / ".ticket_seq").write_text("garbage")
+        with caplog.at_level(logging.WARNING, logger=tickets.logger.name):
+            assert tickets.create("D")["id"] == "T-0004"
+        assert "unreadable" in caplog.text
+        (tickets_dir / ".ticket_seq").unlink()
+        assert tickets.create("E")["id"] == "T-0005"
+        # Stale counter (a ticket written by something that bypassed it)
+        (tickets_dir / ".ticket_seq").write_text("2")
+        assert tickets.create("F")["id"] == "T-0006"
+        # Ids are never reused after deletion
+        (tickets_dir / "T-0006.json").unlink()
+        assert tickets.create("G")["id"] == "T-0007"
+
+    def test_parallel_processes_never_collide(self, tmp_path):
+        """10k creates from 8 processes: every id unique, every file intact."""
+        import subprocess
+        script = (
+            "import sys; sys.path.insert(0, {root!r})\n"
+            "from dockfra import tickets\n"
+            "for i in range({n}): tickets.create(f'w{{sys.argv[1]}}-{{i}}')\n"
+        ).format(root=os.path.join(os.path.dirname(__file__), ".."), n=1250)
+        env = {**os.environ, "TICKETS_DIR": str(tmp_path)}
+        procs = [subprocess.Popen([sys.executable, "-c", script, str(w)], env=env)
+                 for w in range(8)]
+        assert all(p.wait(timeout=120) == 0 for p in procs)
+        files = sorted(tmp_path.glob("T-*.json"))
+        assert len(files) == 10000
+        titles = {json.loads(f.read_text())["title"] for f in files}
+        assert len(titles) == 10000
+        assert (tmp_path / ".ticket_seq").read_text().strip() == "10000"
+
+    def test_index_tracks_external_file_changes(self, tickets_dir, monkeypatch):
+        """Edits by other processes (SSH containers) are picked up without a restart."""
+        import time as _time
+        from dockfra import tickets
+        monkeypatch.setattr(tickets._index, "rescan_ns", 0)
+        tickets.create("Indexed", priority="high")
+        tickets.create("Other")
+        assert [t["id"] for t in tickets.list_tickets(priority="high")] == ["T-0001"]
+        # Same-size in-place rewrite, as a container would do it
+        path = tickets_dir / "T-0001.json"
+        data = json.loads(path.read_text())
+        data["priority"] = "lowx"
+        path.write_text(json.dumps(data, indent=2))
+        assert tickets.list_tickets(priority="high") == []
+        assert [t["id"] for t in tickets.list_tickets(priority="lowx")] == ["T-0001"]
+        # Aged files are served from the index without re-parsing
+        old = _time.time() - 60
+        os.utime(path, (old, old))
+        tickets.list_tickets()
+        assert tickets._index._files["T-0001.json"][2] is True
+        (tickets_dir / "T-0002.json").unlink()
+        (tickets_dir / "T-0003.json").write_text("{ half-written")
+        assert [t["id"] for t in tickets.list_tickets()] == ["T-0001"]
+        (tickets_dir / "T-0003.json").write_text(json.dumps({"id": "T-0003", "status": "open"}))
+        assert [t["id"] for t in tickets.list_tickets(status="open")] == ["T-0001", "T-0003"]
+
+    def test_index_external_ids_and_copies(self, tickets_dir):
+        from dockfra import tickets
+        tickets.create("GH")
+        tickets.update("T-0001", github_issue_number=42, jira_key="DF-1")
+        tickets.create("Plain")
+        assert tickets.external_ids("github_issue_number") == {42}
+        assert tickets.external_ids("jira_key") == {"DF-1"}
+        listed = tickets.list_tickets()
+        listed[0]["status"] = "mutated"
+        assert tickets.list_tickets()[0]["status"] == "open"
+
     def test_list_tickets(self, tickets_dir):
         from dockfra import tickets
         tickets.create("A", priority="high")
@@ -156,6 +319,155 @@ class TestTicketsModule:
         assert s["by_priority"]["high"] == 1
         assert s["by_priority"]["low"] == 1
 
+    def test_stats_from_index_counters(self, tickets_dir, monkeypatch):
+        """stats() reads the maintained counters; no ticket file is re-read."""
+        from dockfra import tickets
+        monkeypatch.setattr(tickets._index, "rescan_ns", 0)
+        monkeypatch.setattr(tickets._index, "stats_rescan_ns", 0)
+        tickets.create("A", priority="high")
+        tickets.create("B", assigned_to="monitor")
+        tickets.close("T-0002")
+        tickets.add_comment("T-0001", "developer", "hi")
+        monkeypatch.setattr(tickets, "list_tickets", lambda **kw: pytest.fail("full rescan"))
+        s = tickets.stats()
+        assert s["total"] == 2
+        assert s["by_status"] == {"open": 1, "closed": 1}
+        assert s["by_assignee"] == {"developer": 1, "monitor": 1}
+        # External edits reconcile on the next directory sweep
+        path = tickets_dir / "T-0001.json"
+        data = json.loads(path.read_text())
+        data["status"] = "review"
+        path.write_text(json.dumps(data, indent=2))
+        (tickets_dir / "T-0002.json").unlink()
+        s = tickets.stats()
+        assert s["total"] == 1 and s["by_status"] == {"review": 1}
+        assert s["by_priority"] == {"high": 1}
+
+    def test_stats_skip_file_sweep_while_directory_unchanged(self, tickets_dir, monkeypatch):
+        from dockfra import tickets
+        monkeypatch.setattr(tickets._index, "rescan_ns", 0)
+        for i in range(5):
+            tickets.create(f"T{i}")
+        tickets.update("T-0001", status="in_progress")
+        tickets.stats()  # the creates changed the directory: one sweep
+        monkeypatch.setattr(tickets.os, "scandir", lambda d: pytest.fail("per-file sweep"))
+        for _ in range(3):
+            s = tickets.stats()
+        assert s["total"] == 5 and s["by_status"] == {"open": 4, "in_progress": 1}
+        # Own writes go through the index; the changed directory is only listed
+        tickets.update("T-0002", status="closed")
+        tickets.create("T5")
+        s = tickets.stats()
+        assert s["total"] == 6 and s["by_status"] == {"open": 4, "in_progress": 1, "closed": 1}
+        (tickets_dir / "T-0003.json").unlink()
+        assert tickets.stats()["total"] == 5
+
+    def test_bulk_update(self, tickets_dir, monkeypatch):
+        from dockfra import tickets
+        for i in range(6):
+            tickets.create(f"T{i}", priority="high" if i % 2 else "low")
+        monkeypatch.setattr(tickets, "_safe_write", lambda *a: pytest.fail("non-atomic write"))
+        done = tickets.bulk_update({"priority": "high"},
+                                   {"assigned_to": "monitor", "id": "X", "created_by": "x"})
+        assert [t["id"] for t in done] == ["T-0002", "T-0004", "T-0006"]
+        assert {t["id"] for t in tickets.list_tickets(assigned_to="monitor")} == {"T-0002", "T-0004", "T-0006"}
+        assert tickets.get("T-0002")["created_by"] == "manager"
+        done = tickets.bulk_update({"priority": "low", "ids": ["T-0001", "T-0006"]}, {"status": "review"})
+        assert [t["id"] for t in done] == ["T-0001"]
+        assert not list(tickets_dir.glob(".*.tmp"))
+        with pytest.raises(ValueError):
+            tickets.bulk_update({}, {"status": "closed"})
+        with pytest.raises(ValueError):
+            tickets.bulk_update({"status": "open"}, {"id": "T-9"})
+        with pytest.raises(ValueError):
+            tickets.bulk_update({"title": "x"}, {"status": "closed"})
+
+    def test_list_page_cursor_fields_since(self, tickets_dir):
+        from dockfra import tickets
+        for i in range(5):
+            tickets.create(f"T{i}", priority="high" if i % 2 else "low")
+        tickets.add_comment("T-0002", "dev", "first")
+        page = tickets.list_page(limit=2, fields=["title", "comment_count"])
+        assert page["tickets"] == [{"id": "T-0001", "title": "T0", "comment_count": 0},
+                                   {"id": "T-0002", "title": "T1", "comment_count": 1}]
+        assert page["next_cursor"] == "T-0002"
+        rest = tickets.list_page(limit=2, cursor="T-0002")
+        assert [t["id"] for t in rest["tickets"]] == ["T-0003", "T-0004"]
+        last = tickets.list_page(limit=2, cursor=rest["next_cursor"])
+        assert [t["id"] for t in last["tickets"]] == ["T-0005"] and last["next_cursor"] is None
+        assert [t["id"] for t in tickets.list_page(priority="high")["tickets"]] == ["T-0002", "T-0004"]
+        mark = tickets.get("T-0005")["updated_at"]
+        version = tickets.list_version()
+        tickets.update("T-0003", status="review")
+        assert tickets.list_version() != version
+        assert [t["id"] for t in tickets.list_page(updated_since=mark)["tickets"]] == ["T-0002", "T-0003", "T-0005"]
+
+    def test_list_page_updated_since_compares_instants(self, tickets_dir):
+        from datetime import datetime, timedelta, timezone
+        from dockfra import tickets
+        tickets.create("Old")
+        t = tickets.create("New")
+        at = tickets.parse_iso(t["updated_at"])
+        ids = lambda since: [x["id"] for x in tickets.list_page(updated_since=since)["tickets"]]
+        # One minute earlier, written with a +02:00 offset
+        before = (at - timedelta(minutes=1)).astimezone(timezone(timedelta(hours=2)))
+        assert "T-0002" in ids(before.isoformat(timespec="seconds"))
+        after = (at + timedelta(minutes=1)).astimezone(timezone(timedelta(hours=-5)))
+        assert ids(after.isoformat()) == []
+        # JS-style millisecond "Z" form of the same instant (truncated) still matches
+        js = at.replace(microsecond=at.microsecond // 1000 * 1000)
+        assert "T-0002" in ids(js.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z")
+        with pytest.raises(ValueError):
+            tickets.list_page(updated_since="yesterday")
+
+    def test_search_ranked_and_incremental(self, tickets_dir, monkeypatch):
+        from dockfra import tickets
+        monkeypatch.setattr(tickets._index, "rescan_ns", 0)
+        tickets.create("Nginx returns 502", description="after deploy the proxy fails")
+        tickets.create("Login page", description="nginx config mentioned once", labels=["frontend"])
+        tickets.create("Database backup")
+        assert [t["id"] for t in tickets.search("nginx")] == ["T-0001", "T-0002"]
+        assert [t["id"] for t in tickets.search("nginx deploy")] == ["T-0001"]
+        assert [t["id"] for t in tickets.search("front*")] == ["T-0002"]
+        assert tickets.search("nginx kubernetes") == []
+        assert tickets.search("NGINX")[0]["score"] > 0
+        # Index follows comments, updates and external edits
+        tickets.add_comment("T-0003", "ops", "restore tested on staging")
+        assert [t["id"] for t in tickets.search("staging")] == ["T-0003"]
+        tickets.update("T-0001", title="Proxy returns 502", description="")
+        assert [t["id"] for t in tickets.search("nginx")] == ["T-0002"]
+        path = tickets_dir / "T-0002.json"
+        data = json.loads(path.read_text())
+        data["description"] = "rewritten by a container"
+        path.write_text(json.dumps(data, indent=2))
+        assert tickets.search("nginx") == []
+        assert [t["id"] for t in tickets.search("container")] == ["T-0002"]
+
+    def test_search_index_matches_brute_force(self):
+        import random
+        from dockfra.tickets import _SearchIndex
+        rng = random.Random(7)
+        words = [f"w{i}" for i in range(40)]
+        idx, docs = _SearchIndex(), {}
+        idx._SORTED_MIN = 4  # exercise the maintained weight-ordered lists
+        for i in range(400):
+            name = f"T-{rng.randrange(150):04d}.json"
+            doc = {"title": " ".join(rng.choices(words, k=3)),
+                   "description": " ".join(rng.choices(words, k=rng.randrange(1, 20)))}
+            idx.remove(name)
+            idx.add(name, doc)
+            docs[name] = doc
+            if i % 40 == 0:
+                idx.search("w0", 5)  # materialise ordered lists mid-stream
+        for query in ("w0", "w1 w2", "w3 w4 w5", "w1*"):
+            full = idx.search(query, 10_000)
+            assert idx.search(query, 5) == full[:5]
+            expected = {n for n, d in docs.items()
+                        if all(any(t.startswith(q.rstrip("*")) if q.endswith("*") else t == q
+                                   for t in (d["title"] + " " + d["description"]).split())
+                               for q in query.split())}
+            assert {n for _, n in full} == expected
+
     def test_format_ticket(self, tickets_dir):
         from dockfra import tickets
         tickets.create("Format me", priority="critical")
@@ -240,6 +552,76 @@ class TestTicketsAPI:
         r = app_client.put("/api/tickets/T-9999", json={"status": "closed"})
         assert r.status_code == 404
 
+    def test_bulk_update_endpoint(self, app_client):
+        for i in range(4):
+            app_client.post("/api/tickets", json={"title": f"Bulk {i}"})
+        r = app_client.get("/api/events/since/0?type=ticket.updated")
+        before = json.loads(r.data)["cursor"]
+        r = app_client.post("/api/tickets/bulk", json={
+            "filter": {"ids": ["T-0002", "T-0003"]}, "changes": {"priority": "critical"}})
+        assert r.status_code == 200
+        data = json.loads(r.data)
+        assert data == {"ok": True, "updated": 2, "ids": ["T-0002", "T-0003"]}
+        assert json.loads(app_client.get("/api/tickets/T-0003").data)["priority"] == "critical"
+        evs = json.loads(app_client.get(f"/api/events/since/{before}?type=ticket.updated").data)["events"]
+        assert [e["data"]["id"] for e in evs] == ["T-0002", "T-0003"]
+        assert evs[1]["id"] == evs[0]["id"] + 1
+        r = app_client.post("/api/tickets/bulk", json={"changes": {"priority": "low"}})
+        assert r.status_code == 400
+
+    def test_search_endpoint(self, app_client):
+        app_client.post("/api/tickets", json={"title": "Flaky websocket test"})
+        app_client.post("/api/tickets", json={"title": "Docs typo"})
+        r = app_client.get("/api/tickets/search?q=websocket")
+        data = json.loads(r.data)
+        assert [t["id"] for t in data["results"]] == ["T-0001"]
+        assert set(data["results"][0]) == {"id", "title", "status", "priority", "assigned_to", "score"}
+        assert json.loads(app_client.get("/api/tickets/search?q=").data)["results"] == []
+        assert app_client.get("/api/tickets/search?q=x&limit=abc").status_code == 400
+
+    def test_list_pagination_and_etag(self, app_client):
+        for i in range(3):
+            app_client.post("/api/tickets", json={"title": f"Page {i}"})
+        app_client.post("/api/tickets/T-0001/comment", json={"author": "a", "text": "x" * 1000})
+        r = app_client.get("/api/tickets?limit=2&fields=title,status")
+        assert [t for t in json.loads(r.data)] == [
+            {"id": "T-0001", "title": "Page 0", "status": "open"},
+            {"id": "T-0002", "title": "Page 1", "status": "open"}]
+        assert r.headers["X-Next-Cursor"] == "T-0002"
+        r2 = app_client.get("/api/tickets?limit=2&fields=title,status&cursor=T-0002")
+        assert [t["id"] for t in json.loads(r2.data)] == ["T-0003"]
+        assert "X-Next-Cursor" not in r2.headers
+        etag = r.headers["ETag"]
+        assert etag != r2.headers["ETag"]
+        again = app_client.get("/api/tickets?limit=2&fields=title,status",
+                               headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.data == b""
+        for header in (f'"x", {etag[2:]}', "*"):
+            assert app_client.get("/api/tickets?limit=2&fields=title,status",
+                                  headers={"If-None-Match": header}).status_code == 304
+        # A tag merely containing the current one is not a match
+        assert app_client.get("/api/tickets?limit=2&fields=title,status",
+                              headers={"If-None-Match": etag + "-stale"}).status_code == 200
+        assert app_client.get("/api/tickets?limit=2&fields=title,status",
+                              headers={"If-None-Match": "W/" + etag}).status_code == 200
+        app_client.put("/api/tickets/T-0002", json={"status": "review"})
+        fresh = app_client.get("/api/tickets?limit=2&fields=title,status",
+                               headers={"If-None-Match": etag})
+        assert fresh.status_code == 200 and json.loads(fresh.data)[1]["status"] == "review"
+        assert app_client.get("/api/tickets?limit=x").status_code == 400
+        assert app_client.get("/api/tickets?updated_since=2020-01-01T00:00:00Z").status_code == 200
+        assert app_client.get("/api/tickets?updated_since=nope").status_code == 400
+
+    def test_update_if_match(self, app_client):
+        app_client.post("/api/tickets", json={"title": "Race"})
+        etag = app_client.get("/api/tickets/T-0001").headers["ETag"]
+        assert etag == '"1"'
+        r = app_client.put("/api/tickets/T-0001", json={"status": "review"}, headers={"If-Match": etag})
+        assert r.status_code == 200 and json.loads(r.data)["ticket"]["revision"] == 2
+        r = app_client.put("/api/tickets/T-0001", json={"status": "done"}, headers={"If-Match": etag})
+        assert r.status_code == 409 and json.loads(r.data)["revision"] == 2
+        assert app_client.put("/api/tickets/T-0001", json={"status": "done", "revision": 2}).status_code == 200
+
     def test_add_comment(self, app_client):
         app_client.post("/api/tickets", json={"title": "Comment this"})
         r = app_client.post("/api/tickets/T-0001/comment", json={
@@ -248,7 +630,9 @@ class TestTicketsAPI:
         assert r.status_code == 200
         data = json.loads(r.data)
         assert data["ok"] is True
-        assert len(data["ticket"]["comments"]) == 1
+        assert data["ticket"]["comment_count"] == 1
+        full = json.loads(app_client.get("/api/tickets/T-0001").data)
+        assert [c["text"] for c in full["comments"]] == ["Great work!"]
 
     def test_add_comment_empty_text(self, app_client):
         app_client.post("/api/tickets", json={"title": "No comment"})
@@ -336,6 +720,45 @@ class TestHistoryAPI:
         assert isinstance(data["conversation"], list)
         assert isinstance(data["logs"], list)
 
+    def test_history_since_cursor_returns_only_new(self, app_client):
+        from dockfra.core import msg, _logs
+        cursor = json.loads(app_client.get("/api/history").data)["cursor"]
+        msg("history delta one")
+        _logs.append({"text": "history delta log"})
+        data = json.loads(app_client.get(f"/api/history?since={cursor}").data)
+        assert [m["text"] for m in data["conversation"]] == ["history delta one"]
+        assert [e["text"] for e in data["logs"]] == ["history delta log"]
+        assert data["cursor"] > cursor
+        again = json.loads(app_client.get(f"/api/history?since={data['cursor']}").data)
+        assert again["conversation"] == [] and again["logs"] == []
+
+    def test_history_limited_since_does_not_skip(self, app_client):
+        from dockfra.core import msg
+        cursor = json.loads(app_client.get("/api/history").data)["cursor"]
+        for i in range(5):
+            msg(f"page {i}")
+        seen = []
+        for _ in range(5):
+            data = json.loads(app_client.get(f"/api/history?since={cursor}&limit=2&logs=0").data)
+            seen += [m["text"] for m in data["conversation"]]
+            cursor = data["cursor"]
+        assert seen == [f"page {i}" for i in range(5)]
+
+    def test_history_before_pages_older(self, app_client):
+        from dockfra.core import msg
+        for i in range(4):
+            msg(f"older {i}")
+        data = json.loads(app_client.get("/api/history?limit=2&logs=0").data)
+        assert [m["text"] for m in data["conversation"]] == ["older 2", "older 3"]
+        assert data["logs"] == [] and data["older"] == data["conversation"][0]["seq"]
+        page = json.loads(app_client.get(f"/api/history?before={data['older']}&limit=2").data)
+        assert [m["text"] for m in page["conversation"]] == ["older 0", "older 1"]
+
+    def test_history_rejects_bad_integers(self, app_client):
+        r = app_client.get("/api/history?since=abc")
+        assert r.status_code == 400
+        assert json.loads(r.data)["ok"] is False
+
 
 class TestContainersAPI:
     """Test /api/containers endpoint."""
@@ -347,6 +770,451 @@ class TestContainersAPI:
         assert isinstance(data, list)
 
 
+class TestContainerCache:
+    """dockfra.container_cache — docker ps served from memory, patched by events."""
+
+    @staticmethod
+    def _cache(snapshots, **kw):
+        import queue
+        from dockfra.container_cache import ContainerCache
+        events, calls = queue.Queue(), []
+
+        def snapshot():
+            calls.append(1)
+            return snapshots()
+
+        def stream():
+            while True:
+                ev = events.get()
+                if ev == "eof":
+                    return
+                yield ev
+
+        cache = ContainerCache(snapshot, events=stream, **kw)
+        cache._ensure_watcher()  # normally started by the first read
+        return cache, events, calls
+
+    @staticmethod
+    def _ev(action, name, **attrs):
+        return {"Type": "container", "Action": action, "Actor": {"Attributes": {"name": name, **attrs}}}
+
+    @staticmethod
+    def _settle(cache, events):
+        while not events.empty():
+            time.sleep(0.005)
+        time.sleep(0.02)
+
+    def test_reads_from_memory_and_follows_events(self):
+        state = [{"name": "web", "status": "Up 3 minutes (healthy)", "ports": "80/tcp"}]
+        cache, events, calls = self._cache(lambda: [dict(r) for r in state], resync_delay=60)
+        events.put(None)  # connected
+        self._settle(cache, events)
+        assert cache.rows() == state
+        for _ in range(50):
+            cache.rows()
+        assert len(calls) == 1
+        events.put(self._ev("health_status: unhealthy", "web"))
+        events.put(self._ev("exec_start: sh -c curl", "web"))
+        self._settle(cache, events)
+        assert cache.rows()[0]["status"] == "Up 3 minutes (unhealthy)"
+        events.put(self._ev("die", "web", exitCode="137"))
+        self._settle(cache, events)
+        assert cache.rows()[0]["status"].startswith("Exited (137)")
+        assert len(calls) == 1
+        cache.rows(refresh=True)
+        assert len(calls) == 2 and cache.rows()[0]["status"] == "Up 3 minutes (healthy)"
+        events.put(self._ev("destroy", "web"))
+        self._settle(cache, events)
+        assert cache.rows() == [] and cache.stats()["watching"] is True
+        cache.close()
+        events.put("eof")
+
+    def test_events_schedule_one_coalesced_resync(self):
+        state = []
+        cache, events, calls = self._cache(lambda: [dict(r) for r in state], resync_delay=0.05)
+        events.put(None)
+        self._settle(cache, events)
+        cache.rows()
+        state[:] = [{"name": f"svc-{i}", "status": "Up 1 second", "ports": f"{8000 + i}/tcp"}
+                    for i in range(5)]
+        for i in range(5):
+            events.put(self._ev("start", f"svc-{i}"))
+        self._settle(cache, events)
+        assert [r["status"] for r in cache.rows()] == ["Up Less than a second"] * 5
+        time.sleep(0.06)
+        assert cache.rows()[0]["ports"] == "8000/tcp"
+        cache.rows()
+        assert len(calls) == 2
+        cache.close()
+        events.put("eof")
+
+    def test_polls_with_fallback_ttl_without_events(self):
+        from dockfra.container_cache import ContainerCache
+        calls = []
+        cache = ContainerCache(lambda: calls.append(1) or [], events=None, fallback_ttl=0.05)
+        cache.rows(), cache.rows()
+        assert len(calls) == 1
+        time.sleep(0.06)
+        cache.rows()
+        assert len(calls) == 2
+
+    def test_wait_for_event(self):
+        import threading
+        cache, events, _calls = self._cache(lambda: [], resync_delay=60)
+        assert cache.wait_for_event(0.05) is False
+        threading.Timer(0.05, events.put, [self._ev("start", "web")]).start()
+        t0 = time.monotonic()
+        assert cache.wait_for_event(5) is True
+        assert time.monotonic() - t0 < 2
+        cache.close()
+        events.put("eof")
+
+    def test_api_containers_refresh(self, app_client, monkeypatch):
+        from dockfra import core
+        calls = []
+        monkeypatch.setattr(core._container_cache, "_snapshot",
+                            lambda: calls.append(1) or [{"name": "x", "status": "Up", "ports": ""}])
+        core._container_cache.invalidate()
+        assert json.loads(app_client.get("/api/containers").data)[0]["name"] == "x"
+        app_client.get("/api/containers")
+        app_client.get("/api/health")
+        assert len(calls) == 1
+        app_client.get("/api/containers?refresh=1")
+        assert len(calls) == 2
+        core._container_cache.invalidate()
+
+
+class TestLogPatterns:
+    """dockfra.log_patterns — ordered rule sets matched in one pass per line."""
+
+    def test_first_rule_wins_with_own_groups(self):
+        from dockfra.log_patterns import PatternSet
+        ps = PatternSet([(r"port is already allocated|bind for 0\.0\.0\.0:(\d+) failed", "port"),
+                         (r"Bind for .+:(\d+) failed", "bind"),
+                         (r"\d+ errors?", "count")])
+        hit = ps.search("Bind for 0.0.0.0:8080 failed: port is already allocated")
+        assert (hit.index, hit.payload, hit.match.group(1)) == (0, "port", "8080")
+        hit = ps.search("Bind for 0.0.0.0:8080 failed", skip={ps.keys[0]})
+        assert (hit.payload, hit.match.group(1)) == ("bind", "8080")
+        # no literal to prefilter on — the rule is still confirmed by regex
+        assert ps.search("3 errors").payload == "count"
+        assert ps.search("#5 exporting layers 0.3s done") is None
+
+    def test_same_result_as_per_rule_search(self):
+        import re
+        from dockfra.core import _CONFIG_ERROR_PATTERNS, _HEALTH_PATTERNS
+        from dockfra.log_patterns import PatternSet
+        patterns = [r[0] for r in _CONFIG_ERROR_PATTERNS + _HEALTH_PATTERNS]
+        ps = PatternSet([(p, None) for p in patterns])
+        lines = ["Error: ANTHROPIC_API_KEY is not set", "GITHUB_TOKEN missing",
+                 "Please set the OPENAI_API_KEY environment variable",
+                 "Error response from daemon: Pool overlaps with other one on this address space",
+                 "nginx: [emerg] host not found in upstream \"backend\"",
+                 "dial tcp 10.0.0.2:443: connect: NO ROUTE TO HOST",
+                 "exec /entrypoint.sh: no such file or directory",
+                 "#12 [app 3/9] RUN pip install -r requirements.txt", ""]
+        for line in lines:
+            want = next((i for i, p in enumerate(patterns) if re.search(p, line, re.IGNORECASE)), None)
+            hit = ps.search(line)
+            assert (hit.index if hit else None) == want, line
+
+    def test_emit_log_error_fires_each_rule_once(self, monkeypatch):
+        from dockfra import core
+        emitted = []
+        monkeypatch.setattr(core, "_sid_emit", lambda ev, data: emitted.append((ev, data)))
+        fired = set()
+        line = "Error response from daemon: Bind for 0.0.0.0:8080 failed: port is already allocated"
+        assert core._emit_log_error(line, fired) is True
+        buttons = [d for ev, d in emitted if ev == "widget"][0]["items"]
+        assert {"diag_port::8080"} <= {b["value"] for b in buttons}
+        assert len(fired) == 1
+        core._emit_log_error(line, fired)
+        core._emit_log_error(line, fired)
+        assert len(fired) == 2  # the second Bind rule, then nothing new
+        assert core._emit_log_error("#3 [app 1/4] FROM python:3.12-slim", fired) is False
+
+
+class TestHealthAnalyzer:
+    """dockfra.health_analyzer — parallel, cached log analysis and launch settling."""
+
+    def test_parallel_cached_by_identity(self):
+        import threading
+        from dockfra.health_analyzer import HealthAnalyzer
+        idents = {"a": ("id-a", "0"), "b": ("id-b", "0"), "c": ("id-c", "0")}
+        calls, barrier = [], threading.Barrier(3, timeout=5)
+
+        def analyze(name, lang):
+            calls.append(name)
+            barrier.wait()  # all three run at once or this times out
+            return (f"{name}:{lang}", [{"value": name}])
+
+        an = HealthAnalyzer(analyze, identify=lambda names: {n: idents[n] for n in names if n in idents})
+        res = an.analyze_many(["c", "a", "b"], "en")
+        assert [r[0] for r in res] == ["c:en", "a:en", "b:en"]
+        res[0][1].insert(0, {"value": "logs"})  # callers decorate — must not leak into the cache
+        barrier = threading.Barrier(1)
+        assert an.analyze_many(["c"], "en")[0][1] == [{"value": "c"}]
+        assert sorted(calls) == ["a", "b", "c"]
+        idents["a"] = ("id-a", "1")  # restarted
+        an.analyze_many(["a", "b"], "en")
+        an.analyze_many(["b"], "pl")  # other language — other text
+        assert calls[3:] == ["a", "b"]
+        assert an.stats()["hits"] == 2
+
+    def test_failed_result_not_cached(self):
+        from dockfra.health_analyzer import HealthAnalyzer
+        calls = []
+        an = HealthAnalyzer(lambda n: calls.append(n) or ("no logs", []),
+                            identify=lambda names: {n: (n, "0") for n in names},
+                            cache_if=lambda result: bool(result[1]))
+        an.analyze_many(["x"])
+        an.analyze_many(["x"])
+        assert calls == ["x", "x"]
+
+    def test_wait_until_settled(self, monkeypatch):
+        import dockfra.health_analyzer as ha
+        t = [0.0]
+        monkeypatch.setattr(ha.time, "monotonic", lambda: t[0])
+        seq = [[{"name": "app", "status": "Up 1 second (health: starting)"}]] * 3 + [
+            [{"name": "app", "status": "Up 5 seconds (healthy)"}]]
+        reads = []
+
+        def rows():
+            reads.append(t[0])
+            return seq[min(len(reads) - 1, len(seq) - 1)]
+
+        def wait(secs):
+            t[0] += secs
+            return False
+
+        out = ha.wait_until_settled(rows, wait, timeout=30, quiet=2)
+        assert "healthy" in out[0]["status"]
+        assert 2 <= t[0] < 30
+        # A crash loop flips between Restarting and Up but counts as failed throughout
+        t[0] = 0.0
+        reads.clear()
+        loop = [{"name": "w", "status": "Restarting (1) 1 second ago"}, {"name": "w", "status": "Up Less than a second"}]
+        seq[:] = [[loop[i % 2]] for i in range(100)]
+        ha.wait_until_settled(rows, wait, timeout=30, quiet=2)
+        assert t[0] < 5
+        # Never settles — gives up at the timeout
+        t[0] = 0.0
+        reads.clear()
+        seq[:] = [[{"name": "db", "status": "Up 1 second (health: starting)"}]]
+        ha.wait_until_settled(rows, wait, timeout=10, quiet=2)
+        assert t[0] == 10
+
+    def test_api_health_analyses_once_per_restart(self, app_client, monkeypatch):
+        from dockfra import core
+        calls = []
+        monkeypatch.setattr(core._container_cache, "_snapshot", lambda: [
+            {"name": "bad", "status": "Restarting (1) 2 seconds ago", "ports": ""},
+            {"name": "ok", "status": "Up 3 minutes", "ports": ""}])
+        monkeypatch.setattr(core._health_analyzer, "_identify", lambda names: {n: (n, "3") for n in names})
+        monkeypatch.setattr(core._health_analyzer, "_analyze",
+                            lambda name, lang: calls.append(name) or ("**boom**", [{"value": "x"}]))
+        core._container_cache.invalidate()
+        core._health_analyzer.invalidate()
+        for _ in range(3):
+            data = json.loads(app_client.get("/api/health").data)
+        assert data["failing"] == 1 and data["findings"][0]["finding"] == "**boom**"
+        assert calls == ["bad"]
+        core._container_cache.invalidate()
+        core._health_analyzer.invalidate()
+
+
+class _FakeLogSource:
+    """LogMux source: fetch() serves `seed`, follow() streams what tests put on a queue."""
+
+    def __init__(self, seed):
+        import queue
+        self.seed, self.fetches, self.follows = seed, [], []
+        self.q = queue.Queue()
+
+    def fetch(self, name, tail):
+        self.fetches.append(name)
+        if name == "missing":
+            raise RuntimeError("No such container: missing")
+        return self.seed[-tail:]
+
+    def follow(self, name, since):
+        self.follows.append(since)
+
+        def lines():
+            while True:
+                item = self.q.get()
+                if item is None:
+                    return
+                yield item
+        return lines(), lambda: self.q.put(None)
+
+
+class TestLogMux:
+    """dockfra.log_mux — one follower per container, reads served from ring buffers."""
+
+    @staticmethod
+    def _ts(i):
+        return f"2024-05-01T10:00:{i:02d}.500000000Z"
+
+    @staticmethod
+    def _wait(cond):
+        deadline = time.monotonic() + 5
+        while not cond():
+            assert time.monotonic() < deadline
+            time.sleep(0.005)
+
+    def test_seed_follow_and_since(self):
+        from dockfra.log_mux import LogMux
+        src = _FakeLogSource([(self._ts(i), f"line {i}") for i in range(10)])
+        mux = LogMux(src, seed_lines=5)
+        page = mux.tail("app", 3)
+        assert page == {"lines": ["line 7", "line 8", "line 9"], "first": 2, "offset": 5,
+                        "truncated": False}
+        for _ in range(20):
+            mux.tail("app")
+        assert src.fetches == ["app"] and src.follows == [self._ts(9)]
+        src.q.put((self._ts(9), "line 9"))  # overlap with the seed — dropped
+        src.q.put((self._ts(10), "line 10"))
+        self._wait(lambda: mux.tail("app", 1)["lines"] == ["line 10"])
+        page = mux.since("app", 5)
+        assert page["lines"] == ["line 10"] and page["offset"] == 6 and not page["truncated"]
+        assert mux.since("app", 6)["lines"] == []
+        mux.close()
+
+    def test_cold_tail_seeds_enough_lines(self):
+        from dockfra.log_mux import LogMux
+        src = _FakeLogSource([(self._ts(i % 60), f"line {i}") for i in range(800)])
+        mux = LogMux(src, seed_lines=500)
+        page = mux.tail("app", 700)
+        assert len(page["lines"]) == 700 and page["lines"][-1] == "line 799" and not page["truncated"]
+        # Warm buffer: asking for more than it holds says so instead of silently capping
+        page = mux.tail("app", 1000)
+        assert len(page["lines"]) == 700 and page["truncated"]
+        assert src.fetches == ["app"]
+        mux.close()
+        # A log shorter than the seed is whole — no older lines to miss
+        small = LogMux(_FakeLogSource([(self._ts(1), "only")]))
+        assert small.tail("app", 100) == {"lines": ["only"], "first": 0, "offset": 1, "truncated": False}
+        small.close()
+
+    def test_socket_subscribe_rejects_bad_since(self, monkeypatch):
+        from dockfra import core
+        from dockfra.app import app as flask_app, socketio
+        src = _FakeLogSource([])
+        core._log_mux.close()
+        monkeypatch.setattr(core._log_mux, "source", src)
+        client = socketio.test_client(flask_app)
+        client.emit("logs_subscribe", {"container": "web", "since": "x"})
+        got = [m["args"][0] for m in client.get_received() if m["name"] == "container_log"]
+        assert got == [{"container": "web", "error": "since must be an integer"}]
+        assert src.fetches == [] and core._log_mux.stats()["containers"] == {}
+        client.disconnect()
+        core._log_mux.close()
+
+    def test_ring_buffer_byte_cap(self):
+        from dockfra.log_mux import LogMux
+        src = _FakeLogSource([(self._ts(i % 60), "x" * 99) for i in range(50)])
+        mux = LogMux(src, max_bytes=1000, seed_lines=50)
+        page = mux.since("app", 0)
+        assert len(page["lines"]) == 10 and page["first"] == 40 and page["truncated"]
+        assert mux.stats()["containers"]["app"]["bytes"] <= 1000
+        mux.close()
+
+    def test_subscribers_get_live_lines(self):
+        from dockfra.log_mux import LogMux
+        src = _FakeLogSource([])
+        mux = LogMux(src, queue_size=2)
+        fast, slow = mux.subscribe("app"), mux.subscribe("app")
+        got = []
+        for i in range(3):
+            src.q.put((self._ts(i), f"l{i}"))
+            got += fast.get(timeout=5)  # keeps up, one line at a time
+        assert got == [(0, "l0"), (1, "l1"), (2, "l2")]
+        self._wait(lambda: slow.dropped == 1)
+        assert slow.get(timeout=1) == [(0, "l0"), (1, "l1")]
+        slow.close()
+        assert mux.stats()["containers"]["app"]["subscribers"] == 1
+        mux.close()
+
+    def test_follower_restart_and_errors(self):
+        from dockfra.log_mux import LogMux
+        src = _FakeLogSource([(self._ts(1), "a")])
+        mux = LogMux(src, restart_delay=0)
+        with pytest.raises(RuntimeError, match="No such container"):
+            mux.tail("missing")
+        assert "missing" not in mux.stats()["containers"]
+        mux.tail("app")
+        src.q.put(None)  # container stopped — stream ends
+        self._wait(lambda: not mux.stats()["containers"]["app"]["following"])
+        assert mux.tail("app")["lines"] == ["a"]
+        assert src.fetches.count("app") == 1 and len(src.follows) == 2  # re-followed, not re-seeded
+        mux.close()
+
+    def test_api_logs_since(self, app_client, monkeypatch):
+        from dockfra import core
+        src = _FakeLogSource([(self._ts(i), f"line {i}") for i in range(3)])
+        core._log_mux.close()
+        monkeypatch.setattr(core._log_mux, "source", src)
+        d = json.loads(app_client.get("/api/logs/web").data)
+        assert d["ok"] and d["lines"] == ["line 0", "line 1", "line 2"] and d["offset"] == 3
+        src.q.put((self._ts(5), "line 5"))
+        self._wait(lambda: json.loads(app_client.get("/api/logs/web?since=3").data)["lines"] == ["line 5"])
+        assert json.loads(app_client.get("/api/logs/web?since=4").data)["lines"] == []
+        assert app_client.get("/api/logs/web?since=x").status_code == 400
+        r = app_client.get("/api/logs/web/stream?since=1", buffered=False)
+        chunks = iter(r.response)
+        assert next(chunks).startswith(b": connected")
+        event = json.loads(next(chunks).decode()[len("data: "):])
+        assert event == {"offset": 1, "lines": ["line 1", "line 2", "line 5"]}
+        r.close()
+        d = json.loads(app_client.get("/api/logs/missing").data)
+        assert d["ok"] is False and "No such container" in d["lines"][0]
+        core._log_mux.close()
+
+
+class TestRingLog:
+    """dockfra.ring_log — bounded, sequence-indexed conversation and log history."""
+
+    def test_capacity_and_byte_cap_evict_oldest(self):
+        from dockfra.ring_log import RingLog
+        ring = RingLog(3, id_prefix="msg")
+        for i in range(5):
+            ring.append({"role": "bot", "text": f"m{i}"})
+        assert [m["text"] for m in ring] == ["m2", "m3", "m4"]
+        assert ring.stats()["evicted"] == 2
+        small = RingLog(100, max_bytes=10)
+        for i in range(5):
+            small.append({"text": "abcd"})
+        assert len(small) == 2 and small.stats()["bytes"] == 8
+
+    def test_since_before_last_share_one_clock(self):
+        from dockfra.ring_log import RingLog, SeqClock
+        clock = SeqClock()
+        conv = RingLog(100, id_prefix="msg", clock=clock)
+        logs = RingLog(100, id_prefix="log", clock=clock)
+        a = conv.append({"role": "user", "text": "a"})
+        logs.append({"text": "building"})
+        b = conv.append({"role": "bot", "text": "b", "src": "cli"})
+        assert clock.cursor() == 3
+        assert [m["text"] for m in conv.since(a["seq"])] == ["b"]
+        assert [e["text"] for e in logs.since(a["seq"])] == ["building"]
+        assert conv.since(clock.cursor()) == []
+        assert conv.last(1) == [b] and b["src"] == "cli" and b["id"] == "msg-3"
+        assert [m["text"] for m in conv.before(b["seq"])] == ["a"]
+        for i in range(10):
+            conv.append({"role": "bot", "text": str(i)})
+        assert [m["text"] for m in conv.since(b["seq"], limit=3)] == ["0", "1", "2"]
+        assert [m["text"] for m in conv.before(conv.last(1)[0]["seq"], limit=2)] == ["7", "8"]
+
+    def test_ids_stay_unique_after_clear(self):
+        from dockfra.ring_log import RingLog
+        ring = RingLog(2, id_prefix="msg")
+        ids = {ring.append({"text": "x"})["id"] for _ in range(3)}
+        ring.clear()
+        ids.add(ring.append({"text": "y"})["id"])
+        assert len(ids) == 4 and len(ring) == 1
+
+
 class TestLogsTailAPI:
     """Test /api/logs/tail endpoint."""
 
@@ -369,6 +1237,301 @@ class TestSyncAPI:
         assert data["results"] == {}
 
 
+class _StubTracker:
+    """In-process GitHub/Jira stand-in for sync tests."""
+
+    def __init__(self):
+        import threading
+        self.issues = [{"number": i, "title": f"Issue {i}", "body": "",
+                        "updated_at": "2020-01-01T00:00:00Z"} for i in range(1, 251)]
+        self.jira = [{"key": f"DF-{i}", "fields": {"summary": f"Jira {i}"}} for i in range(1, 121)]
+        self.etag = '"v1"'
+        self.delay = 0.0
+        self.throttle_next = 0
+        self.hits = []
+        self.inflight = self.max_inflight = 0
+        self.lock = threading.Lock()
+
+    def handle(self, req):
+        import time as _time
+        from urllib.parse import urlsplit, parse_qs
+        parts = urlsplit(req.path)
+        q = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        with self.lock:
+            self.hits.append(parts.path)
+            throttled = self.throttle_next > 0
+            self.throttle_next -= throttled
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        _time.sleep(self.delay)
+        with self.lock:
+            self.inflight -= 1
+        if throttled:
+            return 429, {"Retry-After": "0.05"}, {"message": "slow down"}
+        if parts.path == "/repos/o/r/issues":
+            page = int(q.get("page", 1))
+            if page == 1 and req.headers.get("If-None-Match") == self.etag:
+                return 304, {"ETag": self.etag}, None
+            items = [i for i in self.issues if i["updated_at"] >= q.get("since", "")]
+            per = int(q["per_page"])
+            headers = {"ETag": self.etag}
+            if page * per < len(items):
+                headers["Link"] = (f'<http://{req.headers["Host"]}/repos/o/r/issues?state=open'
+                                   f'&per_page={per}&page={page + 1}>; rel="next"')
+            return 200, headers, items[(page - 1) * per:page * per]
+        if parts.path == "/rest/api/3/search":
+            start, size = int(q["startAt"]), int(q["maxResults"])
+            return 200, {}, {"issues": self.jira[start:start + size], "total": len(self.jira)}
+        return 404, {}, {"message": "not found"}
+
+
+@pytest.fixture
+def stub_tracker(monkeypatch):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    import threading
+    from dockfra import tickets
+    tracker = _StubTracker()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            code, headers, body = tracker.handle(self)
+            raw = json.dumps(body).encode() if body is not None else b""
+            self.send_response(code)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    for k, v in {"GITHUB_TOKEN": "t", "GITHUB_REPO": "o/r", "GITHUB_API_URL": url}.items():
+        monkeypatch.setenv(k, v)
+    tracker.url = url
+    yield tracker
+    server.shutdown()
+    monkeypatch.undo()
+    tickets.reload_env()
+
+
+class TestTicketSyncEngine:
+    """sync_all against a local stub: pagination, ETag/since cursors, rate limits."""
+
+    def test_github_pages_then_incremental(self, tickets_dir, stub_tracker):
+        from dockfra import tickets
+        r = tickets.sync_all()["github"]
+        assert r["ok"] and r["pulled"] == 250 and r["requests"] == 3
+        # Nothing changed: one request with since=, then a bare 304
+        for _ in range(2):
+            r = tickets.sync_all()["github"]
+            assert r == {**r, "ok": True, "pulled": 0, "requests": 1}
+        assert len(tickets.list_tickets()) == 250
+        stub_tracker.issues.append({"number": 999, "title": "Fresh", "body": "",
+                                    "updated_at": "2999-01-01T00:00:00Z"})
+        stub_tracker.etag = '"v2"'
+        r = tickets.sync_all()["github"]
+        assert r["pulled"] == 1 and r["requests"] == 1
+        assert tickets.external_ids("github_issue_number") >= {1, 250, 999}
+
+    def test_rate_limit_retry_after(self, tickets_dir, stub_tracker):
+        from dockfra import tickets
+        stub_tracker.throttle_next = 2
+        r = tickets.sync_all()["github"]
+        assert r["ok"] and r["pulled"] == 250 and r["requests"] == 5
+
+    def test_direct_pull_returns_empty_on_error(self, tickets_dir, stub_tracker, monkeypatch):
+        from dockfra import tickets
+        monkeypatch.setenv("GITHUB_REPO", "o/missing")
+        r = tickets.sync_all()["github"]
+        assert r["ok"] is False and "404" in r["error"]
+        # The CLI's `tickets pull` path keeps the old contract: no traceback
+        assert tickets.pull_from_github() == []
+
+    def test_rate_limit_headers(self):
+        from dockfra import tickets
+        assert tickets._rate_limit_wait({"Retry-After": "3"}) == 3.0
+        assert tickets._rate_limit_wait({"X-RateLimit-Remaining": "0",
+                                         "X-RateLimit-Reset": "110"}, now=100) == 10.0
+        assert tickets._rate_limit_wait({"X-RateLimit-Remaining": "42"}) is None
+
+    def test_providers_run_concurrently(self, tickets_dir, stub_tracker, monkeypatch):
+        from dockfra import tickets
+        for k, v in {"JIRA_URL": stub_tracker.url, "JIRA_EMAIL": "e", "JIRA_TOKEN": "t",
+                     "JIRA_PROJECT": "DF"}.items():
+            monkeypatch.setenv(k, v)
+        stub_tracker.issues = stub_tracker.issues[:100]
+        stub_tracker.delay = 0.3
+        results = tickets.sync_all()
+        assert results["github"]["pulled"] == 100
+        assert results["jira"]["pulled"] == 120 and results["jira"]["requests"] == 2
+        # GitHub and Jira requests were in flight at the same time
+        assert stub_tracker.max_inflight >= 2
+        assert tickets._sync_cursor("jira")["synced_at"] > 0
+
+
+@pytest.fixture
+def keepalive_server():
+    """HTTP/1.1 server recording connections; /gzip, /flaky (503 twice), /close, /redirect/<n>."""
+    import gzip as _gzip
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    state = {"connections": 0, "flaky": 2}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            state["connections"] += 1
+            super().setup()
+
+        def do_GET(self):
+            code, headers, body = 200, {}, json.dumps({"path": self.path}).encode()
+            if self.path == "/gzip":
+                body = _gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+            elif self.path == "/flaky" and state["flaky"] > 0:
+                state["flaky"] -= 1
+                code = 503
+            elif self.path == "/close":
+                headers["Connection"] = "close"
+            elif self.path.startswith("/redirect/") and self.path != "/redirect/0":
+                code, headers["Location"] = 302, str(int(self.path.rsplit("/", 1)[1]) - 1)  # relative
+            elif self.path == "/login-wall":
+                code, headers["Location"] = 302, "/login"
+            elif self.path == "/login":
+                code = 404
+            self.send_response(code)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_POST = do_GET
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", state
+    server.shutdown()
+
+
+class TestHTTPClient:
+    """dockfra.http_client: keep-alive reuse, gzip, retries, metrics."""
+
+    def test_connections_are_reused(self, keepalive_server):
+        from dockfra.http_client import HTTPClient
+        url, state = keepalive_server
+        client = HTTPClient()
+        for i in range(20):
+            r = client.request("GET", f"{url}/n/{i}")
+            assert r.status == 200 and r.json() == {"path": f"/n/{i}"}
+        assert state["connections"] == 1
+        host = client.metrics()["hosts"][url.split("//")[1]]
+        assert host["requests"] == 20 and host["connections_reused"] == 19
+        # Server-side close is honoured, then a fresh connection is opened
+        client.request("GET", f"{url}/close")
+        client.request("GET", f"{url}/after")
+        assert state["connections"] == 2
+        client.close()
+
+    def test_gzip_and_retries(self, keepalive_server, monkeypatch):
+        from dockfra import http_client
+        url, state = keepalive_server
+        client = http_client.HTTPClient(backoff=0.001)
+        assert client.request("GET", f"{url}/gzip").json() == {"path": "/gzip"}
+        r = client.request("GET", f"{url}/flaky")
+        assert r.status == 200
+        assert client.metrics()["hosts"][url.split("//")[1]]["retries"] == 2
+        # Non-idempotent requests are not retried
+        state["flaky"] = 1
+        r = client.request("POST", f"{url}/flaky", body="{}")
+        assert r.status == 503
+        with pytest.raises(http_client.HTTPError) as exc:
+            r.raise_for_status()
+        assert exc.value.code == 503
+
+    def test_health_check_follows_redirects(self, keepalive_server):
+        from dockfra.deployers.health import HTTPHealthChecker
+        url, _state = keepalive_server
+        check = HTTPHealthChecker().check_http
+        r = check(f"{url}/redirect/3")
+        assert r["ok"] and r["status"] == 200 and r["details"] == f"HTTP 200 from {url}/redirect/0"
+        # A redirect to a failing page (e.g. a login wall that 404s) is not healthy
+        r = check(f"{url}/login-wall")
+        assert not r["ok"] and r["status"] == 404
+        r = check(f"{url}/redirect/9")
+        assert not r["ok"] and r["status"] == 302 and "more than 5 redirects" in r["details"]
+
+    def test_stale_pooled_connection_is_replaced(self, keepalive_server):
+        from dockfra.http_client import HTTPClient
+        url, state = keepalive_server
+        client = HTTPClient()
+        client.request("GET", f"{url}/a")
+        # Simulate the idle connection having been torn down underneath the pool
+        import socket as _socket
+        for pool in client._idle.values():
+            for conn in pool:
+                conn.sock.shutdown(_socket.SHUT_RDWR)
+        assert client.request("GET", f"{url}/b").status == 200
+        assert client.metrics()["hosts"][url.split("//")[1]]["errors"] == 0
+
+    def test_stale_connection_after_send_does_not_resend_post(self, keepalive_server):
+        import http.client
+        from collections import deque
+        from dockfra.http_client import HTTPClient
+        url, state = keepalive_server
+        client = HTTPClient()
+        host, port = url.split("//")[1].split(":")
+        sent = []
+
+        class Dropped:
+            """Pooled connection the server closes after reading the request."""
+            sock = None
+
+            def request(self, method, target, body=None, headers=None):
+                sent.append(method)
+
+            def getresponse(self):
+                raise http.client.RemoteDisconnected("closed")
+
+            def close(self):
+                pass
+        key = ("http", host, int(port))
+        client._idle[key] = deque([Dropped()])
+        with pytest.raises(http.client.RemoteDisconnected):
+            client.request("POST", f"{url}/issues", body=b"{}")
+        assert sent == ["POST"]
+        # An idempotent request is replayed on a fresh connection
+        client._idle[key] = deque([Dropped()])
+        assert client.request("GET", f"{url}/issues").status == 200
+        assert sent == ["POST", "GET"]
+
+    def test_idle_connection_closed_by_server_is_skipped(self, keepalive_server):
+        from dockfra.http_client import HTTPClient
+        url, state = keepalive_server
+        client = HTTPClient()
+        client.request("GET", f"{url}/a")
+        import socket as _socket
+        for pool in client._idle.values():
+            for conn in pool:
+                conn.sock.shutdown(_socket.SHUT_RD)  # reads now see EOF
+        assert client.request("POST", f"{url}/b", body=b"{}").status == 200
+        assert client.metrics()["hosts"][url.split("//")[1]]["connections_opened"] == 2
+
+    def test_metrics_endpoint(self, app_client):
+        r = app_client.get("/api/http/metrics")
+        assert r.status_code == 200
+        assert set(json.loads(r.data)) == {"hosts", "idle"}
+
+
 class TestProcessesAPI:
     """Test /api/processes endpoint."""
 
@@ -568,6 +1731,83 @@ class TestSSEStream:
         assert r.status_code == 200
         assert "text/event-stream" in r.content_type
 
+    def test_stream_catch_up_then_push(self, app_client):
+        from dockfra.app import _bus
+        before = _bus.query_max_id()
+        _bus.emit("test.sse_catchup", {"n": 1}, src="test")
+        r = app_client.get(f"/api/stream?since={before}")
+        chunks = (c.decode() for c in r.response if c.startswith(b"data: "))
+        first = json.loads(next(chunks).split("data: ", 1)[1])
+        assert first["event"] == "test.sse_catchup"
+        _bus.emit("test.sse_live", {"n": 2}, src="test")
+        live = json.loads(next(chunks).split("data: ", 1)[1])
+        assert live["event"] == "test.sse_live"
+        assert live["id"] > first["id"]
+        r.close()
+
+    def test_sid_emit_reaches_stream_hub(self, app_client, tmp_path):
+        from dockfra import db as _db
+        from dockfra.app import _stream_hub
+        from dockfra.core import _sid_emit
+        _db.init_db(tmp_path / "sse_hub.db")
+        _db.start_write_behind(max_delay=0.01)
+        sub = _stream_hub.connect()
+        try:
+            _sid_emit("log_line", {"id": "log-sse", "text": "pushed"})
+            events = sub.get(timeout=2)
+            assert any(e["event"] == "log_line" and e["data"]["text"] == "pushed" for e in events)
+        finally:
+            _stream_hub.disconnect(sub)
+            _db.stop_write_behind()
+
+    def test_filtered_stream_skips_other_events(self, app_client):
+        from dockfra.app import _bus
+        before = _bus.query_max_id()
+        _bus.emit("log_line", {"id": "log-x", "text": "skip"}, src="web")
+        _bus.emit("ticket.created", {"id": "T-7001", "title": "keep"}, src="api")
+        r = app_client.get(f"/api/stream?since={before}&type=ticket.*")
+        chunks = (c.decode() for c in r.response if c.startswith(b"data: "))
+        assert json.loads(next(chunks)[6:])["data"]["id"] == "T-7001"
+        _bus.emit("log_line", {"id": "log-y", "text": "skip"}, src="web")
+        _bus.emit("ticket.closed", {"id": "T-7001", "changes": {}}, src="api")
+        assert json.loads(next(chunks)[6:])["event"] == "ticket.closed"
+        r.close()
+
+    def test_hub_routes_by_filter(self):
+        from dockfra.event_bus import EventBus, EventFilter, StreamHub
+        from dockfra.event_stores import MemoryEventStore
+        bus = EventBus(MemoryEventStore())
+        hub = StreamHub(bus)
+        board = hub.connect(EventFilter(types=["ticket.*"]))
+        one = hub.connect(EventFilter(tickets=["T-1"]))
+        everything = hub.connect()
+        bus.emit("log_line", {"text": "x"})
+        bus.emit("ticket.created", {"id": "T-1"})
+        bus.emit("ticket.created", {"id": "T-2"})
+        assert [e["data"].get("id") for e in board.get(0)] == ["T-1", "T-2"]
+        assert [e["event"] for e in one.get(0)] == ["ticket.created"]
+        assert len(everything.get(0)) == 3
+        hub.disconnect(board)
+        bus.emit("ticket.closed", {"id": "T-1"})
+        assert board.get(0) == [] and len(one.get(0)) == 1
+
+    def test_slow_consumer_drops_log_lines_first(self):
+        from dockfra.event_bus import EventBus, StreamHub
+        bus = EventBus()
+        hub = StreamHub(bus, maxsize=3)
+        sub = hub.connect()
+        from dockfra.event_bus import Event
+        for i in range(1, 4):
+            bus.publish(Event(event="log_line", data={"i": i}, id=i))
+        bus.publish(Event(event="message", data={}, id=4))
+        bus.publish(Event(event="log_line", data={}, id=5))
+        events = sub.get(timeout=0)
+        assert [e["id"] for e in events] == [2, 3, 4]
+        assert sub.take_dropped() == 2
+        for i in range(6, 10):
+            bus.publish(Event(event="message", data={}, id=i))
+        assert sub.take_lagged() is True
+
 
 class TestDeveloperHealthAPI:
     """Test /api/developer-health endpoint."""
@@ -675,14 +1915,123 @@ class TestDBModule:
     def setup_method(self):
         import tempfile, pathlib
         from dockfra import db
+        self._prev_db = db._DB_PATH
         self._db_path = pathlib.Path(tempfile.mktemp(suffix='.db'))
         db.init_db(self._db_path)
 
     def teardown_method(self):
         from dockfra import db
+        db.close_db()
         db._DB_PATH = None
         if self._db_path.exists():
             self._db_path.unlink()
+        if self._prev_db:
+            db.init_db(self._prev_db)
+
+    def test_schema_is_current_version(self):
+        from dockfra import db
+        assert db.schema_version() == db.SCHEMA_VERSION
+        idx = {r[0] for r in db._writer_conn().execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='events'")}
+        assert {"idx_events_event_id", "idx_events_src_id"} <= idx
+        assert not idx & {"idx_events_id", "idx_events_event", "idx_events_src"}
+
+    def test_migrates_unversioned_database(self):
+        import sqlite3
+        from dockfra import db
+        db.close_db()
+        self._db_path.unlink()
+        # Schema as created before migrations existed (user_version 0)
+        conn = sqlite3.connect(str(self._db_path))
+        conn.executescript("""
+            CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL,
+                src TEXT NOT NULL DEFAULT 'system', event TEXT NOT NULL, data TEXT NOT NULL DEFAULT '{}');
+            CREATE INDEX idx_events_id ON events(id);
+            CREATE INDEX idx_events_event ON events(event);
+            CREATE INDEX idx_events_src ON events(src);
+            INSERT INTO events (ts, src, event, data) VALUES (1.0, 'cli', 'legacy', '{"a": 1}');
+        """)
+        conn.close()
+        db.init_db(self._db_path)
+        assert db.schema_version() == db.SCHEMA_VERSION
+        assert db.get_events(0, event_type="legacy")[0]["data"] == {"a": 1}
+        assert db.load_snapshot("none") is None
+
+    def test_rejects_newer_schema(self):
+        from dockfra import db
+        with db._db_lock:
+            db._writer_conn().execute(f"PRAGMA user_version={db.SCHEMA_VERSION + 1}")
+        with pytest.raises(RuntimeError):
+            db.init_db(self._db_path)
+
+    def test_typed_payloads_round_trip(self):
+        from dockfra import db
+        payloads = [
+            ("log_line", {"id": "log-1", "text": "héllo"}),
+            ("log_line", {"text": ""}),
+            ("message", {"id": "msg-0", "role": "bot", "text": "**hi**"}),
+            ("message", {"role": "user", "text": "x"}),
+            ("widget", {"type": "progress", "label": "Build", "done": True, "error": False}),
+            # Shapes that do not match exactly stay JSON
+            ("log_line", {"id": "log-2", "text": "x", "level": "warn"}),
+            ("message", {"role": "bot", "text": None}),
+            ("widget", {"type": "progress", "label": "x", "done": 1, "error": False}),
+            ("widget", {"type": "buttons", "label": "", "items": []}),
+        ]
+        ids = db.append_batch([(e, d, "test") for e, d in payloads])
+        events = db.get_events(since_id=ids[0] - 1, limit=20)
+        assert [(e["event"], e["data"]) for e in events] == payloads
+        stored = dict(db._reader_conn().execute("SELECT id, data FROM events").fetchall())
+        assert [stored[i] == "" for i in ids] == [True] * 5 + [False] * 4
+        assert db.get_latest_by_type("message")[0]["data"] == {"role": "bot", "text": None}
+
+    def test_migration_converts_json_payloads(self):
+        import sqlite3
+        from dockfra import db
+        db.close_db()
+        conn = sqlite3.connect(str(self._db_path))
+        conn.execute("PRAGMA user_version=4")
+        for col in ("flags", "text", "role", "ref"):
+            conn.execute(f"ALTER TABLE events DROP COLUMN {col}")
+        rows = [("log_line", {"id": "log-1", "text": "a"}),
+                ("log_line", {"text": "b", "extra": 1}),
+                ("message", {"id": "m", "role": "bot", "text": "c"}),
+                ("widget", {"type": "progress", "label": "L", "done": False, "error": True})]
+        conn.executemany("INSERT INTO events (ts, src, event, data) VALUES (1.0, 'cli', ?, ?)",
+                         [(e, json.dumps(d)) for e, d in rows])
+        conn.commit()
+        conn.close()
+        db.init_db(self._db_path)
+        assert [(e["event"], e["data"]) for e in db.get_events(0)] == rows
+        typed = [r[0] == "" for r in db._reader_conn().execute("SELECT data FROM events ORDER BY id")]
+        assert typed == [True, False, True, True]
+
+    def test_hot_queries_use_indexes(self):
+        """EXPLAIN QUERY PLAN on a million-row log: no full scans or sort steps."""
+        from dockfra import db
+        with db._db_lock:
+            conn = db._writer_conn()
+            conn.execute("""
+                WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 1000000)
+                INSERT INTO events (ts, src, event, data)
+                SELECT i, CASE i % 7 WHEN 0 THEN 'cli' ELSE 'web' END,
+                       CASE WHEN i % 50 = 0 THEN 'ticket.created' ELSE 'log_line' END, '{}'
+                FROM n""")
+            conn.execute("ANALYZE")
+            conn.commit()
+        queries = {
+            "since": db._events_query(0, 500, [], []),
+            "by_type": db._events_query(0, 500, ["ticket.created"], []),
+            "by_src": db._events_query(0, 500, [], ["cli"]),
+            "by_type_src": db._events_query(0, 500, ["ticket.created"], ["cli"]),
+            "by_glob": db._events_query(0, 500, ["ticket.*"], []),
+            "latest": (db._SQL_LATEST, ("ticket.created", 1)),
+            "count_type": ("SELECT COUNT(*) FROM events WHERE 1=1 AND event = ?", ("ticket.created",)),
+        }
+        for name, (sql, params) in queries.items():
+            plan = [r[3] for r in db._reader_conn().execute("EXPLAIN QUERY PLAN " + sql, params)]
+            assert not any(p.startswith("SCAN events") for p in plan), (name, plan)
+            assert not any("TEMP B-TREE" in p for p in plan), (name, plan)
 
     def test_append_and_get_events(self):
         from dockfra import db
@@ -750,6 +2099,195 @@ class TestDBModule:
         assert latest[0]["data"]["seq"] == 3  # most recent first
         assert latest[1]["data"]["seq"] == 2
 
+    def test_wal_mode_enabled(self):
+        from dockfra import db
+        mode = db._reader_conn().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode.lower() == "wal"
+
+    def test_reader_connection_reused_per_thread(self):
+        import threading
+        from dockfra import db
+        assert db._reader_conn() is db._reader_conn()
+        other = []
+        t = threading.Thread(target=lambda: other.append(db._reader_conn()))
+        t.start(); t.join()
+        assert other[0] is not db._reader_conn()
+
+    def test_reader_connections_closed_when_threads_exit(self):
+        import gc
+        import threading
+        from dockfra import db
+        before = len(db._readers)
+        for _ in range(50):
+            t = threading.Thread(target=lambda: db.count_events())
+            t.start(); t.join()
+        gc.collect()
+        assert len(db._readers) <= before + 1
+
+    def test_reinit_switches_database(self, tmp_path):
+        from dockfra import db
+        db.append_event("old_db", {}, src="test")
+        db.init_db(tmp_path / "other.db")
+        assert db.count_events(event_type="old_db") == 0
+        db.append_event("new_db", {}, src="test")
+        assert db.count_events(event_type="new_db") == 1
+
+    def test_set_synchronous_validates_level(self):
+        from dockfra import db
+        with pytest.raises(ValueError):
+            db.set_synchronous("SOMETIMES")
+        db.set_synchronous("full")
+        assert db._writer_conn().execute("PRAGMA synchronous").fetchone()[0] == 2
+        db.set_synchronous("NORMAL")
+
+    def test_write_behind_read_your_writes(self):
+        from dockfra import db
+        db.start_write_behind(max_batch=1000, max_delay=10)
+        try:
+            before = db.get_max_id()
+            db.enqueue_event("wb_ryw", {"n": 1}, src="test")
+            events = db.get_events(since_id=before, limit=10, event_type="wb_ryw")
+            assert [e["data"]["n"] for e in events] == [1]
+        finally:
+            db.stop_write_behind()
+
+    def test_write_behind_commits_single_event_within_delay(self):
+        import time as _time
+        from dockfra import db
+        seen = []
+        db.add_commit_listener(seen.extend)
+        db.start_write_behind(max_batch=256, max_delay=0.01)
+        try:
+            db.enqueue_event("wb_single", {}, src="test")
+            deadline = _time.time() + 2
+            while not seen and _time.time() < deadline:
+                _time.sleep(0.01)
+            assert [r["event"] for r in seen] == ["wb_single"]
+            assert seen[0]["id"] > 0
+        finally:
+            db.remove_commit_listener(seen.extend)
+            db.stop_write_behind()
+
+    def test_write_behind_group_commits_in_order(self):
+        import threading
+        from dockfra import db
+        db.start_write_behind(max_batch=50, max_delay=0.01)
+        try:
+            t = threading.Thread(target=lambda: [db.enqueue_event("wb_order", {"n": i}, "test")
+                                                 for i in range(200)])
+            t.start(); t.join()
+            db.flush()
+            events = db.get_events(limit=1000, event_type="wb_order")
+            assert [e["data"]["n"] for e in events] == list(range(200))
+            assert db.write_behind_stats()["largest_batch"] <= 50
+        finally:
+            db.stop_write_behind()
+
+    def test_write_behind_listener_may_enqueue_and_read(self):
+        import threading
+        from dockfra import db
+        seen = []
+
+        def listener(rows):
+            seen.extend(r["event"] for r in rows)
+            if rows[0]["event"] == "wb_first":
+                db.enqueue_event("wb_follow", {}, src="test")
+                seen.append(len(db.get_events(limit=10, event_type="wb_*")))
+
+        db.add_commit_listener(listener)
+        db.start_write_behind(max_batch=1, max_delay=60, max_pending=1)
+        try:
+            data = {"n": 1}
+            db.enqueue_event("wb_first", data, src="test")
+            data["n"] = 2  # queued events are copies
+            t = threading.Thread(target=db.flush, daemon=True)
+            t.start(); t.join(timeout=5)
+            assert not t.is_alive(), "flush deadlocked on a reading listener"
+            assert seen == ["wb_first", 1, "wb_follow"]
+            assert [e["data"] for e in db.get_events(limit=10, event_type="wb_first")] == [{"n": 1}]
+        finally:
+            db.remove_commit_listener(listener)
+            db.stop_write_behind()
+
+    def test_write_behind_backpressure_and_shutdown_flush(self):
+        from dockfra import db
+        db.start_write_behind(max_batch=4, max_delay=60, max_pending=8)
+        stats = db.write_behind_stats()
+        for i in range(40):
+            db._wb.put(("wb_bp", {"n": i}, "test", 0.0))
+        assert db.write_behind_stats()["pending"] <= 8
+        assert db._wb.stats["backpressure"] > 0
+        db.close_db()
+        db.init_db(self._db_path)
+        assert db.count_events(event_type="wb_bp") == 40
+        assert stats["max_batch"] == 4
+
+
+class TestEventRetention:
+    """Test retention, compaction and archive reads in dockfra.db."""
+
+    @pytest.fixture(autouse=True)
+    def _db(self, tmp_path):
+        from dockfra import db
+        prev = db._DB_PATH
+        db.init_db(tmp_path / "retention.db")
+        policies = db.get_retention()
+        yield db
+        db.set_retention(policies)
+        db.close_db()
+        db._DB_PATH = None
+        if prev:
+            db.init_db(prev)
+
+    def _age(self, db, ids, seconds):
+        with db._db_lock:
+            conn = db._writer_conn()
+            conn.executemany("UPDATE events SET ts = ts - ? WHERE id = ?", [(seconds, i) for i in ids])
+            conn.commit()
+
+    def test_parse_duration(self, _db):
+        assert _db.parse_duration("24h") == 86400
+        assert _db.parse_duration("7d") == 7 * 86400
+        assert _db.parse_duration("90") == 90
+        assert _db.parse_duration("forever") is None
+
+    def test_compact_archives_expired_and_keeps_forever_types(self, _db):
+        _db.set_retention({"log_line": "24h", "ticket.*": None, "*": "30d"})
+        old_log = _db.append_event("log_line", {"text": "old"}, src="web")
+        ticket = _db.append_event("ticket.created", {"id": "T-0001"}, src="api")
+        new_log = _db.append_event("log_line", {"text": "new"}, src="web")
+        self._age(_db, [old_log, ticket], 40 * 86400)
+        result = _db.compact()
+        assert result["archived"] == 1
+        assert result["by_pattern"]["log_line"] == 1
+        assert _db.count_events(event_type="log_line") == 1
+        assert _db.count_events(event_type="ticket.created") == 1
+        assert list((_db._DB_PATH.parent / "retention.db.archive").glob("events-*.jsonl.gz"))
+        # Archived rows remain readable through get_events, in id order
+        events = _db.get_events(since_id=0, limit=10)
+        assert [e["id"] for e in events] == [old_log, ticket, new_log]
+        assert events[0]["data"]["text"] == "old"
+        assert _db.get_events(since_id=0, limit=1)[0]["id"] == old_log
+        assert [e["id"] for e in _db.get_events(since_id=old_log, limit=10)] == [ticket, new_log]
+
+    def test_archive_read_respects_filters(self, _db):
+        _db.set_retention({"log_line": "1h"})
+        a = _db.append_event("log_line", {"n": 1}, src="web")
+        b = _db.append_event("log_line", {"n": 2}, src="cli")
+        self._age(_db, [a, b], 7200)
+        _db.compact()
+        assert [e["id"] for e in _db.get_events(since_id=0, src="cli")] == [b]
+        assert _db.get_events(since_id=0, event_type="message") == []
+
+    def test_max_id_survives_full_archive(self, _db):
+        _db.set_retention({"*": "1s"})
+        last = _db.append_event("log_line", {}, src="web")
+        self._age(_db, [last], 10)
+        _db.compact()
+        assert _db.count_events() == 0
+        assert _db.get_max_id() == last
+        assert _db.append_event("log_line", {}, src="web") > last
+
 
 class TestEventBus:
     """Test dockfra.event_bus module (requires app_client for db init)."""
@@ -808,6 +2346,329 @@ class TestEventBus:
         assert isinstance(EventType.PIPELINE_STARTED.value, str)
 
 
+class TestEventBusDispatch:
+    """Test thread-pool / asyncio handler dispatch and per-handler metrics."""
+
+    def test_thread_handler_does_not_block_emit(self):
+        import time as _time
+        from dockfra.event_bus import EventBus
+        bus = EventBus()
+        seen = []
+        bus.subscribe("slow", lambda ev: (_time.sleep(0.2), seen.append(ev.data["n"])), mode="thread")
+        t0 = _time.perf_counter()
+        bus.emit("slow", {"n": 1})
+        assert _time.perf_counter() - t0 < 0.1
+        assert bus.join(timeout=2) and seen == [1]
+        m = bus.metrics()[0]
+        assert (m["mode"], m["processed"], m["depth"]) == ("thread", 1, 0)
+        assert m["latency_max_ms"] >= 150
+        bus.close()
+
+    def test_per_type_ordering_across_workers(self):
+        import random, time as _time
+        from dockfra.event_bus import EventBus
+        bus = EventBus()
+        seen: dict = {}
+
+        def handler(ev):
+            _time.sleep(random.random() / 2000)
+            seen.setdefault(ev.event, []).append(ev.data["n"])
+        bus.subscribe_all(handler, mode="thread", workers=4)
+        for n in range(300):
+            bus.emit(f"t{n % 5}", {"n": n})
+        assert bus.join(timeout=5)
+        assert {k: v == sorted(v) for k, v in seen.items()} == {f"t{i}": True for i in range(5)}
+        assert sum(len(v) for v in seen.values()) == 300
+        bus.close()
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        import threading as _threading
+        from dockfra.event_bus import EventBus
+        bus = EventBus()
+        gate = _threading.Event()
+        sub = bus.subscribe_all(lambda ev: gate.wait(2), mode="thread", maxsize=3)
+        for n in range(10):
+            bus.emit("flood", {"n": n})
+        gate.set()
+        assert bus.join(timeout=2)
+        m = sub.metrics()
+        assert m["dropped"] >= 6 and m["processed"] + m["dropped"] == 10
+        assert m["max_depth"] <= 3
+        bus.unsubscribe(sub)
+        assert bus.metrics() == []
+
+    def test_drop_callback_and_type_filter(self):
+        import threading as _threading
+        from dockfra.event_bus import EventBus
+        bus = EventBus()
+        gate, lost, seen = _threading.Event(), [], []
+        sub = bus.subscribe_all(lambda ev: (gate.wait(2), seen.append(ev.event)), mode="thread",
+                                maxsize=1, types=("ticket.*",), on_drop=lost.append)
+        bus.emit("log_line", {"n": 0})
+        for n in range(3):
+            bus.emit("ticket.updated", {"n": n})
+        gate.set()
+        assert bus.join(timeout=2)
+        assert "log_line" not in seen and len(seen) + len(lost) == 3
+        assert lost and lost[0].event == "ticket.updated" and sub.dropped == len(lost)
+        bus.close()
+
+    def test_asyncio_handler_and_errors(self):
+        import asyncio
+        from dockfra.event_bus import EventBus
+        bus = EventBus()
+        seen = []
+
+        async def handler(ev):
+            await asyncio.sleep(0)
+            if ev.data.get("boom"):
+                raise RuntimeError("boom")
+            seen.append(ev.data["n"])
+        sub = bus.subscribe("async.ev", handler, mode="asyncio")
+        for n in range(5):
+            bus.emit("async.ev", {"n": n})
+        bus.emit("async.ev", {"n": 99, "boom": True})
+        assert bus.join(timeout=2)
+        assert seen == [0, 1, 2, 3, 4]
+        assert (sub.metrics()["processed"], sub.metrics()["errors"]) == (5, 1)
+        bus.close()
+        with pytest.raises(TypeError):
+            bus.subscribe("x", lambda ev: None, mode="asyncio")
+        with pytest.raises(ValueError):
+            bus.subscribe("x", lambda ev: None, mode="fibers")
+
+    def test_enum_and_str_subscriptions_match(self):
+        from dockfra.event_bus import EventBus, EventType
+        bus = EventBus()
+        seen = []
+        bus.subscribe(EventType.TICKET_CREATED, lambda ev: seen.append(ev))
+        bus.emit("ticket.created", {})
+        bus.emit(EventType.TICKET_CREATED, {})
+        assert len(seen) == 2
+
+    def test_bus_metrics_api(self, app_client):
+        r = app_client.get("/api/events/bus")
+        assert r.status_code == 200
+        names = [h["name"] for h in json.loads(r.data)["handlers"]]
+        assert "projections" in names
+
+
+class TestEventStoreConformance:
+    """Every EventStore backend must satisfy the same append/read/recovery contract."""
+
+    @pytest.fixture(params=["sqlite", "memory", "segment"])
+    def store_factory(self, request, tmp_path):
+        from dockfra import db
+        from dockfra.event_bus import SQLiteEventStore
+        from dockfra.event_stores import MemoryEventStore, SegmentLogStore
+        prev = db._DB_PATH
+        opened = []
+
+        def factory():
+            if request.param == "sqlite":
+                db.init_db(tmp_path / "conf.db")
+                store = SQLiteEventStore(db)
+            elif request.param == "memory":
+                store = opened[-1] if opened else MemoryEventStore()
+            else:
+                store = SegmentLogStore(tmp_path / "seg", segment_bytes=4096)
+            opened.append(store)
+            return store
+        factory.kind = request.param
+        yield factory
+        for store in opened:
+            if hasattr(store, "close"):
+                store.close()
+        db.close_db()
+        db._DB_PATH = None
+        if prev:
+            db.init_db(prev)
+
+    def test_empty_store(self, store_factory):
+        store = store_factory()
+        assert store.get_max_id() == 0
+        assert store.get_since(0, 10) == []
+
+    def test_append_and_range_reads(self, store_factory):
+        from dockfra.event_bus import EventType
+        store = store_factory()
+        ids = [store.append("log_line", {"n": i, "text": f"żółw {i}"}, "test") for i in range(300)]
+        ids.append(store.append(EventType.TICKET_CREATED, {"id": "T-1"}, "api"))
+        assert ids == list(range(ids[0], ids[0] + 301))
+        assert store.get_max_id() == ids[-1]
+        page = store.get_since(ids[99], 50)
+        assert [e["id"] for e in page] == ids[100:150]
+        assert page[0]["data"] == {"n": 100, "text": "żółw 100"}
+        assert (page[0]["src"], page[0]["event"]) == ("test", "log_line")
+        assert isinstance(page[0]["ts"], float)
+        last = store.get_since(ids[-2], 10)
+        assert [(e["event"], e["data"]) for e in last] == [("ticket.created", {"id": "T-1"})]
+        assert store.get_since(ids[-1], 10) == []
+
+    def test_bus_over_store(self, store_factory):
+        from dockfra.event_bus import EventBus
+        bus = EventBus(store_factory())
+        for i in range(7):
+            bus.emit("replayed", {"n": i})
+        seen = []
+        assert bus.replay(0, lambda ev: seen.append(ev.data["n"]), page_size=3) == 7
+        assert seen == list(range(7))
+
+    def test_reopen_recovers(self, store_factory):
+        store = store_factory()
+        for i in range(120):
+            store.append("log_line", {"n": i}, "test")
+        if hasattr(store, "close") and store_factory.kind != "memory":
+            store.close()
+        store = store_factory()
+        assert store.get_max_id() == 120
+        assert store.append("after", {}, "test") == 121
+        assert [e["data"].get("n") for e in store.get_since(118, 5)] == [118, 119, None]
+
+    def test_memory_ring_evicts_oldest(self):
+        from dockfra.event_stores import MemoryEventStore
+        store = MemoryEventStore(capacity=10)
+        for i in range(25):
+            store.append("e", {"n": i})
+        assert store.get_max_id() == 25
+        assert [e["id"] for e in store.get_since(0, 100)] == list(range(16, 26))
+        assert [e["id"] for e in store.get_since(20, 2)] == [21, 22]
+
+    def test_segment_log_truncates_torn_tail(self, tmp_path):
+        from dockfra.event_stores import SegmentLogStore
+        store = SegmentLogStore(tmp_path, segment_bytes=1 << 16)
+        for i in range(10):
+            store.append("e", {"n": i})
+        store.flush()
+        # Simulate a crash mid-write: corrupt the last record's body, no close()
+        off = store._segments[-1].offsets[-1]
+        with open(store._segments[-1].path, "r+b") as f:
+            f.seek(off + 30)
+            f.write(b"\xff\xff")
+        recovered = SegmentLogStore(tmp_path, segment_bytes=1 << 16)
+        assert recovered.get_max_id() == 9
+        assert recovered.append("e", {"n": "new"}) == 10
+        assert recovered.get_since(9, 5)[0]["data"] == {"n": "new"}
+        recovered.close()
+
+    def test_segment_log_rolls_and_handles_oversized_records(self, tmp_path):
+        from dockfra.event_stores import SegmentLogStore
+        store = SegmentLogStore(tmp_path, segment_bytes=1024)
+        for i in range(100):
+            store.append("e", {"n": i})
+        store.append("big", {"blob": "x" * 5000})
+        store.append("e", {"n": 100})
+        assert len(list(tmp_path.glob("*.log"))) > 3
+        store.close()
+        store = SegmentLogStore(tmp_path, segment_bytes=1024)
+        events = store.get_since(0, 1000)
+        assert [e["id"] for e in events] == list(range(1, 103))
+        assert events[100]["data"]["blob"] == "x" * 5000
+        store.close()
+
+
+class TestDBCompactAPI:
+    """Test /api/db/compact endpoint."""
+
+    def test_compact_returns_summary(self, app_client):
+        r = app_client.post("/api/db/compact", data=json.dumps({}), content_type="application/json")
+        assert r.status_code == 200
+        data = json.loads(r.data)
+        assert data["ok"] is True
+        assert "archived" in data and "retention" in data
+
+
+class TestProjections:
+    """Test dockfra.projections snapshots, incremental catch-up and live apply."""
+
+    @pytest.fixture()
+    def bus(self, tmp_path):
+        from dockfra import db
+        from dockfra.event_bus import EventBus, SQLiteEventStore
+        prev = db._DB_PATH
+        db.init_db(tmp_path / "proj.db")
+        yield EventBus(SQLiteEventStore(db))
+        db.close_db()
+        db._DB_PATH = None
+        if prev:
+            db.init_db(prev)
+
+    def test_replay_streams_past_page_limit(self, bus):
+        for i in range(25):
+            bus.emit("test.replay", {"n": i}, src="test")
+        seen = []
+        assert bus.replay(0, handler=lambda ev: seen.append(ev.data["n"]), page_size=10) == 25
+        assert seen == list(range(25))
+
+    def test_ticket_board_catch_up_and_snapshot_resume(self, bus):
+        from dockfra import db
+        from dockfra.projections import ProjectionManager, TicketBoardProjection
+        bus.emit("ticket.created", {"id": "T-0001", "title": "A", "priority": "high"}, src="api")
+        bus.emit("log_line", {"text": "noise"}, src="web")
+        bus.emit("ticket.updated", {"id": "T-0001", "changes": {"status": "in_progress"}}, src="api")
+        mgr = ProjectionManager(bus, db, page_size=2)
+        mgr.register(TicketBoardProjection())
+        stats = mgr.catch_up("ticket_board")
+        assert stats["scanned"] == 3 and stats["applied"] == 2
+        assert mgr.state("ticket_board")["T-0001"]["status"] == "in_progress"
+        # Live events apply immediately after catch-up
+        bus.emit("ticket.commented", {"id": "T-0001", "author": "x", "text": "y"}, src="api")
+        assert mgr.state("ticket_board")["T-0001"]["comments"] == 1
+        mgr.save_snapshots()
+        # A fresh manager resumes from the snapshot and only scans newer events
+        bus.emit("ticket.closed", {"id": "T-0001", "changes": {"status": "done"}}, src="api")
+        mgr2 = ProjectionManager(bus, db)
+        mgr2.register(TicketBoardProjection())
+        assert mgr2.catch_up("ticket_board")["scanned"] == 1
+        t = mgr2.state("ticket_board")["T-0001"]
+        assert (t["status"], t["comments"], t["title"]) == ("done", 1, "A")
+
+    def test_out_of_order_live_events_are_not_lost(self, bus):
+        from dockfra import db
+        from dockfra.event_bus import Event
+        from dockfra.projections import ProjectionManager, TicketBoardProjection
+        mgr = ProjectionManager(bus, db)
+        mgr.register(TicketBoardProjection())
+        mgr.catch_up("ticket_board")
+        assert mgr.subscription.overflow == "block"
+        rows = [("ticket.created", {"id": "T-0009", "title": "Gap"}, "api"),
+                ("log_line", {"text": "noise"}, "web"),
+                ("ticket.commented", {"id": "T-0009", "author": "a", "text": "b"}, "api")]
+        ids = db.append_batch(rows)
+        # Published newest first, as two concurrent publishers can do
+        for eid, (etype, data, src) in reversed(list(zip(ids, rows))):
+            bus.publish(Event(event=etype, data=data, src=src, id=eid))
+        t = mgr.state("ticket_board")["T-0009"]
+        assert (t["title"], t["comments"]) == ("Gap", 1)
+        assert mgr.status()["ticket_board"]["last_id"] == ids[-1]
+        assert mgr.subscription.metrics()["processed"] == 2  # log_line never delivered
+
+    def test_version_bump_discards_snapshot(self, bus):
+        from dockfra import db
+        from dockfra.projections import ProjectionManager, PipelineScoresProjection
+        bus.emit("pipeline.started", {"ticket_id": "T-0002"}, src="pipeline")
+        bus.emit("pipeline.completed", {"ticket_id": "T-0002", "score": 0.8}, src="pipeline")
+        mgr = ProjectionManager(bus, db)
+        mgr.register(PipelineScoresProjection())
+        mgr.catch_up("pipeline_scores")
+
+        class V2(PipelineScoresProjection):
+            version = 2
+        mgr2 = ProjectionManager(bus, db)
+        mgr2.register(V2())
+        assert mgr2.catch_up("pipeline_scores")["scanned"] == 2
+        assert mgr2.state("pipeline_scores")["T-0002"] == {
+            "status": "completed", "runs": 1, "steps": 0, "last_score": 0.8, "best_score": 0.8}
+
+    def test_projections_api(self, app_client):
+        r = app_client.get("/api/projections")
+        assert r.status_code == 200
+        assert "ticket_board" in json.loads(r.data)
+        assert app_client.get("/api/projections/nope").status_code == 404
+        r = app_client.post("/api/projections/container_state/rebuild")
+        assert json.loads(r.data)["ok"] is True
+
+
 class TestEventsAPIFilters:
     """Test CQRS query filters on /api/events/since endpoint."""
 
@@ -827,6 +2688,41 @@ class TestEventsAPIFilters:
         for ev in data["events"]:
             assert ev["src"] == "cli"
 
+    def test_events_filter_globs_ticket_and_cursor(self, app_client):
+        from dockfra.app import _bus
+        before = _bus.query_max_id()
+        _bus.emit("ticket.created", {"id": "T-9001", "title": "a"}, src="api")
+        for i in range(30):
+            _bus.emit("log_line", {"id": f"log-f{i}", "text": "noise"}, src="web")
+        _bus.emit("ticket.updated", {"id": "T-9002", "changes": {}}, src="api")
+        _bus.emit("ticket.commented", {"id": "T-9001", "text": "x"}, src="api")
+        r = app_client.get(f"/api/events/since/{before}?type=ticket.*&limit=2")
+        data = json.loads(r.data)
+        assert [e["event"] for e in data["events"]] == ["ticket.created", "ticket.updated"]
+        assert data["cursor"] == data["events"][-1]["id"]
+        r = app_client.get(f"/api/events/since/{data['cursor']}?type=ticket.*&limit=2")
+        data = json.loads(r.data)
+        assert [e["event"] for e in data["events"]] == ["ticket.commented"]
+        assert data["cursor"] == data["max_id"]
+        r = app_client.get(f"/api/events/since/{before}?ticket=T-9001&type=ticket.*,log_line")
+        assert [e["event"] for e in json.loads(r.data)["events"]] == ["ticket.created", "ticket.commented"]
+        r = app_client.get(f"/api/events/since/{before}?type=message&type=log_line&src=api")
+        assert json.loads(r.data)["events"] == []
+
+    def test_event_filter_matching(self):
+        from werkzeug.datastructures import MultiDict
+        from dockfra.event_bus import EventFilter
+        flt = EventFilter.from_args(MultiDict([("type", "ticket.*, pipeline.started"),
+                                               ("type", "container.*"), ("container", "web")]))
+        assert flt.types == ("ticket.*", "pipeline.started", "container.*")
+        ev = lambda event, data, src="api": {"event": event, "data": data, "src": src}
+        assert flt.matches(ev("container.started", {"name": "web"}))
+        assert flt.matches(ev("ticket.updated", {"id": "T-1", "container": "web"}))
+        assert not flt.matches(ev("ticket.updated", {"id": "T-1"}))
+        assert not flt.matches(ev("log_line", {"container": "web"}))
+        assert not EventFilter() and EventFilter().matches(ev("anything", {}))
+        assert EventFilter(tickets=["T-2"]).matches(ev("pipeline.completed", {"ticket_id": "T-2"}))
+
 
 class TestTicketDomainEvents:
     """Test that ticket CRUD emits domain events (event sourcing)."""
@@ -1001,6 +2897,11 @@ class TestCLICommands:
         rc = cmd_status(c, [])
         assert rc == 1
 
+    def test_cmd_db_compact_offline(self):
+        from dockfra.cli import WizardClient, cmd_db_compact
+        c = WizardClient("http://127.0.0.1:19999")
+        assert cmd_db_compact(c, []) == 1
+
     def test_cmd_logs_offline(self):
         from dockfra.cli import WizardClient, cmd_logs
         c = WizardClient("http://127.0.0.1:19999")
@@ -1274,6 +3175,28 @@ class TestSharedLibTicketSystem:
         self.tickets_dir = tmp_path
         yield
 
+    def _standalone(self, monkeypatch):
+        """Load ticket_system as in a container without the dockfra package."""
+        import importlib.util
+        monkeypatch.setitem(sys.modules, "dockfra.tickets", None)  # import → ImportError
+        path = Path(__file__).resolve().parent.parent / "shared" / "lib" / "ticket_system.py"
+        spec = importlib.util.spec_from_file_location("_standalone_ticket_system", path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        assert mod.TICKETS_DIR == str(self.tickets_dir)
+        return mod
+
+    def test_standalone_write_falls_back_when_rename_refused(self, monkeypatch):
+        ts = self._standalone(monkeypatch)
+        t = ts.create("Read-only dir")
+
+        def refuse(src, dst):
+            raise PermissionError(13, "Permission denied", dst)
+        monkeypatch.setattr(ts.os, "replace", refuse)
+        assert ts.update(t["id"], status="in_progress")["revision"] == 2
+        assert ts.get(t["id"])["status"] == "in_progress"
+        assert not list(self.tickets_dir.glob(".*.tmp"))
+
     def test_create_and_get(self):
         from dockfra import tickets
         t = tickets.create("Shared lib test", description="desc")
@@ -1298,7 +3221,7 @@ class TestSharedLibTicketSystem:
         t = tickets.get(tid)
         assert t["status"] == "in_progress"
         tickets.add_comment(tid, "bot", "looks good")
-        t = tickets.get(tid)
+        t = tickets.get(tid, with_comments=True)
         assert t["comments"][0]["text"] == "looks good"
 
     def test_close(self):